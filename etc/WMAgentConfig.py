@@ -101,6 +101,10 @@ config.JobStateMachine.jobSummaryDBName = jobSummaryDBName
 config.JobStateMachine.summaryStatsDBName = summaryStatsDBName
 # Amount of documents allowed in the ChangeState module for bulk commits
 config.JobStateMachine.maxBulkCommitDocs = 250
+# Amount of job state transitions applied through _bulk_docs in one go (0 means one update request per job)
+config.JobStateMachine.couchTransitionBatchSize = 0
+# Times the bulk state transitions in conflict are retried before falling back to the update handlers
+config.JobStateMachine.couchTransitionConflictRetries = 3
 # total allowed serialized size for the FJR document that is uploaded to wmagent_jobdump/fwjrs
 # NOTE: this needs to be in sync with CouchDB couchdb.max_document_size parameter
 # see: https://docs.couchdb.org/en/latest/config/couchdb.html#couchdb/max_document_size
@@ -121,6 +125,9 @@ config.BossAir.nCondorProcesses = 1
 config.BossAir.submitWMSMode = True
 config.BossAir.acctGroup = glideInAcctGroup
 config.BossAir.acctGroupUser = glideInAcctGroupUser
+# only query the schedd for jobs changing status, with a full query every fullTrackingInterval secs
+config.BossAir.incrementalTracking = False
+config.BossAir.fullTrackingInterval = 3600
 
 config.section_("CoreDatabase")
 config.CoreDatabase.connectUrl = databaseUrl
@@ -209,6 +216,8 @@ config.JobAccountant.componentDir = config.General.workDir + "/JobAccountant"
 config.JobAccountant.logLevel = globalLogLevel
 config.JobAccountant.workerThreads = 1
 config.JobAccountant.specDir = config.General.workDir + "/JobAccountant/SpecCache"
+# number of processes loading the job reports in parallel (0 loads them in the component thread)
+config.JobAccountant.reportLoaderProcesses = 0
 
 config.component_("JobCreator")
 config.JobCreator.section_('JobCreatorPoller')
@@ -225,6 +234,10 @@ config.JobCreator.UpdateFromResourceControl = True
 config.JobCreator.jobCacheDir = config.General.workDir + "/JobCache"
 config.JobCreator.defaultJobType = "Processing"
 config.JobCreator.workerThreads = 1
+# number of processes creating the job work areas, 0 creates them in the component process
+config.JobCreator.creatorProcesses = 0
+# write the task attributes shared by all the jobs once per task, instead of in every job pickle
+config.JobCreator.shareJobMetadata = True
 # glidein restrictions used for resource estimation (per core)
 config.JobCreator.GlideInRestriction = {"MinWallTimeSecs": 1 * 3600,  # 1h
                                         "MaxWallTimeSecs": 45 * 3600,  # pilot lifetime is usually 48h
@@ -306,6 +319,11 @@ config.JobArchiver.componentDir = config.General.workDir + "/JobArchiver"
 config.JobArchiver.logLevel = globalLogLevel
 config.JobArchiver.numberOfJobsToCluster = 1000
 config.JobArchiver.numberOfJobsToArchive = 10000
+# threads writing the job archives, the archive codec (bz2, gzip, xz or zstd, which needs
+# the zstandard module) and whether to write one archive per job cluster instead of per job
+config.JobArchiver.archiveThreads = 1
+config.JobArchiver.archiveCodec = "bz2"
+config.JobArchiver.clusterArchives = False
 # This is now OPTIONAL, it defaults to the componentDir
 # HOWEVER: Is is HIGHLY recommended that you do NOT run this on the same
 # disk as the JobCreator
@@ -441,6 +459,10 @@ config.RucioInjector.RSEPostfix = False  # enable it to append _Test to the RSE
 config.RucioInjector.metaDIDProject = "Production"
 config.RucioInjector.containerDiskRuleParams = {"weight": "dm_weight", "copies": 2, "grouping": "DATASET"}
 config.RucioInjector.blockRuleParams = {}
+# replicas are created in batches of blocks with up to replicaBatchSize files, and
+# injectionThreads batches are created concurrently, each thread with its own Rucio client
+config.RucioInjector.replicaBatchSize = 1000
+config.RucioInjector.injectionThreads = 1
 # this RSEExpr below might be updated by wmagent-mod-config script
 config.RucioInjector.containerDiskRuleRSEExpr = "(tier=2|tier=1)&cms_type=real&rse_type=DISK"
 config.RucioInjector.rucioAccount = "OVER_WRITE_BY_SECRETS"
@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+"""
+Thread safe and size bounded in-memory cache, meant to be shared among
+threads (e.g. CherryPy request threads). It provides:
+ * single-flight refresh: when a key expires, only one thread calls the
+   refresh function, while other threads asking for the same key wait for it;
+ * stale-while-revalidate: within `staleTime` seconds after expiration, the
+   stale value is returned right away while a background thread refreshes it;
+ * LRU eviction, once the cache holds more than `maxSize` keys;
+ * optional copy-free read-only views of the cached dictionaries;
+ * counters for hits, misses, refreshes and refresh latency.
+
+Example:
+
+    cache = ConcurrentCache(expiration=600, maxSize=100, staleTime=300)
+    sites = cache.get("sites", refreshFunc=getSitesFromCRIC)
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from time import time
+from types import MappingProxyType
+
+
+class _CacheEntry(object):
+    """
+    Value stored in the cache, with its own lock used to serialize refreshes
+    """
+    __slots__ = ["value", "lastUpdate", "lock", "refreshing"]
+
+    def __init__(self):
+        self.value = None
+        self.lastUpdate = None
+        self.lock = threading.Lock()
+        self.refreshing = False
+
+
+class ConcurrentCache(object):
+    """
+    Thread safe, LRU bounded, key/value cache with single-flight refresh
+    and stale-while-revalidate support.
+    """
+
+    def __init__(self, expiration, maxSize=None, staleTime=0, logger=None):
+        """
+        :param expiration: seconds a cached value is considered fresh
+        :param maxSize: maximum number of keys in the cache, None for unbounded
+        :param staleTime: seconds after expiration during which the stale value
+            is returned while it gets refreshed in the background
+        :param logger: logger object
+        """
+        self.expiration = expiration
+        self.maxSize = maxSize
+        self.staleTime = staleTime
+        self.logger = logger or logging.getLogger()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = dict(hits=0, misses=0, staleHits=0, refreshes=0, refreshErrors=0,
+                           evictions=0, refreshTime=0.0, maxRefreshTime=0.0)
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry.lastUpdate is not None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _isFresh(self, entry, now):
+        return entry.lastUpdate is not None and now - entry.lastUpdate <= self.expiration
+
+    def _isStale(self, entry, now):
+        return entry.lastUpdate is not None and now - entry.lastUpdate <= self.expiration + self.staleTime
+
+    def _getEntry(self, key):
+        """
+        Return the entry for a key, creating it if needed. Must be called with the lock held.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = _CacheEntry()
+            self._entries[key] = entry
+            while self.maxSize is not None and len(self._entries) > self.maxSize:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        else:
+            self._entries.move_to_end(key)
+        return entry
+
+    @staticmethod
+    def _view(value, readOnly):
+        if readOnly and isinstance(value, dict):
+            return MappingProxyType(value)
+        return value
+
+    def _refresh(self, entry, refreshFunc):
+        """
+        Call the refresh function and store its value. Must be called with the entry lock held.
+        """
+        startTime = time()
+        try:
+            value = refreshFunc()
+        except Exception:
+            with self._lock:
+                self._stats["refreshErrors"] += 1
+            raise
+        entry.value = value
+        entry.lastUpdate = time()
+        elapsed = entry.lastUpdate - startTime
+        with self._lock:
+            self._stats["refreshes"] += 1
+            self._stats["refreshTime"] += elapsed
+            self._stats["maxRefreshTime"] = max(self._stats["maxRefreshTime"], elapsed)
+
+    def _backgroundRefresh(self, key, entry, refreshFunc):
+        with entry.lock:
+            try:
+                self._refresh(entry, refreshFunc)
+            except Exception as exc:
+                self.logger.warning("Failed to refresh cache key %s in the background. Error: %s", key, str(exc))
+            finally:
+                entry.refreshing = False
+
+    def get(self, key, refreshFunc=None, readOnly=False):
+        """
+        Return the value cached for a key, refreshing it with refreshFunc if it
+        is missing or expired. Exceptions raised by refreshFunc are propagated
+        to the caller(s) waiting for a synchronous refresh.
+        :param key: cache key
+        :param refreshFunc: function without arguments returning the up-to-date value
+        :param readOnly: if True, dictionaries are returned as a read-only view
+        :return: the cached value
+        """
+        now = time()
+        stale = backgroundRefresh = False
+        with self._lock:
+            if refreshFunc is None and key not in self._entries:
+                self._stats["misses"] += 1
+                raise KeyError(key)
+            entry = self._getEntry(key)
+            if self._isFresh(entry, now):
+                self._stats["hits"] += 1
+                return self._view(entry.value, readOnly)
+            if refreshFunc is None:
+                self._stats["misses"] += 1
+                raise KeyError(key)
+            if self._isStale(entry, now):
+                self._stats["staleHits"] += 1
+                stale = True
+                value = entry.value
+                if not entry.refreshing:
+                    entry.refreshing = backgroundRefresh = True
+            else:
+                self._stats["misses"] += 1
+
+        if stale:
+            if backgroundRefresh:
+                thread = threading.Thread(target=self._backgroundRefresh, args=(key, entry, refreshFunc))
+                thread.daemon = True
+                thread.start()
+            return self._view(value, readOnly)
+
+        with entry.lock:
+            # it might have been refreshed by another thread while waiting for the lock
+            if not self._isFresh(entry, time()):
+                self._refresh(entry, refreshFunc)
+            return self._view(entry.value, readOnly)
+
+    def peek(self, key, default=None):
+        """
+        Return the value cached for a key (even if expired), without refreshing
+        it or updating the counters and the LRU order
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.lastUpdate is None:
+                return default
+            return entry.value
+
+    def lastUpdate(self, key):
+        """
+        Return the timestamp of the last update of a key, or None if not cached
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.lastUpdate if entry is not None else None
+
+    def isExpired(self, key):
+        """
+        Return True if a key is not cached or if its value has expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is None or not self._isFresh(entry, time())
+
+    def set(self, key, value):
+        """
+        Store a value in the cache, resetting its expiration
+        """
+        with self._lock:
+            entry = self._getEntry(key)
+            entry.value = value
+            entry.lastUpdate = time()
+
+    def invalidate(self, key):
+        """
+        Remove a key from the cache
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Remove all the keys from the cache
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Return a dictionary with the cache counters
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        stats["avgRefreshTime"] = stats["refreshTime"] / stats["refreshes"] if stats["refreshes"] else 0.0
+        return stats
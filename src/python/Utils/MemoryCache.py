@@ -1,7 +1,8 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 """
-Simple in-memory and non-thread safe cache.
+Simple in-memory cache. Updates of the cached data are serialized with a lock,
+while reads are lock free.
 Note that this module does not support home-made object types, since there is
 an explicit data type check when adding a new item to the cache.
 
@@ -10,10 +11,12 @@ or if the user tries to extend the cache with an incompatible
 data type.
 """
 
+import threading
 from copy import copy
 
 from builtins import object
 from time import time
+from types import MappingProxyType
 
 
 class MemoryCacheException(Exception):
@@ -22,18 +25,22 @@ class MemoryCacheException(Exception):
 
 class MemoryCache():
 
-    __slots__ = ["lastUpdate", "expiration", "_cache"]
+    __slots__ = ["lastUpdate", "expiration", "_cache", "copyOnRead", "_lock"]
 
-    def __init__(self, expiration, initialData=None):
+    def __init__(self, expiration, initialData=None, copyOnRead=True):
         """
         Initializes cache object
 
         :param expiration: expiration time in seconds
         :param initialData: initial value for the cache
+        :param copyOnRead: if False, items are returned without being copied, and
+            dictionary items are returned as read-only views
         """
         self.lastUpdate = int(time())
         self.expiration = expiration
         self._cache = initialData
+        self.copyOnRead = copyOnRead
+        self._lock = threading.RLock()
 
     def __contains__(self, item):
         """
@@ -49,7 +56,10 @@ class MemoryCache():
         :param keyName: the key name from the dictionary
         """
         if isinstance(self._cache, dict):
-            return copy(self._cache.get(keyName))
+            item = self._cache.get(keyName)
+            if self.copyOnRead:
+                return copy(item)
+            return MappingProxyType(item) if isinstance(item, dict) else item
         else:
             raise MemoryCacheException("Cannot retrieve an item from a non-dict MemoryCache object: {}".format(self._cache))
 
@@ -57,12 +67,13 @@ class MemoryCache():
         """
         Resets the cache to its current data type
         """
-        if isinstance(self._cache, (dict, set)):
-            self._cache.clear()
-        elif isinstance(self._cache, list):
-            del self._cache[:]
-        else:
-            raise MemoryCacheException("The cache needs to be reset manually, data type unknown")
+        with self._lock:
+            if isinstance(self._cache, (dict, set)):
+                self._cache.clear()
+            elif isinstance(self._cache, list):
+                del self._cache[:]
+            else:
+                raise MemoryCacheException("The cache needs to be reset manually, data type unknown")
 
     def isCacheExpired(self):
         """
@@ -90,9 +101,10 @@ class MemoryCache():
         if not isinstance(self._cache, type(inputData)):
             raise TypeError("Current cache data type: %s, while new value is: %s" %
                             (type(self._cache), type(inputData)))
-        self.reset()
-        self.lastUpdate = int(time())
-        self._cache = inputData
+        with self._lock:
+            self.reset()
+            self.lastUpdate = int(time())
+            self._cache = inputData
 
     def addItemToCache(self, inputItem):
         """
@@ -100,6 +112,13 @@ class MemoryCache():
         It, of course, only works for data caches of type: list, set or dict.
         :param inputItem: additional item to be added to the current cached data
         """
+        with self._lock:
+            self._addItem(inputItem)
+
+    def _addItem(self, inputItem):
+        """
+        Adds new item(s) to the cache. Must be called with the lock held.
+        """
         if isinstance(self._cache, set) and isinstance(inputItem, (list, set)):
             # extend another list or set into a set
             self._cache.update(inputItem)
@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Prefix trie of strings, meant for matching a large number of strings (e.g. LFNs)
+against a list of prefixes (e.g. directory filters) compiled once: the cost of
+a lookup depends on the length of the matching prefix, and no longer on the
+number of prefixes in the list.
+
+PrefixTrie matches prefixes as plain strings, like str.startswith does, while
+PathTrie matches whole path components, such that "/store/unmerged/data" is an
+ancestor of "/store/unmerged/data/prod" but not of "/store/unmerged/data2".
+"""
+
+# marks the end of a prefix added to the trie
+_END = None
+# marks the end of a path added to the path trie; empty path components are
+# never stored, thus it can be used as a (JSON serializable) key as well
+_PATH_END = ""
+
+
+class PrefixTrie(object):
+    """
+    Set of string prefixes, stored as a character trie of nested dictionaries
+    """
+
+    __slots__ = ["_root", "_size"]
+
+    def __init__(self, prefixes=None):
+        """
+        :param prefixes: optional iterable of prefixes to be added to the trie
+        """
+        self._root = {}
+        self._size = 0
+        for prefix in prefixes or []:
+            self.add(prefix)
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    def __contains__(self, prefix):
+        """
+        Check whether this exact prefix has been added to the trie
+        """
+        node = self._root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return False
+        return _END in node
+
+    def add(self, prefix):
+        """
+        Add a prefix to the trie
+        :param prefix: string
+        """
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        if _END not in node:
+            node[_END] = prefix
+            self._size += 1
+
+    def shortestPrefix(self, string):
+        """
+        Find the shortest prefix in the trie which the string starts with
+        :param string: string to be matched
+        :return: the prefix found, None if the string matches none of them
+        """
+        node = self._root
+        if _END in node:
+            return node[_END]
+        for char in string:
+            node = node.get(char)
+            if node is None:
+                return None
+            if _END in node:
+                return node[_END]
+        return None
+
+    def longestPrefix(self, string):
+        """
+        Find the longest prefix in the trie which the string starts with
+        :param string: string to be matched
+        :return: the prefix found, None if the string matches none of them
+        """
+        node = self._root
+        found = node.get(_END)
+        for char in string:
+            node = node.get(char)
+            if node is None:
+                break
+            found = node.get(_END, found)
+        return found
+
+    def hasPrefixOf(self, string):
+        """
+        Check whether the string starts with any of the prefixes in the trie
+        :param string: string to be matched
+        :return: True if it does, False otherwise
+        """
+        return self.shortestPrefix(string) is not None
+
+
+class PathTrie(object):
+    """
+    Set of paths, stored as a trie of path components of nested dictionaries.
+    Paths are normalized on the way in: empty components (duplicated, leading
+    or trailing separators) are ignored, thus "/store/unmerged/" and
+    "/store/unmerged" are the same path.
+    """
+
+    __slots__ = ["_root", "_size", "_sep"]
+
+    def __init__(self, paths=None, sep="/"):
+        """
+        :param paths: optional iterable of paths to be added to the trie
+        :param sep: path separator
+        """
+        self._root = {}
+        self._size = 0
+        self._sep = sep
+        for path in paths or []:
+            self.add(path)
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    def __contains__(self, path):
+        """
+        Check whether this exact path has been added to the trie
+        """
+        node = self._root
+        for comp in self._split(path):
+            node = node.get(comp)
+            if node is None:
+                return False
+        return _PATH_END in node
+
+    def _split(self, path):
+        """
+        Split a path into its non empty components
+        """
+        return [comp for comp in path.split(self._sep) if comp]
+
+    def _normalize(self, comps):
+        """
+        Build the normalized path out of its components
+        """
+        return self._sep + self._sep.join(comps)
+
+    def add(self, path):
+        """
+        Add a path to the trie
+        :param path: string
+        """
+        comps = self._split(path)
+        node = self._root
+        for comp in comps:
+            node = node.setdefault(comp, {})
+        if _PATH_END not in node:
+            node[_PATH_END] = self._normalize(comps)
+            self._size += 1
+
+    def longestPrefix(self, path):
+        """
+        Find the deepest path in the trie which is the path itself or one of its ancestors
+        :param path: path to be matched
+        :return: the normalized path found, None if there is none
+        """
+        node = self._root
+        found = node.get(_PATH_END)
+        for comp in self._split(path):
+            node = node.get(comp)
+            if node is None:
+                break
+            found = node.get(_PATH_END, found)
+        return found
+
+    def hasPrefixOf(self, path):
+        """
+        Check whether the path itself or any of its ancestors is in the trie. The
+        lookup stops at the first match, thus it costs at most the path depth.
+        :param path: path to be matched
+        :return: True if it is, False otherwise
+        """
+        node = self._root
+        if _PATH_END in node:
+            return True
+        for comp in self._split(path):
+            node = node.get(comp)
+            if node is None:
+                return False
+            if _PATH_END in node:
+                return True
+        return False
+
+    def toDict(self):
+        """
+        Serialize the trie into a JSON serializable dictionary, which can be
+        cached and turned back into a trie with PathTrie.fromDict, without
+        having to add every single path again. Note that the trie nodes are
+        not copied.
+        :return: dictionary
+        """
+        return {"sep": self._sep, "size": self._size, "trie": self._root}
+
+    @classmethod
+    def fromDict(cls, data):
+        """
+        Build a trie out of a dictionary created by PathTrie.toDict
+        :param data: dictionary
+        :return: a PathTrie instance
+        """
+        trie = cls(sep=data["sep"])
+        trie._root = data["trie"]
+        trie._size = data["size"]
+        return trie
@@ -110,3 +110,157 @@ def processStatusViaProcFS(pid):
         return [{"error": str(e)}]
 
     return statusList
+
+
+def readProcStat(pid):
+    """
+    Parse /proc/<pid>/stat of the given process.
+    :param pid: Process ID to inspect
+    :return: dictionary with {pid, name, state, ppid, utime, stime, starttime, vsize, rss},
+        where utime, stime and starttime are in clock ticks, vsize in bytes and rss in pages;
+        or None if the process is gone
+    """
+    try:
+        with open(f"/proc/{pid}/stat", encoding='utf-8') as f:
+            data = f.read()
+    except (IOError, OSError):
+        return None
+    # the command name can contain spaces and parentheses, split around the last ')'
+    nameStart = data.find('(')
+    nameEnd = data.rfind(')')
+    fields = data[nameEnd + 2:].split()
+    return {"pid": int(pid),
+            "name": data[nameStart + 1:nameEnd],
+            "state": fields[0],
+            "ppid": int(fields[1]),
+            "utime": int(fields[11]),
+            "stime": int(fields[12]),
+            "starttime": int(fields[19]),
+            "vsize": int(fields[20]),
+            "rss": int(fields[21])}
+
+
+def readProcStatm(pid):
+    """
+    Parse /proc/<pid>/statm of the given process.
+    :param pid: Process ID to inspect
+    :return: dictionary with {size, resident, shared} memory in kB, or None if the process is gone
+    """
+    try:
+        with open(f"/proc/{pid}/statm", encoding='utf-8') as f:
+            fields = f.read().split()
+    except (IOError, OSError):
+        return None
+    pageKB = os.sysconf('SC_PAGE_SIZE') // 1024
+    return {"size": int(fields[0]) * pageKB,
+            "resident": int(fields[1]) * pageKB,
+            "shared": int(fields[2]) * pageKB}
+
+
+def readProcPss(pid):
+    """
+    Read the Proportional Set Size of the given process from /proc/<pid>/smaps_rollup,
+    falling back to the sum over /proc/<pid>/smaps for kernels older than 4.14.
+    :param pid: Process ID to inspect
+    :return: PSS in kB, or None if it cannot be read
+    """
+    for fname in ("smaps_rollup", "smaps"):
+        try:
+            pss = 0
+            with open(f"/proc/{pid}/{fname}", encoding='utf-8') as f:
+                for line in f:
+                    if line.startswith("Pss:"):
+                        pss += int(line.split()[1])
+            return pss
+        except (IOError, OSError):
+            continue
+    return None
+
+
+def processTree(pid):
+    """
+    Return the PIDs of the given process and all its descendants. It relies on
+    /proc/<pid>/task/<tid>/children when provided by the kernel, otherwise the
+    parent PID of every process in /proc is looked up.
+    :param pid: Process ID of the tree root
+    :return: list of PIDs, starting with the root one; empty if the process is gone
+    """
+    pid = int(pid)
+    if not os.path.exists(f"/proc/{pid}"):
+        return []
+    if os.path.exists(f"/proc/{pid}/task/{pid}/children"):
+        pids = [pid]
+        for parent in pids:
+            try:
+                for tid in os.listdir(f"/proc/{parent}/task"):
+                    with open(f"/proc/{parent}/task/{tid}/children", encoding='utf-8') as f:
+                        pids.extend(int(child) for child in f.read().split())
+            except (IOError, OSError):
+                # process exited in the meantime
+                continue
+        return pids
+
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        stat = readProcStat(entry)
+        if stat is not None:
+            children.setdefault(stat["ppid"], []).append(stat["pid"])
+    pids = [pid]
+    for parent in pids:
+        pids.extend(children.get(parent, []))
+    return pids
+
+
+def processTreeUsage(pid, withPss=True):
+    """
+    Aggregate the resources used by the given process and all its descendants,
+    reading /proc directly (no subprocess is spawned).
+    :param pid: Process ID of the tree root
+    :param withPss: also sum up the PSS memory, which is more expensive to read
+    :return: dictionary with {pids, rss, vsize, pss, cpuTime, startTime}, where memory
+        is in kB, cpuTime in seconds, startTime the root process start time in seconds
+        since boot; or None if the process is gone
+    """
+    clockTicks = os.sysconf('SC_CLK_TCK')
+    usage = {"pids": 0, "rss": 0, "vsize": 0, "pss": 0 if withPss else None,
+             "cpuTime": 0.0, "startTime": None}
+    for procId in processTree(pid):
+        stat = readProcStat(procId)
+        statm = readProcStatm(procId)
+        if stat is None or statm is None:
+            continue
+        if usage["startTime"] is None:
+            usage["startTime"] = float(stat["starttime"]) / clockTicks
+        usage["pids"] += 1
+        usage["rss"] += statm["resident"]
+        usage["vsize"] += statm["size"]
+        usage["cpuTime"] += float(stat["utime"] + stat["stime"]) / clockTicks
+        if withPss:
+            usage["pss"] += readProcPss(procId) or 0
+    if not usage["pids"]:
+        return None
+    return usage
+
+
+def systemUptime():
+    """
+    Return the number of seconds since boot from /proc/uptime
+    """
+    with open("/proc/uptime", encoding='utf-8') as f:
+        return float(f.read().split()[0])
+
+
+def totalMemory():
+    """
+    Return the total physical memory in kB from /proc/meminfo, or None if not available
+    """
+    try:
+        with open("/proc/meminfo", encoding='utf-8') as f:
+            for line in f:
+                if line.startswith("MemTotal:"):
+                    return int(line.split()[1])
+    except (IOError, OSError):
+        pass
+    return None
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+"""
+Helpers for the pools of worker processes used by the agent components to
+offload CPU and I/O bound work (e.g. loading job reports, creating job work
+areas) from their polling thread.
+
+The pool processes are spawned, and not forked: the components are
+multi-threaded and connected to the database, which a forked child would
+inherit in an undefined state.
+"""
+
+import logging
+import multiprocessing
+
+
+def initPoolLogging(logLevel):
+    """
+    Initialize the logging of a pool process
+    :param logLevel: logging level, as the one of the parent process
+    """
+    logging.basicConfig(level=logLevel, format="%(asctime)s:%(processName)s:%(levelname)s:%(message)s")
+
+
+def createSpawnPool(processes):
+    """
+    Create a pool of spawned processes, logging at the same level as the calling process
+    :param processes: number of processes in the pool
+    :return: a multiprocessing Pool object
+    """
+    context = multiprocessing.get_context("spawn")
+    return context.Pool(processes=processes, initializer=initPoolLogging,
+                        initargs=(logging.getLogger().getEffectiveLevel(),))
+
+
+def closePool(pool):
+    """
+    Terminate a pool of processes, if any, and wait for its processes to exit
+    :param pool: a multiprocessing Pool object, or None
+    :return: None, to be assigned back to the pool reference
+    """
+    if pool is not None:
+        pool.terminate()
+        pool.join()
+    return None
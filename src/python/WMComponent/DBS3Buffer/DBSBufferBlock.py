@@ -25,6 +25,49 @@ class DBSBufferBlockException(WMException):
 
 
 
+def convertToDBSBlock(blockData, copyData=True):
+    """
+    _convertToDBSBlock_
+
+    Convert the data of a DBSBufferBlock to the DBSBlock structure to upload
+    to dbs. The data is deep copied unless copyData is False, which is meant
+    for callers owning a private copy of it already (e.g. a block received
+    by a DBS upload worker process).
+    """
+    block = {}
+
+    #TODO: instead of using key to remove need to change to keyToKeep
+    # Ask dbs team to publish the list (API)
+    keyToRemove = ['insertedFiles', 'newFiles', 'file_count', 'block_size',
+                   'origin_site_name', 'creation_date', 'open',
+                   'Name', 'close_settings']
+
+    nestedKeyToRemove = ['block.block_events', 'block.datasetpath', 'block.workflows']
+
+    dbsBufferToDBSBlockKey = {'block_size': 'BlockSize',
+                              'creation_date': 'CreationDate',
+                              'file_count': 'NumberOfFiles',
+                              'origin_site_name': 'location'}
+
+    # clone the new DBSBlock dict after filtering out the data.
+    for key in blockData:
+        if key in keyToRemove:
+            continue
+        value = copy.deepcopy(blockData[key]) if copyData else blockData[key]
+        if key in dbsBufferToDBSBlockKey:
+            block[dbsBufferToDBSBlockKey[key]] = value
+        else:
+            block[key] = value
+
+    # delete nested key dictionary
+    for nestedKey in nestedKeyToRemove:
+        firstkey, subkey = nestedKey.split('.', 1)
+        if firstkey in block and subkey in block[firstkey]:
+            del block[firstkey][subkey]
+
+    return block
+
+
 class DBSBufferBlock(object):
     """
     _DBSBufferBlock_
@@ -454,37 +497,7 @@ class DBSBufferBlock(object):
         convert to DBSBlock structure to upload to dbs
         TODO: check file lumi event and validate event is not null
         """
-        block = {}
-
-        #TODO: instead of using key to remove need to change to keyToKeep
-        # Ask dbs team to publish the list (API)
-        keyToRemove = ['insertedFiles', 'newFiles', 'file_count', 'block_size',
-                       'origin_site_name', 'creation_date', 'open',
-                       'Name', 'close_settings']
-
-        nestedKeyToRemove = ['block.block_events', 'block.datasetpath', 'block.workflows']
-
-        dbsBufferToDBSBlockKey = {'block_size': 'BlockSize',
-                                  'creation_date': 'CreationDate',
-                                  'file_count': 'NumberOfFiles',
-                                  'origin_site_name': 'location'}
-
-        # clone the new DBSBlock dict after filtering out the data.
-        for key in self.data:
-            if key in keyToRemove:
-                continue
-            elif key in dbsBufferToDBSBlockKey:
-                block[dbsBufferToDBSBlockKey[key]] = copy.deepcopy(self.data[key])
-            else:
-                block[key] = copy.deepcopy(self.data[key])
-
-        # delete nested key dictionary
-        for nestedKey in nestedKeyToRemove:
-            firstkey, subkey = nestedKey.split('.', 1)
-            if firstkey in block and subkey in block[firstkey]:
-                del block[firstkey][subkey]
-
-        return block
+        return convertToDBSBlock(self.data)
 
     def setPendingAndCloseBlock(self):
         "set the block status as Pending for upload as well as closed"
@@ -38,13 +38,14 @@ import multiprocessing
 import os.path
 import threading
 import time
+from collections import defaultdict
 
 from dbs.apis.dbsClient import DbsApi
 from RestClient.ErrorHandling.RestClientExceptions import HTTPError
 
 from Utils.Timers import timeFunction
 from Utils.wmcoreDTools import resetWatchdogTimer, moduleName
-from WMComponent.DBS3Buffer.DBSBufferBlock import DBSBufferBlock
+from WMComponent.DBS3Buffer.DBSBufferBlock import DBSBufferBlock, convertToDBSBlock
 from WMComponent.DBS3Buffer.DBSBufferUtil import DBSBufferUtil
 from WMCore.Algorithms.MiscAlgos import sortListByKey
 from WMCore.DAOFactory import DAOFactory
@@ -60,8 +61,10 @@ def uploadWorker(workInput, results, dbsUrl, gzipEncoding=False):
     """
     _uploadWorker_
 
-    Put JSONized blocks in the workInput
-    Get confirmation in the output
+    Put DBSBufferBlock data in the workInput, it gets converted to the
+    DBS block structure and inserted here, off the component main thread.
+    Get confirmation in the output, along with the upload time (in seconds)
+    and the size of the block (in bytes)
 
     :param workInput: work input data
     :param results: multiprocessing.Queue object we we can store and retrieve dict objects
@@ -89,22 +92,29 @@ def uploadWorker(workInput, results, dbsUrl, gzipEncoding=False):
             break
 
         name = work.get('name', None)  # this is the block name
-        block = work.get('block', None)  # this is the block data structure
+        block = work.get('block', None)  # this is the DBSBufferBlock data structure
+        # existence of the block in DBS is normally checked per dataset upfront
+        checkExistence = work.get('checkExistence', True)
 
         # Do stuff with DBS
+        startTime = time.time()
+        blockBytes = block['block']['block_size']
         try:
-            # check if block exists in DBS
-            records = dbsApi.listBlocks(block_name=name)
-            # the records are shown in the following form
-            # [{'block_name': '/block/name#123'}]
-            if len(records) == 1 and records[0]['block_name'] == name:
-                # found that we have this block, i.e. no need to insert block anymore
-                logging.info("block %s already exist in DBS", name)
-                results.put({'name': name, 'success': "uploaded"})
-                continue
+            if checkExistence:
+                # check if block exists in DBS
+                records = dbsApi.listBlocks(block_name=name)
+                # the records are shown in the following form
+                # [{'block_name': '/block/name#123'}]
+                if len(records) == 1 and records[0]['block_name'] == name:
+                    # found that we have this block, i.e. no need to insert block anymore
+                    logging.info("block %s already exist in DBS", name)
+                    results.put({'name': name, 'success': "uploaded", 'bytes': 0,
+                                 'uploadTime': time.time() - startTime})
+                    continue
             logging.info("About to call insert block for: %s", name)
-            dbsApi.insertBulkBlock(blockDump=block)
-            results.put({'name': name, 'success': "uploaded"})
+            dbsApi.insertBulkBlock(blockDump=convertToDBSBlock(block, copyData=False))
+            results.put({'name': name, 'success': "uploaded", 'bytes': blockBytes,
+                         'uploadTime': time.time() - startTime})
         except HTTPError as ex:
             # DBS Go server errors are defined here:
             # https://github.com/dmwm/dbs2go/blob/master/dbs/errors.go
@@ -201,8 +211,10 @@ class DBSUploadPoller(BaseWorkerThread):
         self.gzipEncoding = getattr(self.config.DBS3Upload, 'gzipEncoding', False)
         self.dbsApi = DbsApi(url=self.dbsUrl)
 
-        # List of blocks currently in processing
-        self.queuedBlocks = []
+        # Blocks currently in processing, with the time they were queued at
+        self.queuedBlocks = {}
+        # Upload latency and size of the blocks uploaded in the last cycle
+        self.uploadMetrics = {}
 
         # Set up the pool of worker processes
         self.setupPool()
@@ -602,6 +614,52 @@ class DBSUploadPoller(BaseWorkerThread):
             msg += f"Details: {str(ex)}"
             raise DBSUploadException(msg) from None
 
+    def findBlocksInDBS(self, blockNames):
+        """
+        _findBlocksInDBS_
+
+        Check which of the given blocks already exist in DBS, with a single
+        query per dataset instead of one per block.
+        :param blockNames: list of block names
+        :return: a set with the names of the blocks found in DBS, and a set
+            with the names of the blocks whose dataset could not be checked
+        """
+        blocksByDataset = defaultdict(set)
+        for blockName in blockNames:
+            blocksByDataset[blockName.split('#', 1)[0]].add(blockName)
+
+        blocksInDBS = set()
+        uncheckedBlocks = set()
+        for dataset, datasetBlocks in blocksByDataset.items():
+            try:
+                # records are like: [{'block_name': '/block/name#123'}]
+                records = self.dbsApi.listBlocks(dataset=dataset)
+            except Exception as ex:
+                logging.warning("Failed to list the blocks of dataset %s in DBS. Error: %s", dataset, str(ex))
+                uncheckedBlocks.update(datasetBlocks)
+                continue
+            blocksInDBS.update(datasetBlocks.intersection(record['block_name'] for record in records))
+        return blocksInDBS, uncheckedBlocks
+
+    def logUploadMetrics(self):
+        """
+        _logUploadMetrics_
+
+        Log the latency and size of the blocks uploaded to DBS in this cycle
+        """
+        for blockName, metrics in self.uploadMetrics.items():
+            logging.debug("Block %s: %d bytes, uploaded in %.2f secs, %.2f secs after being queued",
+                          blockName, metrics['bytes'], metrics['uploadTime'], metrics['latency'])
+        if not self.uploadMetrics:
+            return
+        uploadTimes = [metrics['uploadTime'] for metrics in self.uploadMetrics.values()]
+        latencies = [metrics['latency'] for metrics in self.uploadMetrics.values()]
+        totalBytes = sum(metrics['bytes'] for metrics in self.uploadMetrics.values())
+        logging.info("Uploaded %d blocks with %.1f MB to DBS. Upload time per block: avg %.2f secs, "
+                     "max %.2f secs. Latency since queueing: max %.2f secs",
+                     len(self.uploadMetrics), totalBytes / 1e6, sum(uploadTimes) / len(uploadTimes),
+                     max(uploadTimes), max(latencies))
+
     def inputBlocks(self):
         """
         _inputBlocks_
@@ -711,25 +769,38 @@ class DBSUploadPoller(BaseWorkerThread):
         if not self.pool:
             self.setupPool()
 
-        # Finally upload blocks to DBS.
+        blocksToUpload = []
         for block in createInDBS:
             if not block.files:
                 # What are we doing?
                 logging.debug("Skipping empty block")
                 continue
+            blocksToUpload.append(block)
 
-            logging.debug("Found block %s in blocks", block.getName())
-            block.setPhysicsGroup(group=self.physicsGroup)
+        # Blocks that made it to DBS in a previous cycle do not need to be inserted again
+        blocksInDBS, uncheckedBlocks = self.findBlocksInDBS([block.getName() for block in blocksToUpload])
 
-            encodedBlock = block.convertToDBSBlock()
-            logging.info("Queueing block for insertion: %s", block.getName())
-            self.workInput.put({'name': block.getName(), 'block': encodedBlock})
+        # Finally upload blocks to DBS. The workers convert the blocks to the
+        # DBS block structure, such that it does not hold up this thread.
+        for block in blocksToUpload:
+            blockName = block.getName()
+            logging.debug("Found block %s in blocks", blockName)
+            block.setPhysicsGroup(group=self.physicsGroup)
+            self.queuedBlocks[blockName] = time.time()
             self.blockCount += 1
-            if self.dumpBlockJsonFor and (self.dumpBlockJsonFor == block.getName()):
-                logging.info("Dumping '%s' information into %s", block.getName(), self.copyPath)
+
+            if blockName in blocksInDBS:
+                logging.info("Block %s already exists in DBS", blockName)
+                self.workResult.put({'name': blockName, 'success': "uploaded", 'bytes': 0, 'uploadTime': 0})
+                continue
+
+            if self.dumpBlockJsonFor and (self.dumpBlockJsonFor == blockName):
+                logging.info("Dumping '%s' information into %s", blockName, self.copyPath)
                 with open(self.copyPath, 'w') as jo:
-                    json.dump(encodedBlock, jo, indent=2)
-            self.queuedBlocks.append(block.getName())
+                    json.dump(block.convertToDBSBlock(), jo, indent=2)
+            logging.info("Queueing block for insertion: %s", blockName)
+            self.workInput.put({'name': blockName, 'block': block.data,
+                                'checkExistence': blockName in uncheckedBlocks})
 
         # And all work is in and we're done for now
         return
@@ -781,13 +852,17 @@ class DBSUploadPoller(BaseWorkerThread):
                 continue
 
         loadedBlocks = []
+        self.uploadMetrics = {}
         for result in blocksToClose:
             # Remove from list of work being processed
-            self.queuedBlocks.remove(result.get('name'))
+            queueTime = self.queuedBlocks.pop(result.get('name'))
             if result["success"] == "uploaded":
                 block = self.blockCache.get(result.get('name'))
                 block.status = 'InDBS'
                 loadedBlocks.append(block)
+                self.uploadMetrics[block.getName()] = {'latency': time.time() - queueTime,
+                                                       'uploadTime': result.get('uploadTime', 0),
+                                                       'bytes': result.get('bytes', 0)}
             elif result["success"] == "check":
                 block = result["name"]
                 self.blocksToCheck.append(block)
@@ -833,6 +908,7 @@ class DBSUploadPoller(BaseWorkerThread):
             # Clean things up
             name = block.getName()
             del self.blockCache[name]
+        self.logUploadMetrics()
 
         # Clean up the pool so we don't have stuff waiting around
         if self.pool:
@@ -853,22 +929,14 @@ class DBSUploadPoller(BaseWorkerThread):
 
         blocksUploaded = []
 
-        # See if there is anything to check
+        # See if there is anything to check, checking in DBS if the blocks were really inserted
+        blocksInDBS, _ = self.findBlocksInDBS(self.blocksToCheck)
         for block in self.blocksToCheck:
-            logging.debug("Checking block existence: %s", block)
-            # Check in DBS if the block was really inserted
-            try:
-                # FIXME: is it still an empty list for blocks not available?
-                result = self.dbsApi.listBlocks(block_name=block)
-                # it is an empty list if block cannot be found
-                if result:
-                    loadedBlock = self.blockCache.get(block)
-                    loadedBlock.status = 'InDBS'
-                    blocksUploaded.append(loadedBlock)
-                    logging.info("Block '%s' will be marked as '%s'", block, loadedBlock.status)
-            except Exception as ex:
-                msg = "Error trying to check block %s through DBS. Error: %s" % (block, str(ex))
-                logging.exception(msg)
+            if block in blocksInDBS:
+                loadedBlock = self.blockCache.get(block)
+                loadedBlock.status = 'InDBS'
+                blocksUploaded.append(loadedBlock)
+                logging.info("Block '%s' will be marked as '%s'", block, loadedBlock.status)
 
         # Update the status of those blocks that were truly inserted
         if blocksUploaded:
@@ -16,7 +16,9 @@ import gc
 import logging
 import os
 import threading
+import time
 
+from Utils.SpawnPool import createSpawnPool, closePool
 from WMComponent.DBS3Buffer.DBSBufferFile import DBSBufferFile
 from WMCore.ACDC.DataCollectionService import DataCollectionService
 from WMCore.DAOFactory import DAOFactory
@@ -38,6 +40,83 @@ class AccountantWorkerException(WMException):
     """
 
 
+def createMissingFWKJR(errorCode=999, errorDescription='Failure of unknown type'):
+    """
+    _createMissingFWJR_
+
+    Create a missing FWJR if the report can't be found by the code in the
+    path location.
+    """
+    report = Report()
+    report.addError("cmsRun1", errorCode, "MissingJobReport", errorDescription)
+    report.data.cmsRun1.status = "Failed"
+    return report
+
+
+def loadJobReport(jobReportPath):
+    """
+    _loadJobReport_
+
+    Given a framework job report on disk, load it and return a
+    FwkJobReport instance.  If there is any problem loading or parsing the
+    framework job report return None.
+    """
+    # The jobReportPath may be prefixed with "file://" which needs to be
+    # removed so it doesn't confuse the FwkJobReport() parser.
+    if not jobReportPath:
+        logging.error("Bad FwkJobReport Path: %s", jobReportPath)
+        return createMissingFWKJR(99999, "FWJR path is empty")
+
+    jobReportPath = jobReportPath.replace("file://", "")
+    if not os.path.exists(jobReportPath):
+        logging.error("Bad FwkJobReport Path: %s", jobReportPath)
+        return createMissingFWKJR(99999, 'Cannot find file in jobReport path: %s' % jobReportPath)
+
+    if os.path.getsize(jobReportPath) == 0:
+        logging.error("Empty FwkJobReport: %s", jobReportPath)
+        return createMissingFWKJR(99998, 'jobReport of size 0: %s ' % jobReportPath)
+
+    jobReport = Report()
+
+    try:
+        jobReport.load(jobReportPath)
+    except UnicodeDecodeError:
+        logging.error("Hit UnicodeDecodeError exception while loading jobReport: %s", jobReportPath)
+        return createMissingFWKJR(99997, 'Found undecodable data in jobReport: {}'.format(jobReportPath))
+    except Exception as ex:
+        msg = "Error loading jobReport: {}\nDetails: {}".format(jobReportPath, str(ex))
+        logging.error(msg)
+        return createMissingFWKJR(99997, 'Cannot load jobReport')
+
+    if not jobReport.listSteps():
+        logging.error("FwkJobReport with no steps: %s", jobReportPath)
+        return createMissingFWKJR(99997, 'jobReport with no steps: %s ' % jobReportPath)
+
+    return jobReport
+
+
+def digestJobReport(jobReportPath):
+    """
+    _digestJobReport_
+
+    Load a framework job report and pre-digest everything the accountant needs
+    from it, i.e. the task outcome, the output files (with their lumis,
+    checksums and parents), the logArchive files and the skipped files. It
+    does not touch the database, so it can run in a separate process: the
+    file dictionaries keep referencing the report, also once unpickled.
+    """
+    startTime = time.time()
+    jobReport = loadJobReport(jobReportPath)
+    jobSuccess = jobReport.taskSuccessful()
+    digest = {"fwjr": jobReport,
+              "jobSuccess": jobSuccess,
+              "files": jobReport.getAllFiles() if jobSuccess else None,
+              "logArchFiles": jobReport.getAllFilesFromStep(step='logArch1'),
+              "skippedFiles": jobReport.getAllSkippedFiles() if jobSuccess else None,
+              "loadTime": time.time() - startTime}
+    return digest
+
+
 class AccountantWorker(WMConnectionBase):
     """
     Class that actually does the work of parsing FWJRs for the Accountant
@@ -126,6 +205,19 @@ class AccountantWorker(WMConnectionBase):
         self.workflowIDs = collections.deque(maxlen=1000)
         self.workflowPaths = collections.deque(maxlen=1000)
 
+        # Optionally load and digest the job reports in a pool of processes,
+        # while this thread takes care of the database
+        self.reportLoaderProcesses = getattr(config.JobAccountant, 'reportLoaderProcesses', 0)
+        self.reportLoaderChunkSize = getattr(config.JobAccountant, 'reportLoaderChunkSize', 10)
+        self.reportLoaderPool = None
+
+        # Job types and output maps, pre-fetched for all the jobs in a slice
+        self.jobTypes = {}
+        self.outputMaps = {}
+
+        # time spent in every stage of the last slice of jobs
+        self.stageTimes = {}
+
         return
 
     def reset(self):
@@ -144,49 +236,64 @@ class AccountantWorker(WMConnectionBase):
         self.parentageBinds = []
         self.parentageBindsForMerge = []
         self.jobsWithSkippedFiles = {}
+        self.jobTypes = {}
+        self.outputMaps = {}
         gc.collect()
         return
 
-    def loadJobReport(self, jobReportPath):
+    def close(self):
         """
-        _loadJobReport_
+        _close_
 
-        Given a framework job report on disk, load it and return a
-        FwkJobReport instance.  If there is any problem loading or parsing the
-        framework job report return None.
+        Shut down the report loader processes, if any.
         """
-        # The jobReportPath may be prefixed with "file://" which needs to be
-        # removed so it doesn't confuse the FwkJobReport() parser.
-        if not jobReportPath:
-            logging.error("Bad FwkJobReport Path: %s", jobReportPath)
-            return self.createMissingFWKJR(99999, "FWJR path is empty")
+        self.reportLoaderPool = closePool(self.reportLoaderPool)
+        return
 
-        jobReportPath = jobReportPath.replace("file://", "")
-        if not os.path.exists(jobReportPath):
-            logging.error("Bad FwkJobReport Path: %s", jobReportPath)
-            return self.createMissingFWKJR(99999, 'Cannot find file in jobReport path: %s' % jobReportPath)
+    def loadJobReports(self, jobs):
+        """
+        _loadJobReports_
 
-        if os.path.getsize(jobReportPath) == 0:
-            logging.error("Empty FwkJobReport: %s", jobReportPath)
-            return self.createMissingFWKJR(99998, 'jobReport of size 0: %s ' % jobReportPath)
+        Return an iterator over (job, report digest) tuples, in the same order
+        as the jobs. When report loader processes are configured, the reports
+        are loaded in parallel and streamed back as they are ready.
+        """
+        paths = [job["fwjr_path"] for job in jobs]
+        if self.reportLoaderProcesses > 0 and len(paths) > 1:
+            if self.reportLoaderPool is None:
+                self.reportLoaderPool = createSpawnPool(self.reportLoaderProcesses)
+            digests = self.reportLoaderPool.imap(digestJobReport, paths, self.reportLoaderChunkSize)
+        else:
+            digests = (digestJobReport(path) for path in paths)
+        return zip(jobs, digests)
 
-        jobReport = Report()
+    def prefetchJobInfo(self, jobIDs):
+        """
+        _prefetchJobInfo_
 
-        try:
-            jobReport.load(jobReportPath)
-        except UnicodeDecodeError:
-            logging.error("Hit UnicodeDecodeError exception while loading jobReport: %s", jobReportPath)
-            return self.createMissingFWKJR(99997, 'Found undecodable data in jobReport: {}'.format(jobReportPath))
-        except Exception as ex:
-            msg = "Error loading jobReport: {}\nDetails: {}".format(jobReportPath, str(ex))
-            logging.error(msg)
-            return self.createMissingFWKJR(99997, 'Cannot load jobReport')
+        Retrieve the type and the output map of all the jobs with two bulk
+        queries, instead of two queries per job.
+        """
+        if not jobIDs:
+            return
+        for row in self.getJobTypeAction.execute(jobID=list(jobIDs),
+                                                 conn=self.getDBConn(),
+                                                 transaction=self.existingTransaction()):
+            self.jobTypes[row["id"]] = row["type"]
+        self.outputMaps = self.getOutputMapAction.execute(jobID=list(jobIDs),
+                                                          conn=self.getDBConn(),
+                                                          transaction=self.existingTransaction())
+        return
 
-        if not jobReport.listSteps():
-            logging.error("FwkJobReport with no steps: %s", jobReportPath)
-            return self.createMissingFWKJR(99997, 'jobReport with no steps: %s ' % jobReportPath)
+    def loadJobReport(self, jobReportPath):
+        """
+        _loadJobReport_
 
-        return jobReport
+        Given a framework job report on disk, load it and return a
+        FwkJobReport instance.  If there is any problem loading or parsing the
+        framework job report return None.
+        """
+        return loadJobReport(jobReportPath)
 
     def isTaskExistInFWJR(self, jobReport, jobStatus):
         """
@@ -221,16 +328,33 @@ class AccountantWorker(WMConnectionBase):
         """
         returnList = []
         self.reset()
+        startTime = time.time()
+        stageTimes = {"prefetch": 0.0, "loadWait": 0.0, "load": 0.0, "handle": 0.0, "database": 0.0}
+
+        # start loading the reports while retrieving the job information
+        reports = self.loadJobReports(parameters)
+        self.prefetchJobInfo([job["id"] for job in parameters])
+        stageTimes["prefetch"] = time.time() - startTime
+
+        while True:
+            stageStart = time.time()
+            try:
+                job, digest = next(reports)
+            except StopIteration:
+                break
+            stageTimes["loadWait"] += time.time() - stageStart
+            stageTimes["load"] += digest["loadTime"]
 
-        for job in parameters:
+            stageStart = time.time()
             logging.info("Handling %s", job["fwjr_path"])
 
-            # Load the job and set the ID
-            fwkJobReport = self.loadJobReport(job["fwjr_path"])
+            # Set the ID on the loaded job report
+            fwkJobReport = digest["fwjr"]
             fwkJobReport.setJobID(job['id'])
 
             jobSuccess = self.handleJob(jobID=job["id"],
-                                        fwkJobReport=fwkJobReport)
+                                        fwkJobReport=fwkJobReport,
+                                        digest=digest)
 
             if self.returnJobReport:
                 returnList.append({'id': job["id"], 'jobSuccess': jobSuccess,
@@ -239,7 +363,9 @@ class AccountantWorker(WMConnectionBase):
                 returnList.append({'id': job["id"], 'jobSuccess': jobSuccess})
 
             self.count += 1
+            stageTimes["handle"] += time.time() - stageStart
 
+        stageStart = time.time()
         existingTransaction = self.beginTransaction()
 
         # Now things done at the end of the job
@@ -300,6 +426,14 @@ class AccountantWorker(WMConnectionBase):
 
         self.commitTransaction(existingTransaction)
 
+        stageTimes["database"] = time.time() - stageStart
+        stageTimes["total"] = time.time() - startTime
+        self.stageTimes = stageTimes
+        logging.info("Accounted %d jobs in %.2f secs: job info prefetch %.2f secs, waiting for reports %.2f secs "
+                     "(%.2f secs loading them), handling jobs %.2f secs, bulk database updates %.2f secs",
+                     len(returnList), stageTimes["total"], stageTimes["prefetch"], stageTimes["loadWait"],
+                     stageTimes["load"], stageTimes["handle"], stageTimes["database"])
+
         return returnList
 
     def outputFilesetsForJob(self, outputMap, merged, moduleLabel, datatier):
@@ -434,27 +568,43 @@ class AccountantWorker(WMConnectionBase):
 
         return wmbsFile
 
-    def handleJob(self, jobID, fwkJobReport):
+    def handleJob(self, jobID, fwkJobReport, digest=None):
         """
         _handleJob_
 
         Figure out if a job was successful or not, handle it appropriately
-        (parse FWJR, update WMBS) and return the success status as a boolean
-
+        (parse FWJR, update WMBS) and return the success status as a boolean.
+        The report content can be provided already digested (see digestJobReport),
+        the job type and output map are taken from the pre-fetched ones if available.
         """
-        jobSuccess = fwkJobReport.taskSuccessful()
+        if digest is None:
+            digest = {"jobSuccess": fwkJobReport.taskSuccessful()}
+        jobSuccess = digest["jobSuccess"]
         logging.info("Task successful: %s", jobSuccess)
 
-        outputMap = self.getOutputMapAction.execute(jobID=jobID,
+        if jobID in self.outputMaps:
+            outputMap = self.outputMaps[jobID]
+        else:
+            outputMap = self.getOutputMapAction.execute(jobID=jobID,
+                                                        conn=self.getDBConn(),
+                                                        transaction=self.existingTransaction())
+
+        if jobID in self.jobTypes:
+            jobType = self.jobTypes[jobID]
+        else:
+            jobType = self.getJobTypeAction.execute(jobID=jobID,
                                                     conn=self.getDBConn(),
                                                     transaction=self.existingTransaction())
 
-        jobType = self.getJobTypeAction.execute(jobID=jobID,
-                                                conn=self.getDBConn(),
-                                                transaction=self.existingTransaction())
+        def logArchFiles():
+            if digest.get("logArchFiles") is not None:
+                return digest["logArchFiles"]
+            return fwkJobReport.getAllFilesFromStep(step='logArch1')
 
         if jobSuccess:
-            fileList = fwkJobReport.getAllFiles()
+            fileList = digest.get("files")
+            if fileList is None:
+                fileList = fwkJobReport.getAllFiles()
 
             # Consistency check comparing outputMap to fileList
             # they should match except for some limited special cases related to Tier-0:
@@ -494,9 +644,9 @@ class AccountantWorker(WMConnectionBase):
                     errMsg += f"but has FWJR output modules: {sorted(outputModules)}"
                     logging.error(errMsg)
                     # override file list by the logArch1 output only
-                    fileList = fwkJobReport.getAllFilesFromStep(step='logArch1')
+                    fileList = logArchFiles()
         else:
-            fileList = fwkJobReport.getAllFilesFromStep(step='logArch1')
+            fileList = logArchFiles()
 
         # Workaround: make sure every file has a valid location. See:
         # https://github.com/dmwm/WMCore/issues/9353 and https://github.com/dmwm/WMCore/issues/12092
@@ -506,7 +656,7 @@ class AccountantWorker(WMConnectionBase):
             if not fwjrFile.get("locations") and fwjrFile.get("lfn", "").endswith(".root"):
                 logging.warning("The following file does not have any location: %s", fwjrFile)
                 jobSuccess = False
-                fileList = fwkJobReport.getAllFilesFromStep(step='logArch1')
+                fileList = logArchFiles()
                 break
 
         if jobSuccess:
@@ -578,7 +728,9 @@ class AccountantWorker(WMConnectionBase):
             # Check if the job had any skipped files, put them in ACDC containers
             # We assume full file processing (no job masks)
             if jobSuccess:
-                skippedFiles = fwkJobReport.getAllSkippedFiles()
+                skippedFiles = digest.get("skippedFiles")
+                if skippedFiles is None:
+                    skippedFiles = fwkJobReport.getAllSkippedFiles()
                 if skippedFiles and jobType not in ['LogCollect', 'Cleanup']:
                     self.jobsWithSkippedFiles[jobID] = skippedFiles
 
@@ -637,10 +789,7 @@ class AccountantWorker(WMConnectionBase):
         Create a missing FWJR if the report can't be found by the code in the
         path location.
         """
-        report = Report()
-        report.addError("cmsRun1", errorCode, "MissingJobReport", errorDescription)
-        report.data.cmsRun1.status = "Failed"
-        return report
+        return createMissingFWKJR(errorCode, errorDescription)
 
     def createFilesInDBSBuffer(self):
         """
@@ -51,6 +51,16 @@ class JobAccountantPoller(BaseWorkerThread):
         self.getJobsAction = daoFactory(classname="Jobs.GetFWJRByState")
         return
 
+    def terminate(self, params):
+        """
+        _terminate_
+
+        Shut down the report loader processes of the accountant worker
+        """
+        self.accountantWorker.close()
+        BaseWorkerThread.terminate(self, params)
+        return
+
     @timeFunction
     def algorithm(self, parameters=None):
         """
@@ -4,12 +4,14 @@ The actual jobArchiver algorithm
 """
 from __future__ import division
 
+import concurrent.futures
 import logging
 import os
 import os.path
 import shutil
 import tarfile
 import threading
+import time
 
 from Utils.IteratorTools import grouper
 from Utils.Timers import timeFunction
@@ -24,6 +26,17 @@ from WMCore.WorkQueue.WorkQueueExceptions import WorkQueueNoMatchingElements
 from WMCore.WorkQueue.WorkQueueUtils import queueFromConfig
 from WMCore.WorkerThreads.BaseWorkerThread import BaseWorkerThread
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# tarfile write mode, archive extension and compression level of each codec
+ARCHIVE_CODECS = {"bz2": ("w:bz2", "tar.bz2", {"compresslevel": 9}),
+                  "gzip": ("w:gz", "tar.gz", {"compresslevel": 6}),
+                  "xz": ("w:xz", "tar.xz", {"preset": 6}),
+                  "zstd": ("w|", "tar.zst", {"level": 3})}
+
 
 class JobArchiverPollerException(WMException):
     """
@@ -33,6 +46,71 @@ class JobArchiverPollerException(WMException):
     """
 
 
+def writeJobArchive(archivePath, jobCaches, codec="bz2"):
+    """
+    _writeJobArchive_
+
+    Write the content of job cache directories, given as a list of
+    (job id, cache directory, file names) tuples, to a tarball compressed
+    with the given codec. The files of each job go under Job_<id>/.
+    Return the number of bytes archived.
+    """
+    mode, _, options = ARCHIVE_CODECS[codec]
+    with open(archivePath, 'wb') as archiveFile:
+        if codec == "zstd":
+            # tarfile can't compress with zstd, stream the tarball through a compressor
+            compressor = zstandard.ZstdCompressor(**options).stream_writer(archiveFile, closefd=False)
+            tarball = tarfile.open(fileobj=compressor, mode=mode)
+        else:
+            compressor = None
+            tarball = tarfile.open(fileobj=archiveFile, mode=mode, **options)
+        try:
+            with tarball:
+                for jobID, cacheDir, fileNames in jobCaches:
+                    for fileName in fileNames:
+                        fullFile = os.path.join(cacheDir, fileName)
+                        try:
+                            tarball.add(name=fullFile, arcname='Job_%i/%s' % (jobID, fileName))
+                        except IOError:
+                            logging.error('Cannot read %s, skipping', fullFile)
+                archivedBytes = sum(member.size for member in tarball.getmembers())
+        finally:
+            if compressor is not None:
+                compressor.close()
+    return archivedBytes
+
+
+def archiveJobCaches(archivePath, jobCaches, codec="bz2"):
+    """
+    _archiveJobCaches_
+
+    Archive job cache directories, given as a list of (job id, cache
+    directory, file names) tuples, to a tarball and remove them.
+    Return the number of bytes archived and the size of the tarball.
+    """
+    try:
+        archivedBytes = writeJobArchive(archivePath, jobCaches, codec)
+    except Exception as ex:
+        msg = "Exception while opening and adding to a tarfile\n"
+        msg += "Tarfile: %s\n" % archivePath
+        msg += str(ex)
+        logging.error(msg)
+        logging.debug("jobCaches: %s", jobCaches)
+        raise JobArchiverPollerException(msg)
+
+    for _, cacheDir, _ in jobCaches:
+        try:
+            shutil.rmtree('%s' % (cacheDir), ignore_errors=True)
+        except Exception as ex:
+            msg = "Error while removing the old cache dir.\n"
+            msg += "CacheDir: %s\n" % cacheDir
+            msg += str(ex)
+            logging.error(msg)
+            raise JobArchiverPollerException(msg)
+
+    return archivedBytes, os.path.getsize(archivePath)
+
+
 class JobArchiverPoller(BaseWorkerThread):
     """
     Polls for Error Conditions, handles them
@@ -57,6 +135,18 @@ class JobArchiverPoller(BaseWorkerThread):
                                              "numberOfJobsToCluster", 1000)
         self.numberOfJobsToArchive = getattr(self.config.JobArchiver,
                                              "numberOfJobsToArchive", 10000)
+        # number of threads writing the job archives, the codec used to compress
+        # them and whether jobs go to one archive per job cluster and cycle
+        self.archiveThreads = getattr(self.config.JobArchiver, "archiveThreads", 1)
+        self.archiveCodec = getattr(self.config.JobArchiver, "archiveCodec", "bz2")
+        self.clusterArchives = getattr(self.config.JobArchiver, "clusterArchives", False)
+        if self.archiveCodec not in ARCHIVE_CODECS:
+            msg = "Unknown archive codec %s, choose among %s" % (self.archiveCodec, sorted(ARCHIVE_CODECS))
+            logging.error(msg)
+            raise JobArchiverPollerException(msg)
+        if self.archiveCodec == "zstd" and zstandard is None:
+            logging.error("The zstandard module is not available, archiving the jobs with bz2 instead")
+            self.archiveCodec = "bz2"
 
         try:
             self.logDir = getattr(config.JobArchiver, 'logDir',
@@ -214,10 +304,45 @@ class JobArchiverPoller(BaseWorkerThread):
         Upon workQueue realizing that a subscriptions is done, everything
         regarding those jobs is cleaned up.
         """
+        startTime = time.time()
+        _, extension, _ = ARCHIVE_CODECS[self.archiveCodec]
 
+        # group the job caches by archive
+        archives = {}
         for job in doneList:
             # print "About to clean cache for job %i" % (job['id'])
-            self.cleanJobCache(job)
+            jobCache = self.cleanJobCache(job)
+            if jobCache is None:
+                continue
+            logDir, jobCacheInfo = jobCache
+            if self.clusterArchives:
+                archives.setdefault(logDir, []).append(jobCacheInfo)
+            else:
+                archives[os.path.join(logDir, 'Job_%i.%s' % (job['id'], extension))] = [jobCacheInfo]
+        if self.clusterArchives:
+            # one archive per job cluster, named after its first and last job
+            for logDir in list(archives):
+                jobCaches = sorted(archives.pop(logDir))
+                archiveName = 'Jobs_%i-%i.%s' % (jobCaches[0][0], jobCaches[-1][0], extension)
+                archives[os.path.join(logDir, archiveName)] = jobCaches
+
+        if self.archiveThreads > 1 and len(archives) > 1:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.archiveThreads) as executor:
+                futures = [executor.submit(archiveJobCaches, archivePath, jobCaches, self.archiveCodec)
+                           for archivePath, jobCaches in archives.items()]
+                results = [future.result() for future in futures]
+        else:
+            results = [archiveJobCaches(archivePath, jobCaches, self.archiveCodec)
+                       for archivePath, jobCaches in archives.items()]
+
+        numJobs = sum(len(jobCaches) for jobCaches in archives.values())
+        if numJobs:
+            elapsed = max(time.time() - startTime, 1e-6)
+            archivedMB = sum(result[0] for result in results) / (1024. * 1024.)
+            writtenMB = sum(result[1] for result in results) / (1024. * 1024.)
+            logging.info("Archived %d jobs in %d %s archives in %.1f secs: %.1f jobs/s, %.2f MB/s "
+                         "(%.1f MB compressed to %.1f MB)", numJobs, len(archives), self.archiveCodec,
+                         elapsed, numJobs / elapsed, archivedMB / elapsed, archivedMB, writtenMB)
 
         return
 
@@ -225,8 +350,9 @@ class JobArchiverPoller(BaseWorkerThread):
         """
         _cleanJobCache_
 
-        Clears out any files still sticking around in the jobCache,
-        tars up the contents and sends them off
+        Check the jobCache of a job and set up the final destination of its
+        archive. Return the archive directory and the (job id, cache directory,
+        file names) tuple to archive, or None if there is nothing to archive.
         """
 
         cacheDir = job['cache_dir']
@@ -234,13 +360,13 @@ class JobArchiverPoller(BaseWorkerThread):
         if not cacheDir or not os.path.isdir(cacheDir):
             msg = "Could not find jobCacheDir %s" % (cacheDir)
             logging.error(msg)
-            return
+            return None
 
         cacheDirList = os.listdir(cacheDir)
 
         if cacheDirList == []:
             os.rmdir(cacheDir)
-            return
+            return None
 
         # Now we need to set up a final destination
         try:
@@ -261,34 +387,7 @@ class JobArchiverPoller(BaseWorkerThread):
             logging.error(msg)
             raise JobArchiverPollerException(msg)
 
-        # Otherwise we have something in there
-        try:
-            tarName = 'Job_%i.tar.bz2' % (job['id'])
-            with tarfile.open(name=os.path.join(logDir, tarName), mode='w:bz2') as tarball:
-                for fileName in cacheDirList:
-                    fullFile = os.path.join(cacheDir, fileName)
-                    try:
-                        tarball.add(name=fullFile, arcname='Job_%i/%s' % (job['id'], fileName))
-                    except IOError:
-                        logging.error('Cannot read %s, skipping', fullFile)
-        except Exception as ex:
-            msg = "Exception while opening and adding to a tarfile\n"
-            msg += "Tarfile: %s\n" % os.path.join(logDir, tarName)
-            msg += str(ex)
-            logging.error(msg)
-            logging.debug("cacheDirList: %s", cacheDirList)
-            raise JobArchiverPollerException(msg)
-
-        try:
-            shutil.rmtree('%s' % (cacheDir), ignore_errors=True)
-        except Exception as ex:
-            msg = "Error while removing the old cache dir.\n"
-            msg += "CacheDir: %s\n" % cacheDir
-            msg += str(ex)
-            logging.error(msg)
-            raise JobArchiverPollerException(msg)
-
-        return
+        return logDir, (job['id'], cacheDir, cacheDirList)
 
     def markInjected(self):
         """
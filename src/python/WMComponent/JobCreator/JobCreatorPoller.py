@@ -11,15 +11,19 @@ import logging
 import os
 import os.path
 import threading
-import pickle
+from functools import partial
 
 from Utils.Timers import timeFunction
-from Utils.PythonVersion import HIGHEST_PICKLE_PROTOCOL
 from Utils.MathUtils import quantize
+from Utils.SpawnPool import createSpawnPool, closePool
 from Utils.wmcoreDTools import resetWatchdogTimer, moduleName
 from WMComponent.JobCreator.CreateWorkArea import CreateWorkArea
+from WMComponent.JobCreator.SharedJobMetadata import pickleJob, writeSharedMetadata
+from WMComponent.JobSubmitter.JobSubmitMetadata import writeSubmitMetadata
 from WMCore.WorkerThreads.BaseWorkerThread import BaseWorkerThread
 from WMCore.DAOFactory import DAOFactory
+from WMCore.DataStructs.JobGroup import JobGroup as DataStructsJobGroup
+from WMCore.DataStructs.Workflow import Workflow as DataStructsWorkflow
 from WMCore.WMException import WMException
 from WMCore.JobSplitting.Generators.GeneratorManager import GeneratorManager
 from WMCore.JobStateMachine.ChangeState import ChangeState
@@ -118,40 +122,49 @@ def capResourceEstimates(jobGroups, constraints):
     return
 
 
-def saveJob(job, thisJobNumber, **kwargs):
+def getSharedJobMetadata(work):
+    """
+    _getSharedJobMetadata_
+
+    Return the job attributes with the same value for all the jobs of a task
+    """
+    return {'spec': work.get('workflow').spec,
+            'task': work.get('wmTaskName'),
+            'sandbox': work.get('sandbox'),
+            'agentNumber': work['agentNumber'],
+            'agentName': work['agentName'],
+            'owner': work['owner'],
+            'ownerDN': work['ownerDN'],
+            'ownerGroup': work['ownerGroup'],
+            'ownerRole': work['ownerRole'],
+            'scramArch': work['scramArch'],
+            'swVersion': work['swVersion'],
+            'numberOfCores': work['numberOfCores'],
+            'inputDataset': work['inputDataset'],
+            'inputPileup': work['inputPileup'],
+            'allowOpportunistic': work['allowOpportunistic'],
+            'requiresGPU': work['requiresGPU'],
+            'gpuRequirements': work['gpuRequirements'],
+            'jobExtraMatchRequirements': work['jobExtraMatchRequirements'],
+            'requestType': work['requestType'],
+            'physicsTaskType': work['physicsTaskType'],
+            'campaignName': work['campaignName']}
+
+
+def saveJob(job, thisJobNumber, sharedMetadata=None, sharedMetadataFile=None, **kwargs):
     """
     _saveJob_
 
-    Actually do the mechanics of saving the job to a pickle file
+    Actually do the mechanics of saving the job to a pickle file.
+    If a shared metadata file is given, the task attributes are not
+    pickled again with the job, which only references that file.
     """
+    sharedMetadata = sharedMetadata or getSharedJobMetadata(kwargs)
     job['counter'] = thisJobNumber
-    job['spec'] = kwargs.get('workflow').spec
-    job['task'] = kwargs.get('wmTaskName')
-    job['sandbox'] = kwargs.get('sandbox')
-    job['agentNumber'] = kwargs['agentNumber']
-    job['agentName'] = kwargs['agentName']
-    cacheDir = job.getCache()
-    job['cache_dir'] = cacheDir
-    job['owner'] = kwargs['owner']
-    job['ownerDN'] = kwargs['ownerDN']
-    job['ownerGroup'] = kwargs['ownerGroup']
-    job['ownerRole'] = kwargs['ownerRole']
-    job['scramArch'] = kwargs['scramArch']
-    job['swVersion'] = kwargs['swVersion']
-    job['numberOfCores'] = kwargs['numberOfCores']
-    job['inputDataset'] = kwargs['inputDataset']
+    job.update(sharedMetadata)
     job['inputDatasetLocations'] = kwargs['inputDatasetLocations']
-    job['inputPileup'] = kwargs['inputPileup']
-    job['allowOpportunistic'] = kwargs['allowOpportunistic']
-    job['requiresGPU'] = kwargs['requiresGPU']
-    job['gpuRequirements'] = kwargs['gpuRequirements']
-    job['jobExtraMatchRequirements'] = kwargs['jobExtraMatchRequirements']
-    job['requestType'] = kwargs['requestType']
-    job['physicsTaskType'] = kwargs['physicsTaskType']
-    job['campaignName'] = kwargs['campaignName']
-
-    with open(os.path.join(cacheDir, 'job.pkl'), 'wb') as output:
-        pickle.dump(job, output, HIGHEST_PICKLE_PROTOCOL)
+
+    pickleJob(job, sharedMetadata, sharedMetadataFile)
 
     return
 
@@ -186,18 +199,86 @@ def creatorProcess(work, jobCacheDir):
                                    wmWorkload=wmWorkload,
                                    cache=False)
 
+        # task attributes are written once, in the task directory
+        sharedMetadata = getSharedJobMetadata(work)
+        sharedMetadataFile = None
+        if work.get('shareJobMetadata', True) and wmbsJobGroup.jobs:
+            taskDir = os.path.dirname(os.path.dirname(wmbsJobGroup.jobs[0]['cache_dir']))
+            sharedMetadataFile = writeSharedMetadata(taskDir, sharedMetadata)
+
         thisJobNumber = work.get('jobNumber', 0)
         for job in wmbsJobGroup.jobs:
             thisJobNumber += 1
-            saveJob(job, thisJobNumber, **work)
+            saveJob(job, thisJobNumber, sharedMetadata=sharedMetadata,
+                    sharedMetadataFile=sharedMetadataFile, **work)
     except Exception as ex:
         msg = "Exception in processing wmbsJobGroup %i\n. Error: %s" % (wmbsJobGroup.id, str(ex))
         logging.exception(msg)
         raise JobCreatorException(msg)
 
+    try:
+        writeSubmitMetadata(wmbsJobGroup.jobs)
+    except Exception as ex:
+        # not fatal, the JobSubmitter falls back to the job pickle files
+        logging.warning("Failed to write the submit metadata of wmbsJobGroup %i. Error: %s",
+                        wmbsJobGroup.id, str(ex))
+
     return wmbsJobGroup
 
 
+def poolCreatorProcess(work, jobCacheDir):
+    """
+    _poolCreatorProcess_
+
+    Run creatorProcess in a creator pool process. Return a (jobGroup, error)
+    tuple, since the JobCreatorException can't go back through the pool.
+    """
+    try:
+        return creatorProcess(work, jobCacheDir), None
+    except Exception as ex:
+        return None, str(ex)
+
+
+def detachedCopy(wmbsObject):
+    """
+    _detachedCopy_
+
+    Make a shallow copy of a WMBS object (e.g. a Job or a File) without its
+    database connection, to be pickled instead of the original one: pickling
+    a WMBS object drops the database connection of the pickled object itself.
+    """
+    objectCopy = wmbsObject.__class__.__new__(wmbsObject.__class__)
+    objectCopy.__dict__.update(wmbsObject.__dict__)
+    objectCopy.update(wmbsObject)
+    objectCopy.dbi = None
+    objectCopy.logger = None
+    objectCopy.daofactory = None
+    return objectCopy
+
+
+def copyJobGroup(wmbsJobGroup):
+    """
+    _copyJobGroup_
+
+    Make a copy of a WMBS job group to be sent to a creator pool process.
+    The job group itself is a DataStructs one, while its jobs and their input
+    files are detached copies of the WMBS ones, such that the creator process
+    pickles the same job objects as the in-process creator.
+    """
+    def copyFile(wmbsFile):
+        fileCopy = detachedCopy(wmbsFile)
+        fileCopy['parents'] = set(copyFile(parent) for parent in wmbsFile.get('parents', set()))
+        return fileCopy
+
+    jobGroup = DataStructsJobGroup()
+    jobGroup.id = wmbsJobGroup.id
+    for wmbsJob in wmbsJobGroup.jobs:
+        job = detachedCopy(wmbsJob)
+        job['input_files'] = [copyFile(wmbsFile) for wmbsFile in wmbsJob['input_files']]
+        jobGroup.jobs.append(job)
+    return jobGroup
+
+
 # This is the code for the multiprocessing based creator
 # It's kept around so I can remember how I arranged the exception tree
 # Keep this until we make a decision about large-scale transactions
@@ -337,6 +418,10 @@ class JobCreatorPoller(BaseWorkerThread):
         self.agentNumber = int(getattr(config.Agent, 'agentNumber', 0))
         self.agentName = getattr(config.Agent, 'hostName', '')
         self.glideinLimits = getattr(config.JobCreator, 'GlideInRestriction', None)
+        # number of processes creating the job work areas, 0 to create them in this process
+        self.creatorProcesses = getattr(config.JobCreator, 'creatorProcesses', 0)
+        self.shareJobMetadata = getattr(config.JobCreator, 'shareJobMetadata', True)
+        self.creatorPool = None
 
         try:
             self.jobCacheDir = getattr(config.JobCreator, 'jobCacheDir',
@@ -412,6 +497,54 @@ class JobCreatorPoller(BaseWorkerThread):
         """
         logging.debug("terminating. doing one more pass before we die")
         self.algorithm(params)
+        self.close()
+
+    def close(self):
+        """
+        _close_
+
+        Shut down the creator processes, if any.
+        """
+        self.creatorPool = closePool(self.creatorPool)
+        return
+
+    def createWorkAreas(self, works):
+        """
+        _createWorkAreas_
+
+        Run creatorProcess for each work (one per job group) and return the
+        job groups, in the same order. When creator processes are configured,
+        the job groups are processed in parallel, and the attributes set by the
+        creator processes are copied back to the jobs of the given job groups.
+        """
+        if self.creatorProcesses <= 0 or len(works) <= 1:
+            return [creatorProcess(work=work, jobCacheDir=self.jobCacheDir) for work in works]
+
+        if self.creatorPool is None:
+            self.creatorPool = createSpawnPool(self.creatorProcesses)
+        # pickling the WMBS objects would drop their database connection, send copies
+        # without it instead. The creator processes only need the workflow spec and task, and
+        # the workload name out of the workload.
+        poolWorks = []
+        for work in works:
+            workflow = work['workflow']
+            poolWork = dict(work)
+            poolWork['workflow'] = DataStructsWorkflow(spec=workflow.spec, name=workflow.name, task=workflow.task)
+            poolWork['wmWorkload'] = WMWorkloadHelper(WMWorkload(work['wmWorkload'].name()))
+            poolWork['jobGroup'] = copyJobGroup(work['jobGroup'])
+            poolWorks.append(poolWork)
+
+        jobGroups = []
+        poolResults = self.creatorPool.imap(partial(poolCreatorProcess, jobCacheDir=self.jobCacheDir), poolWorks)
+        for work, (jobGroup, error) in zip(works, poolResults):
+            if error is not None:
+                raise JobCreatorException(error)
+            wmbsJobGroup = work['jobGroup']
+            for wmbsJob, job in zip(wmbsJobGroup.jobs, jobGroup.jobs):
+                job.pop('input_files', None)
+                wmbsJob.update(job)
+            jobGroups.append(wmbsJobGroup)
+        return jobGroups
 
     def pollSubscriptions(self):
         """
@@ -560,22 +693,24 @@ class JobCreatorPoller(BaseWorkerThread):
                 if self.glideinLimits:
                     capResourceEstimates(wmbsJobGroups, self.glideinLimits)
 
-                nameDictList = []
+                works = []
                 for wmbsJobGroup in wmbsJobGroups:
                     # For each jobGroup, put a dictionary
                     # together and run it with creatorProcess
-                    jobsInGroup = len(wmbsJobGroup.jobs)
                     wmbsJobGroup.subscription = tempSubscription
                     tempDict = {}
                     tempDict.update(processDict)
                     tempDict['jobGroup'] = wmbsJobGroup
                     tempDict['jobNumber'] = jobNumber
                     tempDict['inputDatasetLocations'] = wmbsJobGroup.getLocationsForJobs()
+                    tempDict['shareJobMetadata'] = self.shareJobMetadata
+                    works.append(tempDict)
+                    jobNumber += len(wmbsJobGroup.jobs)
 
-                    jobGroup = creatorProcess(work=tempDict,
-                                              jobCacheDir=self.jobCacheDir)
-                    jobNumber += jobsInGroup
+                wmbsJobGroups = self.createWorkAreas(works)
 
+                nameDictList = []
+                for jobGroup in wmbsJobGroups:
                     # Set jobCache for group
                     for job in jobGroup.jobs:
                         nameDictList.append({'jobid': job['id'],
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""
+_SharedJobMetadata_
+
+Job information shared by all the jobs of a workflow task (owner, software,
+sandbox, pileup, etc.) is written once per task to the task directory of
+the job cache, instead of being pickled again with every single job object.
+The job pickles only reference the shared metadata file, and loadJob puts
+the full job object back together.
+
+Shared metadata files are named after a digest of their content, so a task
+whose metadata changes over time (e.g. a new pileup configuration) simply
+gets a new file, while the jobs created before keep referencing the old one.
+"""
+
+import hashlib
+import os
+import pickle
+
+from Utils.PythonVersion import HIGHEST_PICKLE_PROTOCOL
+
+# job attribute with the path to the shared metadata file
+SHARED_METADATA_KEY = "sharedMetadataFile"
+
+
+def writeSharedMetadata(taskDir, metadata):
+    """
+    _writeSharedMetadata_
+
+    Write the shared job metadata of a task, unless an identical file is
+    already there, and return its path.
+    """
+    data = pickle.dumps(metadata, HIGHEST_PICKLE_PROTOCOL)
+    metadataPath = os.path.join(taskDir, "JobMetadata_%s.pkl" % hashlib.sha1(data).hexdigest()[:16])
+    if not os.path.exists(metadataPath):
+        # write and rename, such that a file is never read half written
+        tmpPath = "%s.%i.tmp" % (metadataPath, os.getpid())
+        with open(tmpPath, 'wb') as output:
+            output.write(data)
+        os.replace(tmpPath, metadataPath)
+    return metadataPath
+
+
+def pickleJob(job, metadata=None, metadataPath=None):
+    """
+    _pickleJob_
+
+    Pickle a job object to its cache directory. If the shared metadata (as
+    written by writeSharedMetadata) and its file are given, the shared fields
+    are left out of the pickle and replaced by a reference to that file (the
+    job object itself is left untouched).
+    """
+    shared = {}
+    if metadataPath:
+        for field in metadata:
+            shared[field] = job.pop(field, None)
+        job[SHARED_METADATA_KEY] = metadataPath
+    try:
+        with open(os.path.join(job['cache_dir'], 'job.pkl'), 'wb') as output:
+            pickle.dump(job, output, HIGHEST_PICKLE_PROTOCOL)
+    finally:
+        if metadataPath:
+            del job[SHARED_METADATA_KEY]
+            job.update(shared)
+    return
+
+
+def loadJob(pickledJobPath, metadataCache=None):
+    """
+    _loadJob_
+
+    Load a job pickle and fill in the shared task metadata it references,
+    if any. Shared metadata files are kept in metadataCache (a dictionary
+    keyed by their path), if given, to load each of them only once.
+    """
+    with open(pickledJobPath, 'rb') as jobHandle:
+        job = pickle.load(jobHandle)
+
+    metadataPath = job.pop(SHARED_METADATA_KEY, None)
+    if metadataPath:
+        if metadataCache is not None and metadataPath in metadataCache:
+            metadata = metadataCache[metadataPath]
+        else:
+            with open(metadataPath, 'rb') as metadataHandle:
+                metadata = pickle.load(metadataHandle)
+            if metadataCache is not None:
+                metadataCache[metadataPath] = metadata
+        job.update(metadata)
+    return job
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""
+_JobPriorityBuckets_
+
+Index of the jobs cached by the JobSubmitter, kept across polling cycles.
+
+Jobs are grouped by their final priority and, within a priority, in buckets
+of jobs with the same task type and possible sites. Since all the jobs in a
+bucket go through the same submit conditions, the JobSubmitter can stop
+looking at a whole bucket as soon as one of its jobs can't be submitted.
+Job ids are kept sorted (the oldest job first) within every bucket.
+"""
+
+from bisect import bisect_left, insort
+
+
+class JobPriorityBuckets(object):
+    """
+    _JobPriorityBuckets_
+
+    Jobs indexed by priority and by (task type, possible sites) bucket
+    """
+
+    def __init__(self):
+        self._buckets = {}  # priority -> {bucket key: sorted list of job ids}
+        self._jobKeys = {}  # job id -> (priority, bucket key)
+        self._priorities = []  # sorted from the highest priority
+
+    def __len__(self):
+        return len(self._jobKeys)
+
+    def __contains__(self, jobID):
+        return jobID in self._jobKeys
+
+    def clear(self):
+        """
+        Remove all the jobs
+        """
+        self._buckets = {}
+        self._jobKeys = {}
+        self._priorities = []
+
+    def add(self, jobID, priority, bucketKey):
+        """
+        Add a job with a given priority to a bucket (a hashable key)
+        """
+        if jobID in self._jobKeys:
+            self.discard([jobID])
+        if priority not in self._buckets:
+            self._buckets[priority] = {}
+            # priorities are stored negated to keep the list in ascending order
+            insort(self._priorities, -priority)
+        jobIDs = self._buckets[priority].setdefault(bucketKey, [])
+        # new jobs usually come with increasing ids
+        if not jobIDs or jobID > jobIDs[-1]:
+            jobIDs.append(jobID)
+        else:
+            insort(jobIDs, jobID)
+        self._jobKeys[jobID] = (priority, bucketKey)
+
+    def discard(self, jobIDs):
+        """
+        Remove the given jobs, ignoring the ones that are not indexed
+        """
+        removeByBucket = {}
+        for jobID in jobIDs:
+            keys = self._jobKeys.pop(jobID, None)
+            if keys is not None:
+                removeByBucket.setdefault(keys, set()).add(jobID)
+
+        for (priority, bucketKey), removeIDs in removeByBucket.items():
+            buckets = self._buckets[priority]
+            if len(removeIDs) == 1:
+                jobIDs = buckets[bucketKey]
+                del jobIDs[bisect_left(jobIDs, next(iter(removeIDs)))]
+            else:
+                buckets[bucketKey] = [jobID for jobID in buckets[bucketKey] if jobID not in removeIDs]
+            if not buckets[bucketKey]:
+                del buckets[bucketKey]
+            if not buckets:
+                del self._buckets[priority]
+                del self._priorities[bisect_left(self._priorities, -priority)]
+
+    def priorities(self):
+        """
+        Return the priorities with jobs, from the highest
+        """
+        return [-priority for priority in self._priorities]
+
+    def buckets(self, priority):
+        """
+        Return the {bucket key: sorted list of job ids} dictionary of a priority.
+        The lists must not be modified, use discard to remove jobs.
+        """
+        return self._buckets.get(priority, {})
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""
+_JobSubmitMetadata_
+
+Compact record of the job information needed by the JobSubmitter to cache
+and schedule the jobs, written by the JobCreator next to the job pickles.
+
+There is one record per job collection directory (i.e. for up to 1000 jobs
+of the same job group), such that the JobSubmitter can retrieve the
+information of many jobs with a single small file read, deferring the full
+job deserialization to the moment the job is actually submitted. Values
+shared by all the jobs in a collection are only stored once.
+"""
+
+import json
+import logging
+import os
+
+SUBMIT_METADATA_FILE = "JobSubmitMetadata.json"
+SUBMIT_METADATA_VERSION = 1
+
+# job attributes used by the JobSubmitter before the job submission
+SUBMIT_METADATA_FIELDS = ("possiblePSN", "fileLocations", "siteWhitelist", "siteBlacklist",
+                          "taskType", "sandbox", "ownerDN", "ownerGroup", "ownerRole",
+                          "scramArch", "swVersion", "proxyPath", "estimatedJobTime",
+                          "estimatedDiskUsage", "estimatedMemoryUsage", "numberOfCores",
+                          "inputDataset", "inputDatasetLocations", "inputPileup",
+                          "allowOpportunistic", "requiresGPU", "gpuRequirements",
+                          "jobExtraMatchRequirements", "campaignName", "requestType",
+                          "physicsTaskType")
+
+
+def _jsonDefault(obj):
+    """
+    Serialize the sets (e.g. possiblePSN) as sorted lists
+    """
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    raise TypeError("Object of type %s is not JSON serializable" % type(obj).__name__)
+
+
+def getSubmitMetadata(job):
+    """
+    _getSubmitMetadata_
+
+    Extract from a job object the information needed by the JobSubmitter
+    """
+    metadata = dict((field, job[field]) for field in SUBMIT_METADATA_FIELDS if field in job)
+
+    # allow job baggage to override numberOfCores
+    #       => used for repacking to get more slots/disk
+    numberOfCores = job.get('numberOfCores', 1)
+    if numberOfCores == 1:
+        baggage = job.getBaggage()
+        numberOfCores = getattr(baggage, "numberOfCores", 1)
+    metadata['numberOfCores'] = numberOfCores
+    return metadata
+
+
+def readSubmitMetadata(collectionDir):
+    """
+    _readSubmitMetadata_
+
+    Read the submit metadata record of a job collection directory and return
+    a dictionary of job metadata keyed by the job id. An empty dictionary is
+    returned if there is no (usable) record.
+    """
+    metadataPath = os.path.join(collectionDir, SUBMIT_METADATA_FILE)
+    try:
+        with open(metadataPath, 'r') as fd:
+            record = json.load(fd)
+    except (IOError, OSError):
+        return {}
+    except ValueError as ex:
+        logging.warning("Failed to decode submit metadata %s. Error: %s", metadataPath, str(ex))
+        return {}
+    if record.get("version") != SUBMIT_METADATA_VERSION:
+        logging.warning("Unsupported submit metadata version %s in %s", record.get("version"), metadataPath)
+        return {}
+
+    jobsMetadata = {}
+    for jobID, jobMetadata in record["jobs"].items():
+        metadata = dict(record["common"])
+        metadata.update(jobMetadata)
+        jobsMetadata[int(jobID)] = metadata
+    return jobsMetadata
+
+
+def writeSubmitMetadata(jobs):
+    """
+    _writeSubmitMetadata_
+
+    Write the submit metadata of a list of jobs, with one record per job
+    collection directory (merged with any existing record). Return the
+    number of records written.
+    """
+    jobsByDir = {}
+    for job in jobs:
+        jobsByDir.setdefault(os.path.dirname(job['cache_dir']), []).append(job)
+
+    for collectionDir, collectionJobs in jobsByDir.items():
+        jobsMetadata = readSubmitMetadata(collectionDir)
+        for job in collectionJobs:
+            jobsMetadata[job['id']] = getSubmitMetadata(job)
+
+        # values shared by all the jobs are only stored once
+        common = {}
+        firstMetadata = next(iter(jobsMetadata.values()))
+        for field, value in firstMetadata.items():
+            if all(field in metadata and metadata[field] == value for metadata in jobsMetadata.values()):
+                common[field] = value
+        record = {"version": SUBMIT_METADATA_VERSION,
+                  "common": common,
+                  "jobs": {}}
+        for jobID, metadata in jobsMetadata.items():
+            record["jobs"][str(jobID)] = dict((field, value) for field, value in metadata.items()
+                                              if field not in common)
+
+        # write and rename, such that a record is never read half written
+        metadataPath = os.path.join(collectionDir, SUBMIT_METADATA_FILE)
+        with open(metadataPath + ".tmp", 'w') as fd:
+            json.dump(record, fd, default=_jsonDefault, separators=(',', ':'))
+        os.replace(metadataPath + ".tmp", metadataPath)
+
+    return len(jobsByDir)
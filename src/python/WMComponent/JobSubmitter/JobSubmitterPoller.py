@@ -11,13 +11,13 @@ from __future__ import print_function, division
 from builtins import range
 from future.utils import viewitems
 
+import heapq
 import logging
 import os.path
 import threading
 import json
 import time
 from collections import defaultdict, Counter
-import pickle
 
 from Utils.Timers import timeFunction
 from Utils.wmcoreDTools import resetWatchdogTimer, moduleName
@@ -35,7 +35,10 @@ from WMCore.Services.ReqMgr.ReqMgr import ReqMgr
 from WMCore.Services.ReqMgrAux.ReqMgrAux import ReqMgrAux
 from WMCore.Services.TagCollector.TagCollector import TagCollector
 
+from WMComponent.JobCreator.SharedJobMetadata import loadJob
+from WMComponent.JobSubmitter.JobPriorityBuckets import JobPriorityBuckets
 from WMComponent.JobSubmitter.JobSubmitAPI import availableScheddSlots
+from WMComponent.JobSubmitter.JobSubmitMetadata import getSubmitMetadata, readSubmitMetadata
 
 
 def jobSubmitCondition(jobStats):
@@ -96,7 +99,7 @@ class JobSubmitterPoller(BaseWorkerThread):
         self.enableAllSites = False
 
         # Additions for caching-based JobSubmitter
-        self.jobsByPrio = {}  # key'ed by the final job priority, which contains a set of job ids
+        self.jobsByPrio = JobPriorityBuckets()  # job ids by final job priority and (task type, possible sites)
         self.jobDataCache = {}  # key'ed by the job id, containing the whole job info dict
         self.jobsToPackage = {}
         self.locationDict = {}
@@ -264,8 +267,10 @@ class JobSubmitterPoller(BaseWorkerThread):
 
         Query WMBS for all jobs in the 'created' state.  For all jobs returned
         from the query, check if they already exist in the cache.  If they
-        don't, unpickle them and combine their site white and black list with
-        the list of locations they can run at.  Add them to the cache.
+        don't, load their submit metadata (written by the JobCreator, or taken
+        from the job pickle for jobs without it) and combine their site white
+        and black list with the list of locations they can run at.  Add them
+        to the cache. The job objects are only unpickled when submitted.
 
         Each entry in the cache is a tuple with five items:
           - WMBS Job ID
@@ -276,9 +281,14 @@ class JobSubmitterPoller(BaseWorkerThread):
         """
         # make a counter for jobs pending to sites in drain mode within the grace period
         countDrainingJobs = 0
-        timeNow = int(time.time())
+        startTime = time.time()
+        timeNow = int(startTime)
         badJobs = dict([(x, []) for x in range(71101, 71106)])
         newJobIds = set()
+        # submit metadata records, keyed by job collection directory
+        metadataByDir = {}
+        metadataCache = {}
+        countFromMetadata = countFromPickle = 0
 
         logging.info("Refreshing priority cache with currently %i jobs", len(self.jobDataCache))
 
@@ -311,23 +321,22 @@ class JobSubmitterPoller(BaseWorkerThread):
             if jobID in self.jobDataCache:
                 continue
 
-            pickledJobPath = os.path.join(newJob["cache_dir"], "job.pkl")
-
-            if not os.path.isfile(pickledJobPath):
-                # Then we have a problem - there's no file
-                logging.warning("Could not find pickled jobObject %s", pickledJobPath)
-                badJobs[71104].append(newJob)
-                continue
-            try:
-                with open(pickledJobPath, 'rb') as jobHandle:
-                    loadedJob = pickle.load(jobHandle)
-            except Exception as ex:
-                logging.warning("Failed to load job pickle object %s", pickledJobPath)
-                badJobs[71105].append(newJob)
-                continue
+            collectionDir = os.path.dirname(newJob["cache_dir"])
+            if collectionDir not in metadataByDir:
+                metadataByDir[collectionDir] = readSubmitMetadata(collectionDir)
+            jobMetadata = metadataByDir[collectionDir].get(jobID)
+            if jobMetadata is not None:
+                countFromMetadata += 1
+            else:
+                # jobs created without submit metadata
+                loadedJob = self.loadJobPickle(newJob, badJobs, metadataCache)
+                if loadedJob is None:
+                    continue
+                jobMetadata = getSubmitMetadata(loadedJob)
+                countFromPickle += 1
 
             # figure out possible locations for job
-            possibleLocations = loadedJob["possiblePSN"]
+            possibleLocations = jobMetadata["possiblePSN"]
 
             # Create another set of locations that may change when a site goes white/black listed
             # Does not care about the non_draining or aborted sites, they may change and that is the point
@@ -336,9 +345,9 @@ class JobSubmitterPoller(BaseWorkerThread):
 
             # check if there is at least one site left to run the job
             if len(possibleLocations) == 0:
-                newJob['fileLocations'] = loadedJob.get('fileLocations', [])
-                newJob['siteWhitelist'] = loadedJob.get('siteWhitelist', [])
-                newJob['siteBlacklist'] = loadedJob.get('siteBlacklist', [])
+                newJob['fileLocations'] = jobMetadata.get('fileLocations', [])
+                newJob['siteWhitelist'] = jobMetadata.get('siteWhitelist', [])
+                newJob['siteBlacklist'] = jobMetadata.get('siteBlacklist', [])
                 logging.warning("Input data location doesn't pass the site restrictions for job id: %s", jobID)
                 badJobs[71101].append(newJob)
                 continue
@@ -371,52 +380,39 @@ class JobSubmitterPoller(BaseWorkerThread):
                         countDrainingJobs += 1
                         continue
 
-            # Sigh...make sure the job added to the package has the proper retry_count
-            loadedJob['retry_count'] = newJob['retry_count']
-            batchDir = self.addJobsToPackage(loadedJob)
-
             # calculate the final job priority such that we can order cached jobs by prio
             jobPrio = newJob['task_prio'] * self.maxTaskPriority + newJob['wf_priority']
-            self.jobsByPrio.setdefault(jobPrio, set())
-            self.jobsByPrio[jobPrio].add(jobID)
-
-            # allow job baggage to override numberOfCores
-            #       => used for repacking to get more slots/disk
-            numberOfCores = loadedJob.get('numberOfCores', 1)
-            if numberOfCores == 1:
-                baggage = loadedJob.getBaggage()
-                numberOfCores = getattr(baggage, "numberOfCores", 1)
-            loadedJob['numberOfCores'] = numberOfCores
+            self.jobsByPrio.add(jobID, jobPrio, (newJob['task_type'], frozenset(possibleLocations)))
 
             # Create a job dictionary object and put it in the cache (needs to be in sync with RunJob)
             jobInfo = {'taskPriority': newJob['task_prio'],
-                       'activity': loadedJob.get("taskType"),
+                       'activity': jobMetadata.get("taskType"),
                        'custom': {'location': None},  # update later
-                       'packageDir': batchDir,
+                       'packageDir': None,  # set when the job is packaged for submission
                        'retry_count': newJob["retry_count"],
-                       'sandbox': loadedJob["sandbox"],  # remove before submit
-                       'userdn': loadedJob.get("ownerDN", None),
-                       'usergroup': loadedJob.get("ownerGroup", ''),
-                       'userrole': loadedJob.get("ownerRole", ''),
+                       'sandbox': jobMetadata["sandbox"],  # remove before submit
+                       'userdn': jobMetadata.get("ownerDN", None),
+                       'usergroup': jobMetadata.get("ownerGroup", ''),
+                       'userrole': jobMetadata.get("ownerRole", ''),
                        'possibleSites': frozenset(possibleLocations),  # abort and drain sites filtered out
                        'potentialSites': frozenset(potentialLocations),  # original list of sites
-                       'scramArch': loadedJob.get("scramArch", None),
-                       'swVersion': loadedJob.get("swVersion", []),
-                       'proxyPath': loadedJob.get("proxyPath", None),
-                       'estimatedJobTime': loadedJob.get("estimatedJobTime", None),
-                       'estimatedDiskUsage': loadedJob.get("estimatedDiskUsage", None),
-                       'estimatedMemoryUsage': loadedJob.get("estimatedMemoryUsage", None),
-                       'numberOfCores': loadedJob.get("numberOfCores"),  # may update it later
-                       'inputDataset': loadedJob.get('inputDataset', None),
-                       'inputDatasetLocations': loadedJob.get('inputDatasetLocations', None),
-                       'inputPileup': loadedJob.get('inputPileup', None),
-                       'allowOpportunistic': loadedJob.get('allowOpportunistic', False),
-                       'requiresGPU': loadedJob.get('requiresGPU', "forbidden"),
-                       'gpuRequirements': loadedJob.get('gpuRequirements', None),
-                       'jobExtraMatchRequirements': loadedJob.get('jobExtraMatchRequirements', ""),
-                       'campaignName': loadedJob.get('campaignName', None),
-                       'requestType': loadedJob['requestType'],
-                       'physicsTaskType': loadedJob.get('physicsTaskType', None)
+                       'scramArch': jobMetadata.get("scramArch", None),
+                       'swVersion': jobMetadata.get("swVersion", []),
+                       'proxyPath': jobMetadata.get("proxyPath", None),
+                       'estimatedJobTime': jobMetadata.get("estimatedJobTime", None),
+                       'estimatedDiskUsage': jobMetadata.get("estimatedDiskUsage", None),
+                       'estimatedMemoryUsage': jobMetadata.get("estimatedMemoryUsage", None),
+                       'numberOfCores': jobMetadata.get("numberOfCores"),  # baggage override included
+                       'inputDataset': jobMetadata.get('inputDataset', None),
+                       'inputDatasetLocations': jobMetadata.get('inputDatasetLocations', None),
+                       'inputPileup': jobMetadata.get('inputPileup', None),
+                       'allowOpportunistic': jobMetadata.get('allowOpportunistic', False),
+                       'requiresGPU': jobMetadata.get('requiresGPU', "forbidden"),
+                       'gpuRequirements': jobMetadata.get('gpuRequirements', None),
+                       'jobExtraMatchRequirements': jobMetadata.get('jobExtraMatchRequirements', ""),
+                       'campaignName': jobMetadata.get('campaignName', None),
+                       'requestType': jobMetadata['requestType'],
+                       'physicsTaskType': jobMetadata.get('physicsTaskType', None)
                        }
             # then update it with the info retrieved from the database
             jobInfo.update(newJob)
@@ -434,18 +430,85 @@ class JobSubmitterPoller(BaseWorkerThread):
                 logging.warning(msg, len(badJobs[errorCode]), errorCode)
                 self._handleSubmitFailedJobs(badJobs[errorCode], errorCode)
 
-        # Persist remaining job packages to disk
-        self.flushJobPackages()
-
         # We need to remove any jobs from the cache that were not returned in
         # the last call to the database.
         jobIDsToPurge = set(self.jobDataCache.keys()) - newJobIds
         self._purgeJobsFromCache(jobIDsToPurge)
 
         logging.info("Found %d jobs pending to sites in drain within the grace period", countDrainingJobs)
+        logging.info("Job cache refreshed in %.2f secs, with %d jobs from submit metadata and %d from job pickles.",
+                     time.time() - startTime, countFromMetadata, countFromPickle)
         logging.info("Done pruning killed jobs, moving on to submit.")
         return
 
+    def loadJobPickle(self, job, badJobs, metadataCache=None):
+        """
+        _loadJobPickle_
+
+        Load the pickled job object from the job cache directory, together with
+        the shared task metadata it references (kept in metadataCache). If it is
+        missing or can't be loaded, add the job to the bad jobs (keyed by the
+        error code) and return None.
+        """
+        pickledJobPath = os.path.join(job["cache_dir"], "job.pkl")
+
+        if not os.path.isfile(pickledJobPath):
+            # Then we have a problem - there's no file
+            logging.warning("Could not find pickled jobObject %s", pickledJobPath)
+            badJobs[71104].append(job)
+            return None
+        try:
+            loadedJob = loadJob(pickledJobPath, metadataCache)
+        except Exception:
+            logging.warning("Failed to load job pickle object %s", pickledJobPath)
+            badJobs[71105].append(job)
+            return None
+        return loadedJob
+
+    def packageJobs(self, jobsToSubmit):
+        """
+        _packageJobs_
+
+        Load the job objects of the jobs about to be submitted and write them
+        to the job packages. Jobs whose pickle can't be loaded are failed, and
+        the pending slots they took in assignJobLocations are given back.
+        Return the list of jobs to be submitted.
+        """
+        badJobs = {71104: [], 71105: []}
+        jobList = []
+        metadataCache = {}
+        for task in jobsToSubmit:
+            for job in jobsToSubmit[task]:
+                loadedJob = self.loadJobPickle(job, badJobs, metadataCache)
+                if loadedJob is None:
+                    self._releasePendingSlot(job)
+                    continue
+                # Sigh...make sure the job added to the package has the proper retry_count
+                loadedJob['retry_count'] = job['retry_count']
+                job['packageDir'] = self.addJobsToPackage(loadedJob)
+                jobList.append(job)
+
+        # Persist remaining job packages to disk
+        self.flushJobPackages()
+
+        for errorCode in badJobs:
+            if badJobs[errorCode]:
+                msg = "%d jobs failed to be submitted with unrecoverable job pickle problems (error code: %s)"
+                logging.warning(msg, len(badJobs[errorCode]), errorCode)
+                self._handleSubmitFailedJobs(badJobs[errorCode], errorCode)
+        return jobList
+
+    def _releasePendingSlot(self, job):
+        """
+        Give back the site and task pending slot taken by a job in
+        assignJobLocations, for a job which is not going to be submitted
+        :param job: cached job dictionary, with its location already set
+        """
+        siteName = job['custom']['location']
+        siteThresholds = self.currentRcThresholds[siteName]
+        siteThresholds["total_pending_jobs"] -= 1
+        siteThresholds['thresholds'][job['task_type']]["task_pending_jobs"] -= 1
+
     def failJobDrain(self, timeNow, possibleLocations):
         """
         Check whether sites are in drain for too long such that the job
@@ -479,11 +542,7 @@ class JobSubmitterPoller(BaseWorkerThread):
 
         for jobid in jobIDsToPurge:
             self.jobDataCache.pop(jobid, None)
-            for jobPrio in self.jobsByPrio:
-                if jobid in self.jobsByPrio[jobPrio]:
-                    # then the jobid was found, go to the next one
-                    self.jobsByPrio[jobPrio].discard(jobid)
-                    break
+        self.jobsByPrio.discard(jobIDsToPurge)
         return
 
     def _handleSubmitFailedJobs(self, badJobs, exitCode):
@@ -555,7 +614,7 @@ class JobSubmitterPoller(BaseWorkerThread):
         # refresh is needed, for now it forces a full cache refresh
         if set(newDrainSites.keys()) != self.drainSitesSet or newAbortSites != self.abortSites:
             logging.info("Draining or Aborted sites have changed, the cache will be rebuilt.")
-            self.jobsByPrio = {}
+            self.jobsByPrio.clear()
             self.jobDataCache = {}
 
         self.currentRcThresholds = rcThresholds
@@ -586,6 +645,50 @@ class JobSubmitterPoller(BaseWorkerThread):
 
         return newSiteList
 
+    def _findSubmitSite(self, jobPrio, jobType, possibleSites, saturatedSites):
+        """
+        _findSubmitSite_
+
+        Return the first site, among the possible ones, which can take a job
+        of a given priority and type (None if there is none) and the list of
+        (site, condition) of the sites checked before which can't.
+
+        The sites that can't take a job keep being unable to take more jobs
+        of the same type for the rest of the cycle (the thresholds only
+        depend on the site, the task type and whether the job priority allows
+        to overflow, while the number of pending jobs only increases), so
+        their condition is kept in saturatedSites and they are not checked
+        again. A site without free pending slots is saturated for any task type.
+        """
+        siteConditions = []
+        for siteName in possibleSites:
+            overflow = self._allowsOverflow(jobPrio, siteName, jobType)
+            condition = saturatedSites.get((siteName, None, overflow)) or \
+                        saturatedSites.get((siteName, jobType, overflow))
+            if condition is None:
+                condition = self._getJobSubmitCondition(jobPrio, siteName, jobType)
+                if condition == "NoPendingSlot":
+                    saturatedSites[(siteName, None, overflow)] = condition
+                elif condition != "JobSubmitReady":
+                    saturatedSites[(siteName, jobType, overflow)] = condition
+            if condition == "JobSubmitReady":
+                return siteName, siteConditions
+            logging.debug("Found a job for %s : %s", siteName, condition)
+            siteConditions.append((siteName, condition))
+        return None, siteConditions
+
+    def _allowsOverflow(self, jobPrio, siteName, jobType):
+        """
+        Whether a job can overflow the pending thresholds of a site, because its
+        priority is higher than the priority of any job pending or running there
+        """
+        try:
+            highestPriorityInJobs = self.currentRcThresholds[siteName]['thresholds'][jobType]['wf_highest_priority']
+        except KeyError:
+            return False
+        return not ((highestPriorityInJobs is None) or (jobPrio <= highestPriorityInJobs) or
+                    (jobType in self.ioboundTypes))
+
     def _getJobSubmitCondition(self, jobPrio, siteName, jobType):
         """
         returns the string describing whether a job is ready to be submitted or the reason can't be submitted
@@ -658,65 +761,74 @@ class JobSubmitterPoller(BaseWorkerThread):
         _assignJobLocations_
 
         Loop through the submit thresholds and pull sites out of the job cache
-        as we discover open slots.  This will return a list of tuple where each
-        tuple will have six elements:
-          - WMBS Job ID
-          - Retry count
-          - Batch ID
-          - Path to sanbox
-          - Path to cache directory
-          - SE name of the site to run at
+        as we discover open slots.  This will return a dictionary of the
+        cached job dictionaries to be submitted (with their site location
+        set), keyed by the WMBS workflow (task) id.
         """
         jobsToSubmit = {}
         jobsCount = 0
         exitLoop = False
         jobSubmitLogBySites = defaultdict(lambda: defaultdict(Counter))
         jobSubmitLogByPriority = defaultdict(lambda: defaultdict(Counter))
+        # conditions of the sites that can't take any more jobs in this cycle
+        saturatedSites = {}
+        # possible sites with non-zero task thresholds, per (task type, possible sites) bucket
+        bucketSites = {}
 
         # iterate over jobs from the highest to the lowest prio
-        for jobPrio in sorted(self.jobsByPrio, reverse=True):
+        for jobPrio in self.jobsByPrio.priorities():
 
             # then we're completely done and have our basket full of jobs to submit
             if exitLoop:
                 break
 
-            # can we assume jobid=1 is older than jobid=3? I think so...
-            for jobid in sorted(self.jobsByPrio[jobPrio]):
-                jobType = self.jobDataCache[jobid]['task_type']
-                possibleSites = self.jobDataCache[jobid]['possibleSites']
-                # remove sites with 0 task thresholds
-                possibleSites = self.checkZeroTaskThresholds(jobType, possibleSites)
-                jobSubmitLogByPriority[jobPrio][jobType]['Total'] += 1
-                # now look for sites with free pending slots
-                for siteName in possibleSites:
-                    condition = self._getJobSubmitCondition(jobPrio, siteName, jobType)
-                    if condition != "JobSubmitReady":
-                        jobSubmitLogBySites[siteName][jobType][condition] += 1
-                        logging.debug("Found a job for %s : %s", siteName, condition)
-                        continue
-
-                    # pop the job dictionary object and update it
-                    cachedJob = self.jobDataCache.pop(jobid)
-                    cachedJob['custom'] = {'location': siteName}
-                    cachedJob['possibleSites'] = possibleSites
-
-                    # Sort jobs by jobPackage and get it in place to be submitted by the plugin
-                    package = cachedJob['packageDir']
-                    jobsToSubmit.setdefault(package, [])
-                    jobsToSubmit[package].append(cachedJob)
-
-                    # update site/task thresholds and the component job counter
-                    self.currentRcThresholds[siteName]["total_pending_jobs"] += 1
-                    self.currentRcThresholds[siteName]['thresholds'][jobType]["task_pending_jobs"] += 1
-                    jobsCount += 1
-                    jobSubmitLogBySites[siteName][jobType]["submitted"] += 1
-                    jobSubmitLogByPriority[jobPrio][jobType]['submitted'] += 1
+            buckets = self.jobsByPrio.buckets(jobPrio)
+            for (jobType, _), jobIDs in viewitems(buckets):
+                jobSubmitLogByPriority[jobPrio][jobType]['Total'] += len(jobIDs)
+
+            # merge the buckets by job id, can we assume jobid=1 is older than jobid=3? I think so...
+            heap = [(jobIDs[0], 0, bucketKey) for bucketKey, jobIDs in viewitems(buckets)]
+            heapq.heapify(heap)
+            submittedIDs = []
+            while heap:
+                jobid, index, bucketKey = heapq.heappop(heap)
+                jobType = bucketKey[0]
+                if bucketKey not in bucketSites:
+                    # remove sites with 0 task thresholds
+                    bucketSites[bucketKey] = self.checkZeroTaskThresholds(jobType, bucketKey[1])
+                possibleSites = bucketSites[bucketKey]
 
-                    # jobs that will be submitted must leave the job data cache
-                    self.jobsByPrio[jobPrio].discard(jobid)
-
-                    # found a site to submit this job, so go to the next job
-                    break
+                # now look for sites with free pending slots
+                siteName, siteConditions = self._findSubmitSite(jobPrio, jobType, possibleSites, saturatedSites)
+                if siteName is None:
+                    # the following jobs in the bucket would fail in the same way, skip them all
+                    numJobs = len(buckets[bucketKey]) - index
+                    for site, condition in siteConditions:
+                        jobSubmitLogBySites[site][jobType][condition] += numJobs
+                    continue
+                for site, condition in siteConditions:
+                    jobSubmitLogBySites[site][jobType][condition] += 1
+
+                # pop the job dictionary object and update it
+                cachedJob = self.jobDataCache.pop(jobid)
+                cachedJob['custom'] = {'location': siteName}
+                cachedJob['possibleSites'] = possibleSites
+
+                # Sort jobs by task, they get packaged right before the submission
+                jobsToSubmit.setdefault(cachedJob['task_id'], [])
+                jobsToSubmit[cachedJob['task_id']].append(cachedJob)
+
+                # update site/task thresholds and the component job counter
+                self.currentRcThresholds[siteName]["total_pending_jobs"] += 1
+                self.currentRcThresholds[siteName]['thresholds'][jobType]["task_pending_jobs"] += 1
+                jobsCount += 1
+                jobSubmitLogBySites[siteName][jobType]["submitted"] += 1
+                jobSubmitLogByPriority[jobPrio][jobType]['submitted'] += 1
+
+                # jobs that will be submitted must leave the job data cache
+                submittedIDs.append(jobid)
+                if index + 1 < len(buckets[bucketKey]):
+                    heapq.heappush(heap, (buckets[bucketKey][index + 1], index + 1, bucketKey))
 
                 # set the flag and get out of the job iteration
                 if jobsCount >= self.maxJobsThisCycle:
@@ -724,13 +836,15 @@ class JobSubmitterPoller(BaseWorkerThread):
                     exitLoop = True
                     break
 
+            self.jobsByPrio.discard(submittedIDs)
+
         logging.info("Site submission report ...")
         for site in jobSubmitLogBySites:
             logging.info("    %s : %s", site, json.dumps(jobSubmitLogBySites[site]))
         logging.info("Priority submission report ...")
         for prio in jobSubmitLogByPriority:
             logging.info("    %s : %s", prio, json.dumps(jobSubmitLogByPriority[prio]))
-        logging.info("Have %s packages to submit.", len(jobsToSubmit))
+        logging.info("Have %s tasks to submit.", len(jobsToSubmit))
         logging.info("Have %s jobs to submit.", jobsCount)
         logging.info("Done assigning site locations.")
         return jobsToSubmit
@@ -746,7 +860,7 @@ class JobSubmitterPoller(BaseWorkerThread):
         idList = []
 
         if len(jobsToSubmit) == 0:
-            logging.debug("There are no packages to submit.")
+            logging.debug("There are no jobs to submit.")
             return
 
         # Update cache of CMSSW micro-architectures
@@ -758,13 +872,15 @@ class JobSubmitterPoller(BaseWorkerThread):
             logging.error(msg)
             return
 
-        for package in jobsToSubmit:
-            jobs = jobsToSubmit.get(package, [])
-            for job in jobs:
-                job['location'], job['plugin'], job['site_cms_name'] = self.getSiteInfo(job['custom']['location'])
-                idList.append({'jobid': job['id'], 'location': job['custom']['location']})
+        # only now unpickle the jobs, to write them to the job packages
+        for job in self.packageJobs(jobsToSubmit):
+            job['location'], job['plugin'], job['site_cms_name'] = self.getSiteInfo(job['custom']['location'])
+            idList.append({'jobid': job['id'], 'location': job['custom']['location']})
+            jobList.append(job)
 
-            jobList.extend(jobs)
+        if not jobList:
+            logging.info("No jobs left to submit after packaging them.")
+            return
 
         myThread = threading.currentThread()
         myThread.transaction.begin()
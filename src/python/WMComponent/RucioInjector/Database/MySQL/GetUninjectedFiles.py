@@ -54,6 +54,8 @@ class GetUninjectedFiles(DBFormatter):
         dictResult = DBFormatter.formatDict(self, result)
         self.specCache = {}
         formattedResult = {}
+        # files already seen at a location, to add further checksums to them
+        filesByLocation = {}
         for row in dictResult:
             location = row['location']
 
@@ -70,15 +72,16 @@ class GetUninjectedFiles(DBFormatter):
                                                  "files": []}
 
             blockDict = datasetDict[row["blockname"]]
-            for fileInfo in blockDict["files"]:
-                if fileInfo["lfn"] == row["lfn"]:
-                    fileInfo["checksum"][row["cktype"]] = row["cksum"]
-                    break
+            fileInfo = filesByLocation.get((location, row["lfn"]))
+            if fileInfo:
+                fileInfo["checksum"][row["cktype"]] = row["cksum"]
             else:
                 cksumDict = {row["cktype"]: row["cksum"]}
-                blockDict["files"].append({"lfn": row["lfn"],
-                                           "size": row["filesize"],
-                                           "checksum": cksumDict})
+                fileInfo = {"lfn": row["lfn"],
+                            "size": row["filesize"],
+                            "checksum": cksumDict}
+                blockDict["files"].append(fileInfo)
+                filesByLocation[(location, row["lfn"])] = fileInfo
 
         return formattedResult
 
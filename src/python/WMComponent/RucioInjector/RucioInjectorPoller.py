@@ -9,6 +9,7 @@ General reminder about PhEDEx and Rucio definitions:
 * A Rucio replica is a file, under a given scope, at a given RSE
 """
 
+import concurrent.futures
 import json
 import logging
 import threading
@@ -78,10 +79,13 @@ class RucioInjectorPoller(BaseWorkerThread):
 
         self.scope = getattr(config.RucioInjector, "scope", "cms")
         self.rucioAcct = config.RucioInjector.rucioAccount
-        self.rucio = Rucio(acct=self.rucioAcct,
-                           hostUrl=config.RucioInjector.rucioUrl,
-                           authUrl=config.RucioInjector.rucioAuthUrl,
-                           configDict={'logger': self.logger})
+        self.rucioArgs = dict(acct=self.rucioAcct,
+                              hostUrl=config.RucioInjector.rucioUrl,
+                              authUrl=config.RucioInjector.rucioAuthUrl,
+                              configDict={'logger': self.logger})
+        self.rucio = Rucio(**self.rucioArgs)
+        # the replica injection threads get a Rucio client each, see _getThreadRucio
+        self.threadData = threading.local()
 
         self.useDsetReplicaDeep = getattr(config.RucioInjector, "useDsetReplicaDeep", False)
         self.delBlockSlicesize = getattr(config.RucioInjector, "delBlockSlicesize", 100)
@@ -96,6 +100,11 @@ class RucioInjectorPoller(BaseWorkerThread):
         self.testRSEs = config.RucioInjector.RSEPostfix
         self.filesToRecover = []
 
+        # replicas are created in batches of blocks at the same RSE, with up to this many files
+        self.replicaBatchSize = getattr(config.RucioInjector, "replicaBatchSize", 1000)
+        # number of threads creating the replica batches concurrently
+        self.injectionThreads = getattr(config.RucioInjector, "injectionThreads", 1)
+
         # output data placement has a different behaviour between T0 and Production agents
         if hasattr(config, "Tier0Feeder"):
             logging.info("RucioInjector running on a T0 WMAgent")
@@ -281,36 +290,134 @@ class RucioInjectorPoller(BaseWorkerThread):
                 logging.error("Failed to create rule for block: %s at %s", item['blockname'], rseName)
         return
 
-    def insertReplicas(self, uninjectedData):
+    def getInjectionPlan(self, uninjectedData):
         """
-        Inserts replicas into Rucio and attach them to its specific block.
-        If the insertion succeeds, also switch their database state to injected.
+        Flatten the uninjected files into a plan keyed by block, with the replicas
+        to be created for each block. Blocks that failed to be added into Rucio
+        are left out of it.
 
-        :param uninjectedData: dictionary with blocks as key, and RSEs as value
+        :param uninjectedData: same data as it's returned from the uninjectedFiles
+        :return: a dictionary like {block: {'container': container, 'replicas': {rse: [replicas]}}}
         """
-        # FIXME: I think we need a different data struct from the database
-        # this method is very expensive O(n^4)
-        logging.info("Preparing to insert replicas into Rucio...")
-
+        injectionPlan = {}
         for location in uninjectedData:
             rseName = "%s_Test" % location if self.testRSEs else location
             for container in uninjectedData[location]:
-                for block in uninjectedData[location][container]:
+                for block, blockInfo in uninjectedData[location][container].items():
                     if block not in self.blocksCache:
                         logging.warning("Skipping %d file injection for block that failed to be added into Rucio: %s",
-                                        len(uninjectedData[location][container][block]['files']), block)
+                                        len(blockInfo['files']), block)
                         continue
-                    injectData = []
-                    listLfns = []
-                    for fileInfo in uninjectedData[location][container][block]['files']:
-                        listLfns.append(fileInfo['lfn'])
-                        injectData.append(dict(name=fileInfo['lfn'], scope=self.scope,
-                                               bytes=fileInfo['size'], state="A",
-                                               adler32=fileInfo['checksum']['adler32']))
-
-                    if self.rucio.createReplicas(rse=rseName, files=injectData, block=block):
-                        logging.info("Successfully inserted %d files on block %s", len(listLfns), block)
-                        self._updateLFNState(listLfns)
+                    blockPlan = injectionPlan.setdefault(block, {'container': container, 'replicas': {}})
+                    blockPlan['replicas'][rseName] = [dict(name=fileInfo['lfn'], scope=self.scope,
+                                                           bytes=fileInfo['size'], state="A",
+                                                           adler32=fileInfo['checksum']['adler32'])
+                                                      for fileInfo in blockInfo['files']]
+        return injectionPlan
+
+    def getReplicaBatches(self, injectionPlan):
+        """
+        Group the replicas of the injection plan into batches of blocks at the same
+        RSE, holding up to replicaBatchSize files each (a larger block gets a batch
+        on its own).
+
+        :param injectionPlan: dictionary as returned by getInjectionPlan
+        :return: a list of (rse, {block: [replicas]}) tuples
+        """
+        replicasByRSE = {}
+        for block, blockPlan in injectionPlan.items():
+            for rseName, replicas in blockPlan['replicas'].items():
+                replicasByRSE.setdefault(rseName, []).append((block, replicas))
+
+        batches = []
+        for rseName, blockReplicas in replicasByRSE.items():
+            batch, batchSize = {}, 0
+            for block, replicas in blockReplicas:
+                if batch and batchSize + len(replicas) > self.replicaBatchSize:
+                    batches.append((rseName, batch))
+                    batch, batchSize = {}, 0
+                batch[block] = replicas
+                batchSize += len(replicas)
+            if batch:
+                batches.append((rseName, batch))
+        return batches
+
+    def _getThreadRucio(self):
+        """
+        Return the Rucio client of the calling thread, creating it on its first call,
+        such that the replica injection threads do not share the same client object.
+        :return: a Rucio object
+        """
+        rucio = getattr(self.threadData, "rucio", None)
+        if rucio is None:
+            rucio = self.threadData.rucio = Rucio(**self.rucioArgs)
+        return rucio
+
+    def _injectReplicaBatch(self, rseName, blockReplicas, threaded=False):
+        """
+        Create the replicas of a batch of blocks at a RSE. If the bulk creation fails,
+        retry it block by block, such that a single bad block does not hold the others.
+
+        :param rseName: string with the RSE name
+        :param blockReplicas: dictionary with the block names as keys and their replicas as values
+        :param threaded: if True, use the Rucio client of the calling thread instead of self.rucio
+        :return: list with the names of the blocks whose replicas got created
+        """
+        rucio = self._getThreadRucio() if threaded else self.rucio
+        if rucio.createBlocksReplicas(rse=rseName, blockFiles=blockReplicas):
+            return list(blockReplicas)
+
+        logging.warning("Failed to insert replicas for %d blocks at %s, retrying block by block",
+                        len(blockReplicas), rseName)
+        injectedBlocks = []
+        for block, replicas in blockReplicas.items():
+            if rucio.createReplicas(rse=rseName, files=replicas, block=block):
+                injectedBlocks.append(block)
+        return injectedBlocks
+
+    def insertReplicas(self, uninjectedData):
+        """
+        Inserts replicas into Rucio and attach them to its specific block.
+        If the insertion succeeds, also switch their database state to injected.
+
+        Replicas are created in batches of blocks at the same RSE, which are run
+        concurrently when injectionThreads is larger than 1. The database state is
+        updated - from this thread - once per batch.
+
+        :param uninjectedData: same data as it's returned from the uninjectedFiles
+        """
+        logging.info("Preparing to insert replicas into Rucio...")
+        startTime = time.time()
+        batches = self.getReplicaBatches(self.getInjectionPlan(uninjectedData))
+
+        numFiles = numBlocks = 0
+        if self.injectionThreads > 1 and len(batches) > 1:
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.injectionThreads)
+            futures = {executor.submit(self._injectReplicaBatch, rseName, blockReplicas, True): blockReplicas
+                       for rseName, blockReplicas in batches}
+            results = ((futures[future], future.result()) for future in concurrent.futures.as_completed(futures))
+        else:
+            executor = None
+            results = ((blockReplicas, self._injectReplicaBatch(rseName, blockReplicas))
+                       for rseName, blockReplicas in batches)
+
+        try:
+            for blockReplicas, injectedBlocks in results:
+                listLfns = [replica['name'] for block in injectedBlocks for replica in blockReplicas[block]]
+                logging.info("Successfully inserted %d files on %d blocks", len(listLfns), len(injectedBlocks))
+                self._updateLFNState(listLfns)
+                numFiles += len(listLfns)
+                numBlocks += len(injectedBlocks)
+        finally:
+            if executor:
+                # do not start the batches still pending, in case of errors
+                for future in futures:
+                    future.cancel()
+                executor.shutdown(wait=True)
+
+        timeTaken = time.time() - startTime
+        logging.info("Inserted %d files on %d blocks into Rucio, in %d batches, in %.1f secs (%.1f files/s)",
+                     numFiles, numBlocks, len(batches), timeTaken, numFiles / timeTaken if timeTaken else 0)
         return
 
     def _updateLFNState(self, listLfns, recovery=False):
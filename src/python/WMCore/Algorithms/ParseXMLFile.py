@@ -21,12 +21,12 @@ class Node(object):
     and formatting the character data without all the whitespace guff
 
     """
+    __slots__ = ['name', 'attrs', 'text', 'children']
+
     def __init__(self, name, attrs):
         self.name = str(name)
-        self.attrs = {}
+        self.attrs = {str(k): str(v) for k, v in viewitems(attrs)}
         self.text = None
-        for k, v in viewitems(attrs):
-            self.attrs.__setitem__(str(k), str(v))
         self.children = []
 
     def __str__(self):
@@ -66,6 +66,23 @@ def xmlFileToNode(reportFile):
     return node
 
 
+def xmlFileToNodeStream(reportFile, target, depth=2):
+    """
+    _xmlFileToNodeStream_
+
+    Use expat to parse the XML file and stream to the target coroutine every
+    node found at the given depth (the top node being at depth 0), as soon as
+    it is complete, along with its parent node. Streamed nodes are then
+    dropped, such that the whole tree is never held in memory.
+    Return the top node, holding only the nodes above the streamed ones.
+
+    """
+    node = Node("JobReports", {})
+    with open(reportFile, 'rb') as handle:
+        expat_parse(handle, streamBuild(node, target, depth))
+    return node
+
+
 def expat_parse(f, target):
     """
     _expat_parse_
@@ -113,3 +130,36 @@ def build(topNode):
             nodeStack[-1].text = str(''.join(charCache)).strip()
             nodeStack.pop()
             charCache = []
+
+
+@coroutine
+def streamBuild(topNode, target, depth):
+    """
+    _streamBuild_
+
+    Node structure builder that is fed from the expat_parse method and that
+    sends (parentNode, node) to the target for every node completed at the
+    given depth, removing it from its parent afterwards
+
+    """
+    nodeStack = [topNode]
+    charCache = []
+    while True:
+        event, value = (yield)
+        if event == "start":
+            charCache = []
+            newnode = Node(value[0], value[1])
+            nodeStack[-1].children.append(newnode)
+            nodeStack.append(newnode)
+
+        elif event == "text":
+            charCache.append(value)
+
+        else: # end
+            node = nodeStack.pop()
+            node.text = str(''.join(charCache)).strip()
+            charCache = []
+            if len(nodeStack) == depth:
+                parent = nodeStack[-1]
+                parent.children.pop()
+                target.send((parent, node))
@@ -20,6 +20,7 @@ import os.path
 import threading
 import logging
 import subprocess
+from Utils.IteratorTools import grouper
 from WMCore.JobStateMachine.ChangeState import ChangeState
 from WMCore.DAOFactory import DAOFactory
 from WMCore.WMFactory import WMFactory
@@ -435,29 +436,27 @@ class BossAirAPI(WMConnectionBase):
         runningJobs = self._listRunJobs(active=True)
 
         if runJobIDs:
-            for job in runningJobs:
-                if job['id'] not in runJobIDs:
-                    runningJobs.remove(job)
+            runJobIDs = set(runJobIDs)
+            runningJobs = [job for job in runningJobs if job['id'] in runJobIDs]
         if wmbsIDs:
-            for job in runningJobs:
-                if job['jobid'] not in wmbsIDs:
-                    runningJobs.remove(job)
+            wmbsIDs = set(wmbsIDs)
+            runningJobs = [job for job in runningJobs if job['jobid'] in wmbsIDs]
 
         if len(runningJobs) < 1:
             # Then we have no running jobs
             return returnList
 
-        logging.info("About to start building running jobs")
+        logging.info("About to start building %i running jobs", len(runningJobs))
 
-        loadedJobs = self._buildRunningJobsFromRunJobs(runJobs=runningJobs)
-
-        logging.info("About to look for %i loadedJobs.", len(loadedJobs))
-
-        for runningJob in loadedJobs:
+        numLoaded = 0
+        for runningJob in self._buildRunningJobsFromRunJobs(runJobs=runningJobs):
             plugin = runningJob['plugin']
             if plugin not in jobsToTrack:
                 jobsToTrack[plugin] = []
             jobsToTrack[plugin].append(runningJob)
+            numLoaded += 1
+
+        logging.info("About to look for %i loadedJobs.", numLoaded)
 
         for plugin in jobsToTrack:
             if plugin not in self.plugins:
@@ -733,31 +732,25 @@ class BossAirAPI(WMConnectionBase):
                 raise BossAirException(msg)
         return jobkill
 
-    def _buildRunningJobsFromRunJobs(self, runJobs):
+    def _buildRunningJobsFromRunJobs(self, runJobs, chunkSize=5000):
         """
         _buildRunningJobsFromRunJobs_
 
-        Same as _buildRunningJobs_, but taking runJobs as input
-        """
-        finalJobs = []
-
-        loadedJobs = self._loadByID(jobs=runJobs)
-
-        for loadJob in loadedJobs:
-            runJob = None
-            for rj in runJobs:
-                if rj['id'] == loadJob['id']:
-                    runJob = rj
-                    break
-            # We should have two instances of the job
-            for key in runJob:
-                # Fill one from the other
-                # runJob, being most recent, should be on top
-                if runJob[key] is None:
-                    runJob[key] = loadJob.get(key, None)
-            finalJobs.append(runJob)
-
-        return finalJobs
+        Same as _buildRunningJobs_, but taking runJobs as input.
+        This is a generator, jobs are loaded from the database in chunks
+        of chunkSize jobs and yielded one by one.
+        """
+        for runJobsChunk in grouper(runJobs, chunkSize):
+            runJobsByID = {rj['id']: rj for rj in runJobsChunk}
+            for loadJob in self._loadByID(jobs=runJobsChunk):
+                # We should have two instances of the job
+                runJob = runJobsByID[loadJob['id']]
+                for key in runJob:
+                    # Fill one from the other
+                    # runJob, being most recent, should be on top
+                    if runJob[key] is None:
+                        runJob[key] = loadJob.get(key, None)
+                yield runJob
 
     def _buildRunningJobs(self, wmbsJobs):
         """
@@ -43,6 +43,85 @@ def activityToType(jobActivity):
     return activityMap.get(jobActivity, "unknown")
 
 
+class CondorJobTracker(object):
+    """
+    _CondorJobTracker_
+
+    Keep an in-memory table of gridId -> (JobStatus, location) for the agent jobs
+    in the schedd. A full query of the agent jobs is made on the first call and
+    every fullTrackingInterval seconds; in between, only the jobs that changed
+    their status since the previous poll are queried, while jobs that left the
+    queue are found in the schedd history (newer than the last known record).
+    """
+    projection = ['ClusterId', 'ProcId', 'JobStatus', 'MachineAttrGLIDEIN_CMSSite0']
+
+    def __init__(self, agentName, incremental=False, fullTrackingInterval=3600, timeSlack=60):
+        self.constraint = "WMAgent_AgentName == %s" % classad.quote(agentName)
+        self.incremental = incremental
+        self.fullTrackingInterval = fullTrackingInterval
+        # seconds subtracted from the previous poll time, to cope with clock skews
+        self.timeSlack = timeSlack
+        self.jobInfo = {}
+        self.lastPollTime = None
+        self.lastFullPollTime = None
+        self.lastHistoryJobId = None
+
+    @staticmethod
+    def _adToInfo(jobAd):
+        gridId = "%s.%s" % (jobAd['ClusterId'], jobAd['ProcId'])
+        jobStatus = SimpleCondorPlugin.exitCodeMap().get(jobAd.get('JobStatus'), 'Unknown')
+        return gridId, (jobStatus, jobAd.get('MachineAttrGLIDEIN_CMSSite0', None))
+
+    @staticmethod
+    def _newestHistoryJobId(schedd):
+        """
+        Return the job id of the most recent record in the schedd history, or None
+        """
+        for jobAd in schedd.history("true", ['ClusterId', 'ProcId'], match=1):
+            return "%s.%s" % (jobAd['ClusterId'], jobAd['ProcId'])
+        return None
+
+    def resync(self):
+        """
+        Force a full query of the schedd in the next poll
+        """
+        self.lastPollTime = None
+
+    def getJobInfo(self, schedd):
+        """
+        _getJobInfo_
+
+        Poll the schedd and return the table of gridId -> (JobStatus, location)
+        for all the agent jobs in the queue. Exceptions from the schedd are
+        propagated, and the next poll will be a full one.
+        """
+        pollTime = int(time.time())
+        fullPoll = not self.incremental or self.lastPollTime is None or self.lastHistoryJobId is None
+        fullPoll = fullPoll or pollTime - self.lastFullPollTime >= self.fullTrackingInterval
+        try:
+            if fullPoll:
+                historyJobId = self._newestHistoryJobId(schedd) if self.incremental else None
+                jobInfo = dict(self._adToInfo(jobAd) for jobAd in schedd.query(self.constraint, self.projection))
+                self.jobInfo = jobInfo
+                self.lastFullPollTime = pollTime
+            else:
+                historyJobId = self._newestHistoryJobId(schedd)
+                # jobs that left the queue since the previous poll
+                for jobAd in schedd.history(self.constraint, ['ClusterId', 'ProcId'], since=self.lastHistoryJobId):
+                    self.jobInfo.pop("%s.%s" % (jobAd['ClusterId'], jobAd['ProcId']), None)
+                constraint = "%s && EnteredCurrentStatus >= %d" % (self.constraint,
+                                                                   self.lastPollTime - self.timeSlack)
+                self.jobInfo.update(self._adToInfo(jobAd) for jobAd in schedd.query(constraint, self.projection))
+        except Exception:
+            self.resync()
+            raise
+        self.lastHistoryJobId = historyJobId
+        self.lastPollTime = pollTime
+        logging.debug("%s poll of the condor schedd, tracking %d jobs",
+                      "Full" if fullPoll else "Incremental", len(self.jobInfo))
+        return self.jobInfo
+
+
 class SimpleCondorPlugin(BasePlugin):
     """
     _SimpleCondorPlugin_
@@ -144,6 +223,12 @@ class SimpleCondorPlugin(BasePlugin):
 
         self.useCMSToken = getattr(config.JobSubmitter, 'useOauthToken', False)
 
+        # incremental tracking of the jobs in the schedd, with a periodic full resync
+        self.jobTracker = CondorJobTracker(self.agent,
+                                           incremental=getattr(config.BossAir, 'incrementalTracking', False),
+                                           fullTrackingInterval=getattr(config.BossAir, 'fullTrackingInterval',
+                                                                        3600))
+
         return
 
     def submit(self, jobs, info=None):
@@ -201,7 +286,6 @@ class SimpleCondorPlugin(BasePlugin):
         Second, the jobs that need to be changed
         Third, the jobs that need to be completed
         """
-        jobInfo = {}
         changeList = []
         completeList = []
         runningList = []
@@ -213,13 +297,7 @@ class SimpleCondorPlugin(BasePlugin):
 
         logging.debug("Start: Retrieving classAds using Condor Python query")
         try:
-            jobAds = schedd.query("WMAgent_AgentName == %s" % classad.quote(self.agent),
-                                  ['ClusterId', 'ProcId', 'JobStatus', 'MachineAttrGLIDEIN_CMSSite0'])
-            for jobAd in jobAds:
-                gridId = "%s.%s" % (jobAd['ClusterId'], jobAd['ProcId'])
-                jobStatus = SimpleCondorPlugin.exitCodeMap().get(jobAd.get('JobStatus'), 'Unknown')
-                location = jobAd.get('MachineAttrGLIDEIN_CMSSite0', None)
-                jobInfo[gridId] = (jobStatus, location)
+            jobInfo = self.jobTracker.getJobInfo(schedd)
         except Exception as ex:
             logging.error("Query to condor schedd failed in SimpleCondorPlugin.")
             logging.error("Returning empty lists for all job types...")
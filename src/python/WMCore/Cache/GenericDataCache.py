@@ -1,51 +1,66 @@
 from __future__ import print_function, division
 from builtins import str
 from builtins import object
-import time
 import logging
+import threading
+
+from Utils.ConcurrentCache import ConcurrentCache
 
 
 class MemoryCacheStruct(object):
     """
-    WARNING: This can be used in multi thread by registering on GenericDataCache
-    But this cache is not thread safe.
+    Cache the data returned by func for expire seconds.
+    It is thread safe: only one thread refreshes the data at a time, while
+    the other ones wait for it. If staleTime is set, expired data keeps being
+    returned for staleTime seconds while it gets refreshed in the background.
     """
+    _dataKey = "data"
 
-    def __init__(self, expire, func, initCacheValue=None, logger=None, kwargs=None):
+    def __init__(self, expire, func, initCacheValue=None, logger=None, kwargs=None, staleTime=0):
         """
         expire is the seconds which cache will be refreshed when cache is older than the expire.
         func is the fuction which cache data is retrieved
         kwargs are func arguments for cache data
+        staleTime is the seconds the expired data can be returned while it's refreshed
         """
         kwargs = kwargs or {}
-        self.data = initCacheValue
+        self.initCacheValue = initCacheValue
         self.expire = expire
         self.func = func
 
         self.kwargs = kwargs
-        self.lastUpdated = -1
         self.logger = logger if logger else logging.getLogger()
+        self._cache = ConcurrentCache(expire, maxSize=1, staleTime=staleTime, logger=self.logger)
+
+    @property
+    def data(self):
+        return self._cache.peek(self._dataKey, self.initCacheValue)
+
+    @property
+    def lastUpdated(self):
+        lastUpdate = self._cache.lastUpdate(self._dataKey)
+        return -1 if lastUpdate is None else int(lastUpdate)
 
     def isDataExpired(self):
-        if self.lastUpdated == -1:
-            return True
-        if (int(time.time()) - self.lastUpdated) > self.expire:
-            return True
-        return False
+        return self._cache.isExpired(self._dataKey)
 
     def getData(self, noFail=True):
-        if self.isDataExpired():
-            try:
-                self.data = self.func(**self.kwargs)
-                self.lastUpdated = int(time.time())
-            except Exception as exc:
-                if noFail:
-                    msg = "Passive failure while looking data up in the memory cache. Error: %s" % str(exc)
-                    self.logger.warning(msg)
-                else:
-                    raise
+        try:
+            return self._cache.get(self._dataKey, lambda: self.func(**self.kwargs))
+        except Exception as exc:
+            if noFail:
+                msg = "Passive failure while looking data up in the memory cache. Error: %s" % str(exc)
+                self.logger.warning(msg)
+            else:
+                raise
         return self.data
 
+    def getStats(self):
+        """
+        Return the cache hit/miss/refresh counters
+        """
+        return self._cache.stats()
+
 
 class CacheExistException(Exception):
     def __init__(self, cacheName):
@@ -69,6 +84,7 @@ class CacheWithWrongStructException(Exception):
 
 class GenericDataCache(object):
     _dataCache = {}
+    _lock = threading.Lock()
 
     @staticmethod
     def getCacheData(cacheName):
@@ -80,13 +96,14 @@ class GenericDataCache(object):
         cacheName, unique name for the cache
         memoryCache MemoryCacheStruct instance.
         """
-        if cacheName in GenericDataCache._dataCache:
-            raise CacheExistException(cacheName)
-        elif not isinstance(memoryCache, MemoryCacheStruct):
-            raise CacheWithWrongStructException(cacheName)
-        else:
-            logging.info("Creating generic cache named: %s", cacheName)
-            GenericDataCache._dataCache[cacheName] = memoryCache
+        with GenericDataCache._lock:
+            if cacheName in GenericDataCache._dataCache:
+                raise CacheExistException(cacheName)
+            elif not isinstance(memoryCache, MemoryCacheStruct):
+                raise CacheWithWrongStructException(cacheName)
+            else:
+                logging.info("Creating generic cache named: %s", cacheName)
+                GenericDataCache._dataCache[cacheName] = memoryCache
 
     @staticmethod
     def cacheExists(cacheName):
@@ -96,3 +113,12 @@ class GenericDataCache(object):
         :return: boolean
         """
         return cacheName in GenericDataCache._dataCache
+
+    @staticmethod
+    def getCacheStats():
+        """
+        Return the hit/miss/refresh counters of all the registered caches
+        :return: dictionary key'ed by the cache name
+        """
+        return {cacheName: memoryCache.getStats()
+                for cacheName, memoryCache in list(GenericDataCache._dataCache.items())}
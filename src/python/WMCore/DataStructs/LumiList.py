@@ -20,7 +20,8 @@ from future.utils import viewitems
 from future import standard_library
 standard_library.install_aliases()
 
-import copy
+import bisect
+import heapq
 import itertools
 import json
 import re
@@ -62,6 +63,7 @@ class LumiList(object):
         """
         self.compactList = {}
         self.duplicates = {}
+        self._rangeIndex = {}
         if filename:
             self.filename = filename
             with open(self.filename,'r') as jsonFile:
@@ -155,77 +157,25 @@ class LumiList(object):
 
     def __sub__(self, other): # Things from self not in other
         result = {}
-        for run in sorted(self.compactList.keys()):
-            alumis = sorted(self.compactList[run])
-            blumis = sorted(other.compactList.get(run, []))
-            alist = []                    # verified part
-            for alumi in alumis:
-                tmplist = [alumi[0], alumi[1]] # may be part
-                for blumi in blumis:
-                    if blumi[0] <= tmplist[0] and blumi[1] >= tmplist[1]: # blumi has all of alumi
-                        tmplist = []
-                        break # blumi is has all of alumi
-                    if blumi[0] > tmplist[0] and blumi[1] < tmplist[1]: # blumi is part of alumi
-                        alist.append([tmplist[0], blumi[0]-1])
-                        tmplist = [blumi[1]+1, tmplist[1]]
-                    elif blumi[0] <= tmplist[0] and blumi[1] < tmplist[1] and blumi[1]>=tmplist[0]: # overlaps start
-                        tmplist = [blumi[1]+1, tmplist[1]]
-                    elif blumi[0] > tmplist[0] and blumi[1] >= tmplist[1] and blumi[0]<=tmplist[1]: # overlaps end
-                        alist.append([tmplist[0], blumi[0]-1])
-                        tmplist = []
-                        break
-                if tmplist:
-                    alist.append(tmplist)
-            result[run] = alist
-
+        for run in self.compactList:
+            result[run] = _subtractRanges(sorted(self.compactList[run]),
+                                          sorted(other.compactList.get(run, [])))
         return LumiList(compactList = result)
 
 
     def __and__(self, other): # Things in both
         result = {}
-        aruns = set(self.compactList.keys())
-        bruns = set(other.compactList.keys())
-        for run in aruns & bruns:
-            lumiList = []                    # List for this run
-            unique = []                    # List for this run
-            for alumi in self.compactList[run]:
-                for blumi in other.compactList[run]:
-                    if blumi[0] <= alumi[0] and blumi[1] >= alumi[1]: # blumi has all of alumi
-                        lumiList.append(alumi)
-                    if blumi[0] > alumi[0] and blumi[1] < alumi[1]: # blumi is part of alumi
-                        lumiList.append(blumi)
-                    elif blumi[0] <= alumi[0] and blumi[1] < alumi[1] and blumi[1] >= alumi[0]: # overlaps start
-                        lumiList.append([alumi[0], blumi[1]])
-                    elif blumi[0] > alumi[0] and blumi[1] >= alumi[1] and blumi[0] <= alumi[1]: # overlaps end
-                        lumiList.append([blumi[0], alumi[1]])
-
-
-            if lumiList:
-                unique = [lumiList[0]]
-            for pair in lumiList[1:]:
-                if pair[0] == unique[-1][1]+1:
-                    unique[-1][1] = copy.deepcopy(pair[1])
-                else:
-                    unique.append(copy.deepcopy(pair))
-
-            result[run] = unique
+        for run in set(self.compactList) & set(other.compactList):
+            result[run] = _intersectRanges(sorted(self.compactList[run]),
+                                           sorted(other.compactList[run]))
         return LumiList(compactList = result)
 
 
     def __or__(self, other):
         result = {}
-        aruns = list(self.compactList)
-        bruns = list(other.compactList)
-        runs = set(aruns + bruns)
-        for run in runs:
-            overlap = sorted(self.compactList.get(run, []) + other.compactList.get(run, []))
-            unique = [overlap[0]]
-            for pair in overlap[1:]:
-                if pair[0] >= unique[-1][0] and pair[0] <= unique[-1][1]+1 and pair[1] > unique[-1][1]:
-                    unique[-1][1] = copy.deepcopy(pair[1])
-                elif pair[0] > unique[-1][1]:
-                    unique.append(copy.deepcopy(pair))
-            result[run] = unique
+        for run in set(self.compactList) | set(other.compactList):
+            result[run] = _unionRanges(sorted(self.compactList.get(run, [])),
+                                       sorted(other.compactList.get(run, [])))
         return LumiList(compactList = result)
 
 
@@ -245,11 +195,8 @@ class LumiList(object):
         """
         filteredList = []
         for (run, lumi) in lumiList:
-            runsInLumi = self.compactList.get(str(run), [[0, -1]])
-            for (first, last) in runsInLumi:
-                if lumi >= first and lumi <= last:
-                    filteredList.append((run, lumi))
-                    break
+            if self._findRange(str(run), lumi):
+                filteredList.append((run, lumi))
         return filteredList
 
 
@@ -392,27 +339,121 @@ class LumiList(object):
                 run         = run[0]
             except:
                 raise RuntimeError("Improper format for run '%s'" % run)
-        lumiRangeList = self.compactList.get( str(run) )
+        return self._findRange(str(run), lumiSection)
+
+
+    def _getRangeStarts(self, run):
+        """
+        Return the sorted lumi ranges of a run together with the list of
+        their first lumis, used to bisect the ranges. The pair is cached
+        together with a copy of the run list, and rebuilt whenever the run
+        list in compactList no longer matches it (e.g. edited in place).
+        """
+        lumiRangeList = self.compactList.get(run)
         if not lumiRangeList:
+            return None, None
+        cached = self._rangeIndex.get(run)
+        if cached and cached[0] == lumiRangeList:
+            return cached[1], cached[2]
+        ranges = sorted(lumiRangeList)
+        if any(lumiRange[1] == 0 for lumiRange in ranges):
+            # open ended ranges can't be bisected, flag them for a linear scan
+            starts = None
+        else:
+            starts = [lumiRange[0] for lumiRange in ranges]
+        self._rangeIndex[run] = ([lumiRange[:] for lumiRange in lumiRangeList], ranges, starts)
+        return ranges, starts
+
+
+    def _findRange(self, run, lumiSection):
+        """
+        Return True if lumiSection is inside one of the ranges of run (a string)
+        """
+        ranges, starts = self._getRangeStarts(run)
+        if not ranges:
             # the run isn't there, so no need to look any further
             return False
-        for lumiRange in lumiRangeList:
-            # we want to make this as found if either the lumiSection
-            # is inside the range OR if the lumi section is greater
-            # than or equal to the lower bound of the lumi range and
-            # the upper bound is 0 (which means extends to the end of
-            # the run)
-            if lumiRange[0] <= lumiSection and \
-               (0 == lumiRange[1] or lumiSection <= lumiRange[1]):
-                # got it
-                return True
-        return False
+        if starts is None:
+            for lumiRange in ranges:
+                # we want to make this as found if either the lumiSection
+                # is inside the range OR if the lumi section is greater
+                # than or equal to the lower bound of the lumi range and
+                # the upper bound is 0 (which means extends to the end of
+                # the run)
+                if lumiRange[0] <= lumiSection and \
+                   (0 == lumiRange[1] or lumiSection <= lumiRange[1]):
+                    return True
+            return False
+        # ranges are merged, so only the last one starting before lumiSection can hold it
+        idx = bisect.bisect_right(starts, lumiSection) - 1
+        return idx >= 0 and lumiSection <= ranges[idx][1]
 
 
     def __contains__ (self, runTuple):
         return self.contains (runTuple)
 
 
+def _unionRanges(aRanges, bRanges):
+    """
+    Merge two sorted lists of [first, last] lumi ranges into a single
+    sorted list, joining overlapping and adjacent ranges.
+    """
+    result = []
+    for first, last in heapq.merge(aRanges, bRanges):
+        if result and first <= result[-1][1] + 1:
+            result[-1][1] = max(result[-1][1], last)
+        else:
+            result.append([first, last])
+    return result
+
+
+def _intersectRanges(aRanges, bRanges):
+    """
+    Intersect two sorted lists of [first, last] lumi ranges walking both
+    of them only once.
+    """
+    result = []
+    i, j = 0, 0
+    while i < len(aRanges) and j < len(bRanges):
+        first = max(aRanges[i][0], bRanges[j][0])
+        last = min(aRanges[i][1], bRanges[j][1])
+        if first <= last:
+            if result and first == result[-1][1] + 1:
+                result[-1][1] = last
+            else:
+                result.append([first, last])
+        # advance whichever range finishes first
+        if aRanges[i][1] < bRanges[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def _subtractRanges(aRanges, bRanges):
+    """
+    Remove from the sorted list of [first, last] lumi ranges aRanges
+    everything covered by the sorted ranges in bRanges.
+    """
+    result = []
+    j = 0
+    for first, last in aRanges:
+        # skip the ranges ending before this one starts
+        while j < len(bRanges) and bRanges[j][1] < first:
+            j += 1
+        current = first
+        while j < len(bRanges) and bRanges[j][0] <= last:
+            if bRanges[j][0] > current:
+                result.append([current, bRanges[j][0] - 1])
+            current = max(current, bRanges[j][1] + 1)
+            if bRanges[j][1] >= last:
+                # it may still overlap the next range in aRanges
+                break
+            j += 1
+        if current <= last:
+            result.append([current, last])
+    return result
+
 
 '''
 # Unit test code
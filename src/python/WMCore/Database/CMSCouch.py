@@ -23,13 +23,15 @@ import hashlib
 import json
 import logging
 import re
+import threading
 import time
 import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pprint import pformat
 from datetime import datetime
 from http.client import HTTPException
 
-from Utils.IteratorTools import grouper, nestedDictUpdate
+from Utils.IteratorTools import flattenList, grouper, nestedDictUpdate
 from WMCore.Lexicon import sanitizeURL
 from WMCore.Services.Requests import JSONRequests
 
@@ -191,9 +193,11 @@ class Database(CouchDBRequests):
     TODO: remove leading whitespace when committing a view
     """
 
-    def __init__(self, dbname='database', url='http://localhost:5984', size=1000, ckey=None, cert=None):
+    def __init__(self, dbname='database', url='http://localhost:5984', size=1000, ckey=None, cert=None,
+                 poolSize=4):
         """
         A set of queries against a CouchDB database
+        param: poolSize: maximum number of concurrent requests (e.g. loadViewMany)
         """
         check_name(dbname)
 
@@ -206,6 +210,13 @@ class Database(CouchDBRequests):
         self.threads = []
         self.last_seq = 0
 
+        # concurrent requests: maximum number of worker threads, each one
+        # holding its own connection to the database
+        self.poolSize = poolSize
+        self._executor = None
+        self._threadConnections = threading.local()
+        self.concurrentRequestStats = {}
+
     def _reset_queue(self):
         """
         Set the queue to an empty list, e.g. after a commit
@@ -400,6 +411,50 @@ class Database(CouchDBRequests):
                                                        maxConflictLimit=maxConflictLimit - 1)
         return []
 
+    def updateBulkDocumentsWithFunction(self, docUpdates, updateFunc, updateLimits=1000, maxConflictRetries=3):
+        """
+        Apply a client side update function to many documents through _bulk_docs,
+        instead of calling a design document update handler once per document.
+        param: docUpdates: dictionary of {doc_id: update data}
+        param: updateFunc: function called as updateFunc(doc, doc_id, updateData), where doc
+            is None if the document does not exist (or was deleted). It must return the
+            document to be committed, or None to leave this document aside.
+        param: updateLimits: number of documents fetched and committed in one request
+        param: maxConflictRetries: number of times documents in conflict are fetched and updated again
+        return: list of the doc ids that could not be updated
+        """
+        uri = '/%s/_bulk_docs/' % self.name
+        failedDocIDs = []
+        pendingDocIDs = list(docUpdates)
+        for retry in range(maxConflictRetries + 1):
+            conflictDocIDs = []
+            for ids in grouper(pendingDocIDs, updateLimits):
+                # fetch the current document revisions
+                rows = self.allDocs(options={"include_docs": True}, keys=ids)['rows']
+                data = {'docs': []}
+                for row in rows:
+                    doc = updateFunc(row.get('doc'), row['key'], docUpdates[row['key']])
+                    if doc is None:
+                        failedDocIDs.append(row['key'])
+                    else:
+                        data['docs'].append(doc)
+
+                if data['docs']:
+                    for result in self.post(uri, data):
+                        if result.get('error', None) == 'conflict':
+                            conflictDocIDs.append(result['id'])
+                        elif result.get('error', None):
+                            failedDocIDs.append(result['id'])
+            if not conflictDocIDs:
+                break
+            if retry < maxConflictRetries:
+                logging.info("Retrying the bulk update of %d documents in conflict", len(conflictDocIDs))
+            else:
+                failedDocIDs.extend(conflictDocIDs)
+            pendingDocIDs = conflictDocIDs
+
+        return failedDocIDs
+
     def putDocument(self, doc_id, fields):
         """
         Call the update function update_func defined in the design document
@@ -541,8 +596,8 @@ class Database(CouchDBRequests):
         encodedOptions = {}
         for k, v in viewitems(options):
             # We can't encode the stale option, as it will be converted to '"ok"'
-            # which couch barfs on.
-            if k == "stale":
+            # which couch barfs on. Same for the document ids, which are raw strings.
+            if k in ("stale", "startkey_docid", "endkey_docid"):
                 encodedOptions[k] = v
             else:
                 encodedOptions[k] = self.encode(v)
@@ -575,7 +630,10 @@ class Database(CouchDBRequests):
         keys = keys or []
         encodedOptions = {}
         for k, v in viewitems(options):
-            encodedOptions[k] = self.encode(v)
+            if k in ("startkey_docid", "endkey_docid"):
+                encodedOptions[k] = v
+            else:
+                encodedOptions[k] = self.encode(v)
 
         if keys:
             if encodedOptions:
@@ -707,6 +765,110 @@ class Database(CouchDBRequests):
             self.queueDelete(doc)
         return self.commit()
 
+    def _getThreadConnection(self):
+        """
+        Return the database connection owned by the current worker thread,
+        creating it on its first use. Database objects are not thread safe,
+        so each worker of the pool keeps its own (keep-alive) connection.
+        """
+        conn = getattr(self._threadConnections, 'database', None)
+        if conn is None:
+            conn = Database(dbname=urllib.parse.unquote_plus(self.name), url=self['host'],
+                            ckey=self['key'], cert=self['cert'])
+            conn.additionalHeaders.update(self.additionalHeaders)
+            self._threadConnections.database = conn
+        return conn
+
+    def _runConcurrently(self, func, argsList, poolSize=None):
+        """
+        Execute func(database, *args) for each args tuple in argsList using
+        the pool of worker threads and their own database connections.
+        Exceptions are propagated to the caller.
+        param: poolSize: maximum number of concurrent requests, it defaults to self.poolSize
+        return: list with the results, in the same order as argsList
+        """
+        poolSize = min(poolSize or self.poolSize, self.poolSize)
+        latencies = [None] * len(argsList)
+
+        def timedCall(idx, args):
+            startTime = time.time()
+            try:
+                return func(self._getThreadConnection(), *args)
+            finally:
+                latencies[idx] = time.time() - startTime
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.poolSize)
+        startTime = time.time()
+        # the executor never runs more than self.poolSize requests at a time, a lower
+        # poolSize is honored by submitting a new request whenever one completes
+        futures = []
+        inFlight = set()
+        for idx, args in enumerate(argsList):
+            if poolSize < self.poolSize and len(inFlight) >= poolSize:
+                _, inFlight = wait(inFlight, return_when=FIRST_COMPLETED)
+            future = self._executor.submit(timedCall, idx, args)
+            futures.append(future)
+            inFlight.add(future)
+        results = [future.result() for future in futures]
+
+        latencies = [latency for latency in latencies if latency is not None]
+        if latencies:
+            self.concurrentRequestStats = {"requests": len(latencies),
+                                           "totalTime": time.time() - startTime,
+                                           "minLatency": min(latencies),
+                                           "maxLatency": max(latencies),
+                                           "avgLatency": sum(latencies) / len(latencies)}
+            logging.debug("Concurrent requests to %s: %s", self.name, self.concurrentRequestStats)
+        return results
+
+    def closePool(self):
+        """
+        Shutdown the worker threads used for the concurrent requests
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._threadConnections = threading.local()
+
+    def loadViewMany(self, viewRequests, poolSize=None):
+        """
+        Load many views concurrently.
+        param: viewRequests: list of dictionaries with the loadView arguments,
+            e.g. [{'design': 'JobDump', 'view': 'jobsByWorkflowName', 'options': {...}, 'keys': [...]}]
+        param: poolSize: maximum number of concurrent requests
+        return: list with the view results, in the same order as viewRequests
+        """
+        argsList = [(req['design'], req['view'], req.get('options'), req.get('keys')) for req in viewRequests]
+        return self._runConcurrently(lambda db, *args: db.loadView(*args), argsList, poolSize)
+
+    def bulkCommitParallel(self, docs=None, chunkSize=None, poolSize=None, callback=None):
+        """
+        Commit the queued documents (plus the docs list) posting chunks of
+        chunkSize documents to _bulk_docs concurrently. The callback has the
+        same semantics as in commit.
+        param: chunkSize: number of documents per request, it defaults to the queue size
+        param: poolSize: maximum number of concurrent requests
+        return: list with the result of each document, in the same order they were queued
+        """
+        allDocs = list(self._queue) + list(docs or [])
+        self._reset_queue()
+        if not allDocs:
+            return []
+
+        def commitChunk(db, chunk):
+            data = {'docs': chunk}
+            retval = db.post('/%s/_bulk_docs/' % db.name, data)
+            if callback:
+                for idx, result in enumerate(retval):
+                    if result.get('error', None) == 'conflict':
+                        retval[idx] = callback(db, data, result)
+            return retval
+
+        chunkSize = chunkSize or self._queue_size
+        argsList = [(chunk,) for chunk in grouper(allDocs, chunkSize)]
+        return flattenList(self._runConcurrently(commitChunk, argsList, poolSize))
+
 
 class RotatingDatabase(Database):
     """
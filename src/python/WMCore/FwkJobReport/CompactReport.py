@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+"""
+_CompactReport_
+
+Compact, versioned, on-disk format for the framework job report.
+
+The report is still pickled, but:
+ * every step is pickled in a separate blob, such that steps can be loaded
+   lazily, one at a time;
+ * the run/lumi dictionaries of the `runs` sections, which make most of the
+   report for jobs with many input files, are packed as arrays of lumi ranges.
+The rest of the ConfigSection tree keeps using the C pickle machinery, so
+loading the report is not slower than loading a plain pickle.
+
+The file layout is:
+    MAGIC | version (uint16) | header length (uint32) | header | step blobs
+where the header holds the top level report section and the offset/length of
+every step blob.
+"""
+
+import pickle
+import struct
+from array import array
+
+from WMCore.Configuration import ConfigSection
+from WMCore.WMException import WMException
+
+COMPACT_MAGIC = b"WMFJRC"
+COMPACT_VERSION = 1
+# readable by any python3 version
+PICKLE_PROTOCOL = 4
+_PREAMBLE = struct.Struct(">HI")
+
+
+class CompactReportException(WMException):
+    """
+    _CompactReportException_
+
+    Error reading or writing a compact framework job report
+    """
+    pass
+
+
+def packLumis(eventsPerLumi):
+    """
+    _packLumis_
+
+    Pack a {lumi: events} dictionary as a flat array of [first, last] lumi
+    ranges, plus the list of events per lumi (None if no lumi has events).
+    """
+    lumis = sorted(eventsPerLumi)
+    ranges = array('l')
+    for lumi in lumis:
+        if ranges and ranges[-1] == lumi - 1:
+            ranges[-1] = lumi
+        else:
+            ranges.extend((lumi, lumi))
+    events = [eventsPerLumi[lumi] for lumi in lumis]
+    if all(evts is None for evts in events):
+        events = None
+    return ranges, events
+
+
+def unpackLumis(ranges, events):
+    """
+    _unpackLumis_
+
+    Rebuild the {lumi: events} dictionary packed by packLumis
+    """
+    if len(ranges) == 2:
+        lumis = range(ranges[0], ranges[1] + 1)
+    else:
+        lumis = []
+        for idx in range(0, len(ranges), 2):
+            lumis.extend(range(ranges[idx], ranges[idx + 1] + 1))
+    if events is None:
+        return dict.fromkeys(lumis)
+    return dict(zip(lumis, events))
+
+
+def _isLumiDict(value):
+    return isinstance(value, dict) and all(isinstance(key, int) for key in value)
+
+
+class _PackedLumis(object):
+    """
+    Placeholder of a {lumi: events} dictionary while pickling. A contiguous
+    range of lumis without events is rebuilt with dict.fromkeys, which does
+    not need to call back into python on unpickling.
+    """
+    __slots__ = ["ranges", "events"]
+
+    def __init__(self, eventsPerLumi):
+        self.ranges, self.events = packLumis(eventsPerLumi)
+
+    def __reduce__(self):
+        if len(self.ranges) == 2 and self.events is None:
+            return dict.fromkeys, (range(self.ranges[0], self.ranges[1] + 1),)
+        return unpackLumis, (self.ranges, self.events)
+
+
+def _compactCopy(section, exclude=()):
+    """
+    Shallow copy of a ConfigSection tree to be pickled: the copy is detached
+    from the parent of the section (whose other children are stored separately)
+    and the lumis of its `runs` sections are packed. The children listed in
+    exclude are left out, while the original sections are left untouched.
+    """
+    sectionCopy = ConfigSection.__new__(ConfigSection)
+    attrs = dict((key, value) for key, value in section.__dict__.items() if key not in exclude)
+    attrs["_internal_parent_ref"] = None
+    attrs["_internal_settings"] = section._internal_settings.difference(exclude)
+    attrs["_internal_children"] = section._internal_children.difference(exclude)
+    for childName in attrs["_internal_children"]:
+        attrs[childName] = _compactCopy(attrs[childName])
+        attrs[childName]._internal_parent_ref = sectionCopy
+    if section._internal_name == "runs":
+        for run in attrs["_internal_settings"]:
+            if _isLumiDict(attrs[run]):
+                attrs[run] = _PackedLumis(attrs[run])
+    sectionCopy.__dict__.update(attrs)
+    return sectionCopy
+
+
+def _dumps(data):
+    return pickle.dumps(data, PICKLE_PROTOCOL)
+
+
+def isCompactReport(filename):
+    """
+    _isCompactReport_
+
+    Check whether a file is a compact framework job report
+    """
+    with open(filename, 'rb') as handle:
+        return handle.read(len(COMPACT_MAGIC)) == COMPACT_MAGIC
+
+
+def writeCompactReport(reportData, filename):
+    """
+    _writeCompactReport_
+
+    Write the report data (the FrameworkJobReport ConfigSection) to disk in
+    the compact format.
+    """
+    stepNames = [step for step in reportData.steps if step in reportData._internal_children]
+    blobs = [_dumps(_compactCopy(getattr(reportData, step))) for step in stepNames]
+    steps = []
+    offset = 0
+    for stepName, blob in zip(stepNames, blobs):
+        steps.append((stepName, offset, len(blob)))
+        offset += len(blob)
+
+    # the report root, without the steps
+    top = _compactCopy(reportData, exclude=stepNames)
+    header = _dumps({"version": COMPACT_VERSION, "top": top, "steps": steps})
+
+    with open(filename, 'wb') as handle:
+        handle.write(COMPACT_MAGIC)
+        handle.write(_PREAMBLE.pack(COMPACT_VERSION, len(header)))
+        handle.write(header)
+        for blob in blobs:
+            handle.write(blob)
+    return
+
+
+class CompactReportReader(object):
+    """
+    _CompactReportReader_
+
+    Read a compact framework job report, giving lazy access to its steps:
+    only the header is read on construction, every step is read and rebuilt
+    on demand.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, 'rb') as handle:
+            if handle.read(len(COMPACT_MAGIC)) != COMPACT_MAGIC:
+                raise CompactReportException("Not a compact job report: %s" % filename)
+            version, headerLength = _PREAMBLE.unpack(handle.read(_PREAMBLE.size))
+            if version > COMPACT_VERSION:
+                msg = "Unsupported compact job report version %s (supported up to %s): %s"
+                raise CompactReportException(msg % (version, COMPACT_VERSION, filename))
+            self._header = handle.read(headerLength)
+        header = pickle.loads(self._header)
+        self.version = version
+        self.dataOffset = len(COMPACT_MAGIC) + _PREAMBLE.size + headerLength
+        self.stepIndex = dict((name, (offset, length)) for name, offset, length in header["steps"])
+        self.stepNames = [step[0] for step in header["steps"]]
+
+    def listSteps(self):
+        """
+        _listSteps_
+
+        Return the name of the steps stored in the report
+        """
+        return list(self.stepNames)
+
+    def getStep(self, stepName):
+        """
+        _getStep_
+
+        Read and rebuild the ConfigSection of a single step, None if not found
+        """
+        if stepName not in self.stepIndex:
+            return None
+        offset, length = self.stepIndex[stepName]
+        with open(self.filename, 'rb') as handle:
+            handle.seek(self.dataOffset + offset)
+            return pickle.loads(handle.read(length))
+
+    def loadData(self, steps=None):
+        """
+        _loadData_
+
+        Rebuild the FrameworkJobReport ConfigSection, with all the steps or
+        only the ones listed in steps (in which case the steps attribute of
+        the report only lists those).
+        """
+        data = pickle.loads(self._header)["top"]
+        for childName in data._internal_children:
+            getattr(data, childName)._internal_parent_ref = data
+        stepNames = self.stepNames if steps is None else [step for step in self.stepNames if step in steps]
+        data.steps = [step for step in data.steps if step not in self.stepIndex or step in stepNames]
+        with open(self.filename, 'rb') as handle:
+            for stepName in stepNames:
+                offset, length = self.stepIndex[stepName]
+                handle.seek(self.dataOffset + offset)
+                setattr(data, stepName, pickle.loads(handle.read(length)))
+        return data
@@ -21,6 +21,7 @@ from Utils.Utilities import decodeBytesToUnicode, encodeUnicodeToBytes
 from WMCore.Configuration import ConfigSection
 from WMCore.DataStructs.File import File
 from WMCore.DataStructs.Run import Run
+from WMCore.FwkJobReport.CompactReport import CompactReportReader, isCompactReport, writeCompactReport
 from WMCore.FwkJobReport.FileInfo import FileInfo
 from WMCore.WMException import WMException
 from WMCore.WMExceptions import WM_JOB_ERROR_CODES
@@ -94,6 +95,19 @@ def addAttributesToFile(fileSection, **attributes):
     return
 
 
+def convertReport(inputFile, outputFile, compact=True):
+    """
+    _convertReport_
+
+    Convert a FWJR on disk from the pickle format to the compact one (or the
+    other way around, if compact is False). Both formats are accepted as input.
+    """
+    report = Report()
+    report.load(inputFile)
+    report.save(outputFile, compact)
+    return
+
+
 class Report(object):
     """
     The base class for the new jobReport
@@ -133,16 +147,17 @@ class Report(object):
         reportStep.status = status
         return
 
-    def parse(self, xmlfile, stepName="cmsRun1"):
+    def parse(self, xmlfile, stepName="cmsRun1", streaming=True):
         """
         _parse_
 
         Read in the FrameworkJobReport XML file produced
-        by cmsRun and pull the information from it into this object
+        by cmsRun and pull the information from it into this object.
+        By default the XML file is streamed (see XMLParser.xmlToJobReport)
         """
         from WMCore.FwkJobReport.XMLParser import xmlToJobReport
         try:
-            xmlToJobReport(self, xmlfile)
+            xmlToJobReport(self, xmlfile, streaming)
         except Exception as ex:
             msg = "Error reading XML job report file, possibly corrupt XML File:\n"
             msg += "Details: %s" % str(ex)
@@ -386,13 +401,16 @@ class Report(object):
 
         return returnCode, returnMessage
 
-    def persist(self, filename):
+    def persist(self, filename, compact=False):
         """
         _persist_
 
-        Pickle this object and save it to disk.
+        Pickle this object and save it to disk. If compact is True, the report
+        is saved in the compact format instead (see CompactReport).
         """
-        if PY3:
+        if compact:
+            writeCompactReport(self.data, filename)
+        elif PY3:
             with open(filename, 'wb') as handle:
                 pickle.dump(encodeUnicodeToBytes(self.data), handle)
         else:
@@ -400,13 +418,16 @@ class Report(object):
                 pickle.dump(self.data, handle)
         return
 
-    def unpersist(self, filename, reportname=None):
+    def unpersist(self, filename, reportname=None, steps=None):
         """
         _unpersist_
 
-        Load a pickled FWJR from disk.
+        Load a pickled or compact FWJR from disk. For compact reports, the
+        load can be restricted to the list of steps provided.
         """
-        if PY3:
+        if PY3 and isCompactReport(filename):
+            self.data = CompactReportReader(filename).loadData(steps)
+        elif PY3:
             with open(filename, 'rb') as handle:
                 self.data = decodeBytesToUnicode(pickle.load(handle))
         else:
@@ -769,13 +790,13 @@ class Report(object):
         self.unpersist(filename)
         return
 
-    def save(self, filename):
+    def save(self, filename, compact=False):
         """
         _save_
 
         This just maps to persist
         """
-        self.persist(filename)
+        self.persist(filename, compact)
         return
 
     def getOutputModule(self, step, outputModule):
@@ -1480,6 +1501,21 @@ class Report(object):
 
         return
 
+    def setStepPSS(self, stepName, minimum, maximum, average):
+        """
+        _setStepPSS_
+
+        Set the Performance PSS information
+        """
+
+        reportStep = self.retrieveStep(stepName)
+        reportStep.performance.section_('PSSMemory')
+        reportStep.performance.PSSMemory.min = minimum
+        reportStep.performance.PSSMemory.max = maximum
+        reportStep.performance.PSSMemory.average = average
+
+        return
+
     def setStepPMEM(self, stepName, minimum, maximum, average):
         """
         _setStepPMEM_
@@ -1525,6 +1561,22 @@ class Report(object):
 
         return
 
+    def setStepPerformanceTimeSeries(self, stepName, timeSeries, numSamples):
+        """
+        _setStepPerformanceTimeSeries_
+
+        Set the time series sampled by the PerformanceMonitor, a dictionary
+        with one list of values per metric plus the 'time' offsets (in seconds)
+        """
+
+        reportStep = self.retrieveStep(stepName)
+        reportStep.performance.section_('TimeSeries')
+        reportStep.performance.TimeSeries.numSamples = numSamples
+        for metric, values in timeSeries.items():
+            setattr(reportStep.performance.TimeSeries, metric, values)
+
+        return
+
     def setStepCounter(self, stepName, counter):
         """
         _setStepCounter_
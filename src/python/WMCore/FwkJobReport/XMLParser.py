@@ -9,7 +9,7 @@ from __future__ import division, print_function
 import logging
 import re
 
-from WMCore.Algorithms.ParseXMLFile import coroutine, xmlFileToNode
+from WMCore.Algorithms.ParseXMLFile import coroutine, xmlFileToNode, xmlFileToNodeStream
 from WMCore.DataStructs.Run import Run
 from WMCore.FwkJobReport import Report
 
@@ -29,6 +29,18 @@ def reportBuilder(nodeStruct, report, target):
         target.send((report, node))
 
 
+def dispatchReportNode(report, node, targets):
+    """
+    _dispatchReportNode_
+
+    Send a child node of the FrameworkJobReport to its handler.
+    """
+    if node.name in targets:
+        targets[node.name].send((report, node))
+    else:
+        setattr(report.report.parameters, node.name, node.text)
+
+
 @coroutine
 def reportDispatcher(targets):
     """
@@ -45,24 +57,23 @@ def reportDispatcher(targets):
             continue
 
         for subnode in node.children:
-            if subnode.name == "File":
-                targets['File'].send((report, subnode))
-            elif subnode.name == "InputFile":
-                targets['InputFile'].send((report, subnode))
-            elif subnode.name == "AnalysisFile":
-                targets['AnalysisFile'].send((report, subnode))
-            elif subnode.name == "PerformanceReport":
-                targets['PerformanceReport'].send((report, subnode))
-            elif subnode.name == "FrameworkError":
-                targets['FrameworkError'].send((report, subnode))
-            elif subnode.name == "SkippedFile":
-                targets['SkippedFile'].send((report, subnode))
-            elif subnode.name == "FallbackAttempt":
-                targets['FallbackAttempt'].send((report, subnode))
-            elif subnode.name == "SkippedEvent":
-                targets['SkippedEvent'].send((report, subnode))
-            else:
-                setattr(report.report.parameters, subnode.name, subnode.text)
+            dispatchReportNode(report, subnode, targets)
+
+
+@coroutine
+def streamDispatcher(report, targets):
+    """
+    _streamDispatcher_
+
+    Streaming version of the reportDispatcher, receiving the children of the
+    FrameworkJobReport one at a time, as soon as they are parsed.
+    """
+    while True:
+        parent, node = (yield)
+        if parent.name != "FrameworkJobReport":
+            logging.debug("Not Handling: %s/%s", parent.name, node.name)
+            continue
+        dispatchReportNode(report, node, targets)
 
 
 @coroutine
@@ -554,17 +565,20 @@ def perfStoreHandler():
             logging.error("Not adding any storage performance info to report.")
 
 
-def xmlToJobReport(reportInstance, xmlFile):
+def xmlToJobReport(reportInstance, xmlFile, streaming=True):
     """
     _xmlToJobReport_
 
     parse the XML file and insert the information into the
     Report instance provided
 
-    """
-    # read XML, build node structure
-    node = xmlFileToNode(xmlFile)
+    If streaming is True, every part of the report is handled as soon as it
+    is parsed and then dropped, instead of building the whole node structure
+    first: memory usage is then bounded by the largest part of the report
+    (e.g. a file with its runs and lumis), instead of growing with the size
+    of the XML file.
 
+    """
     #  //
     # // Set up coroutine pipeline
     # //
@@ -592,6 +606,14 @@ def xmlToJobReport(reportInstance, xmlFile):
         "SkippedEvent": skippedEventHandler(),
     }
 
+    if streaming:
+        # read XML feeding the pipeline with every child of the FrameworkJobReport
+        xmlFileToNodeStream(xmlFile, streamDispatcher(reportInstance, dispatchers))
+        return
+
+    # read XML, build node structure
+    node = xmlFileToNode(xmlFile)
+
     #  //
     # // Feed pipeline with node structure and report result instance
     # //
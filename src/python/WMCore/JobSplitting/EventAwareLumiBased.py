@@ -21,7 +21,7 @@ import operator
 
 from WMCore.DataStructs.Run import Run
 from WMCore.JobSplitting.JobFactory import JobFactory
-from WMCore.JobSplitting.LumiBased import isGoodLumi, isGoodRun, LumiChecker
+from WMCore.JobSplitting.LumiBased import LumiChecker, LumiMaskFilter
 from WMCore.WMBS.File import File
 from WMCore.WMSpec.WMTask import buildLumiMask
 
@@ -103,6 +103,8 @@ class EventAwareLumiBased(JobFactory):
                 logging.exception(msg)
                 return
 
+        lumiMask = LumiMaskFilter(goodRunList, runWhitelist)
+
         lDict = self.getFilesSortedByLocation(avgEventsPerJob)
         if not lDict:
             logging.info("There are not enough events/files to be splitted. Trying again next cycle")
@@ -202,12 +204,10 @@ class EventAwareLumiBased(JobFactory):
                     lumisPerJob = max(lumisInJob + lumisAllowed, 1)
 
                 for run in f['runs']:
-                    if not isGoodRun(goodRunList=goodRunList, run=run.run):
-                        # Then skip this one
-                        continue
-                    if len(runWhitelist) > 0 and not run.run in runWhitelist:
-                        # Skip due to run whitelist
+                    if not lumiMask.isGoodRun(run.run):
+                        # Then skip this one, either not in the lumi mask or in the run whitelist
                         continue
+                    goodLumis = lumiMask.filterLumis(run.run, run)
                     firstLumi = None
 
                     if splitOnRun and run.run != lastRun:
@@ -216,7 +216,7 @@ class EventAwareLumiBased(JobFactory):
 
                     # Now loop over the lumis
                     for lumi in run:
-                        if (not isGoodLumi(goodRunList, run=run.run, lumi=lumi) or
+                        if (lumi not in goodLumis or
                                 self.lumiChecker.isSplitLumi(run.run, lumi, f)):
                             # Kill the chain of good lumis
                             # Skip this lumi
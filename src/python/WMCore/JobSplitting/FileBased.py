@@ -13,7 +13,7 @@ from builtins import int
 from WMCore.JobSplitting.JobFactory import JobFactory
 from WMCore.WMBS.File import File
 from WMCore.WMSpec.WMTask import buildLumiMask
-from WMCore.JobSplitting.LumiBased import isGoodRun, isGoodLumi
+from WMCore.JobSplitting.LumiBased import LumiMaskFilter
 
 
 class FileBased(JobFactory):
@@ -41,6 +41,7 @@ class FileBased(JobFactory):
         goodRunList = {}
         if runs and lumis:
             goodRunList = buildLumiMask(runs, lumis)
+        lumiMask = LumiMaskFilter(goodRunList)
 
         #Get a dictionary of sites, files
         lDict = self.sortByLocation()
@@ -80,12 +81,9 @@ class FileBased(JobFactory):
                 for f in files:
                     skipFile = True
                     for run in f['runs']:
-                        if not isGoodRun(goodRunList, run.run):
-                            continue
-                        for lumi in run:
-                            if not isGoodLumi(goodRunList, run.run, lumi):
-                                continue
+                        if lumiMask.isGoodRun(run.run) and lumiMask.filterLumis(run.run, run):
                             skipFile = False
+                            break
                     if skipFile:
                         skippedFiles.append(f)
                 for f in skippedFiles:
@@ -121,12 +119,13 @@ class FileBased(JobFactory):
                     createNewJob = True
                 if runs and lumis:
                     for run in f['runs']:
-                        if not isGoodRun(goodRunList, run.run):
+                        if not lumiMask.isGoodRun(run.run):
                             continue
+                        goodLumis = lumiMask.filterLumis(run.run, run)
                         firstLumi = None
                         lastLumi = None
                         for lumi in run:
-                            if not isGoodLumi(goodRunList, run.run, lumi):
+                            if lumi not in goodLumis:
                                 if firstLumi != None and lastLumi != None:
                                     self.currentJob['mask'].addRunAndLumis(run = run.run, lumis = [firstLumi, lastLumi])
                                     addedEvents = ((lastLumi - firstLumi + 1) * f['avgEvtsPerLumi'])
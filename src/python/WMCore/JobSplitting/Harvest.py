@@ -11,7 +11,7 @@ import logging
 from WMCore.JobSplitting.JobFactory import JobFactory
 from WMCore.Services.UUIDLib import makeUUID
 from WMCore.DAOFactory import DAOFactory
-from WMCore.JobSplitting.LumiBased import isGoodRun, isGoodLumi
+from WMCore.JobSplitting.LumiBased import LumiMaskFilter
 from WMCore.DataStructs.Run import Run
 from WMCore.WMSpec.WMTask import buildLumiMask
 
@@ -48,6 +48,8 @@ class Harvest(JobFactory):
         fileset.loadData(parentage=0)
         allFiles = fileset.getFiles()
 
+        maskFilter = LumiMaskFilter(lumiMask)
+
         # sort by location and run
         locationDict = {}
         runDict = {}
@@ -80,14 +82,11 @@ class Harvest(JobFactory):
                 # it has lumiMask, thus we consider only good run/lumis
                 newRunSet = []
                 for run in runSet:
-                    if not isGoodRun(lumiMask, run.run):
+                    if not maskFilter.isGoodRun(run.run):
                         continue
-                    # then loop over lumis
-                    maskedLumis = []
-                    for lumi in run.lumis:
-                        if not isGoodLumi(lumiMask, run.run, lumi):
-                            continue
-                        maskedLumis.append(lumi)
+                    # then keep only the good lumis
+                    goodLumis = maskFilter.filterLumis(run.run, run.lumis)
+                    maskedLumis = [lumi for lumi in run.lumis if lumi in goodLumis]
 
                     if not maskedLumis:
                         continue
@@ -48,6 +48,9 @@ class JobFactory(WMObject):
         self.siteBlacklist = []
         self.trustSitelists = False
         self.trustPUSitelists = False
+        self.pnn_to_psn = {}
+        # cache of {frozenset(PNNs): (fileLocations, possiblePSN)} used while committing
+        self.locationCache = {}
 
         if package == "WMCore.WMBS":
             myThread = threading.currentThread()
@@ -183,24 +186,12 @@ class JobFactory(WMObject):
 
         if self.package == 'WMCore.WMBS':
 
+            # jobs sharing the same input locations share the same PSN sets
+            self.locationCache = {}
             for jobGroup in self.jobGroups:
 
                 for job in jobGroup.newjobs:
-                    # temporary place holder for file location
-                    fileLocations = set([])
-                    if self.trustSitelists:
-                        locSet = set(self.siteWhitelist) - set(self.siteBlacklist)
-                    else:
-                        locSet = set([])
-                        for pnn in job['input_files'][0]['locations']:
-                            locSet.update(self.pnn_to_psn.get(pnn, []))
-                        fileLocations = locSet
-                        if len(self.siteWhitelist) > 0:
-                            locSet = locSet & set(self.siteWhitelist)
-                        if len(self.siteBlacklist) > 0:
-                            locSet = locSet - set(self.siteBlacklist)
-
-                    job['possiblePSN'] = locSet
+                    fileLocations, job['possiblePSN'] = self.getJobLocations(job['input_files'][0]['locations'])
                     if len(job['possiblePSN']) == 0:
                         # NOTE: If we have no place to execute a single job we mark it as failedOnCreation.
                         #       We have two options:
@@ -226,6 +217,7 @@ class JobFactory(WMObject):
                     for fileInfo in job['input_files']:
                         fileInfo['locations'] = set([])
 
+            self.locationCache = {}
             self.subscription.bulkCommit(jobGroups=self.jobGroups)
 
         else:
@@ -239,6 +231,39 @@ class JobFactory(WMObject):
 
         return
 
+    def getJobLocations(self, pnns):
+        """
+        _getJobLocations_
+
+        Resolve the input file PNNs of a job into the PSNs it can run at,
+        applying the site white and black lists (or only the site lists when
+        trustSitelists is enabled). The result is memoized for each distinct
+        set of PNNs while committing, thus jobs with the same input locations
+        share the same sets.
+        :param pnns: iterable with the PNNs of the job input
+        :return: a tuple with the set of PSNs hosting the input files and the
+            set of possible PSNs for the job
+        """
+        locKey = frozenset(pnns)
+        if locKey in self.locationCache:
+            return self.locationCache[locKey]
+
+        fileLocations = set()
+        if self.trustSitelists:
+            locSet = set(self.siteWhitelist) - set(self.siteBlacklist)
+        else:
+            locSet = set()
+            for pnn in locKey:
+                locSet.update(self.pnn_to_psn.get(pnn, []))
+            fileLocations = locSet
+            if len(self.siteWhitelist) > 0:
+                locSet = locSet & set(self.siteWhitelist)
+            if len(self.siteBlacklist) > 0:
+                locSet = locSet - set(self.siteBlacklist)
+
+        self.locationCache[locKey] = (fileLocations, locSet)
+        return self.locationCache[locKey]
+
     def sortByLocation(self):
         """
         _sortByLocation_
@@ -10,6 +10,7 @@ from __future__ import division
 from builtins import range, object, int
 from future.utils import viewitems, viewvalues
 
+import bisect
 import logging
 import operator
 
@@ -60,6 +61,68 @@ def isGoodRun(goodRunList, run):
     return False
 
 
+class LumiMaskFilter(object):
+    """
+    Compiled version of a goodRunList lumi mask plus an optional run whitelist.
+
+    The mask is built once per splitting call, with integer run keys and the
+    lumi ranges of each run merged and sorted, such that run checks are a set
+    lookup and lumi checks are a bisect instead of a scan of all the ranges.
+    An empty goodRunList accepts every run and lumi, like isGoodRun/isGoodLumi.
+    """
+
+    def __init__(self, goodRunList=None, runWhitelist=None):
+        self.runWhitelist = set(int(run) for run in runWhitelist or [])
+        # None means there is no lumi mask, otherwise {run: (firstLumis, lastLumis)}
+        self.runRanges = None
+        if goodRunList:
+            self.runRanges = {}
+            for run, lumiRanges in viewitems(goodRunList):
+                validRanges = []
+                for lumiRange in lumiRanges:
+                    if not len(lumiRange) == 2:
+                        logging.error("Invalid run range %s for run %s! Failing its lumis!", lumiRange, run)
+                        continue
+                    validRanges.append((int(lumiRange[0]), int(lumiRange[1])))
+                firstLumis = []
+                lastLumis = []
+                for first, last in sorted(validRanges):
+                    if lastLumis and first <= lastLumis[-1] + 1:
+                        lastLumis[-1] = max(lastLumis[-1], last)
+                    else:
+                        firstLumis.append(first)
+                        lastLumis.append(last)
+                self.runRanges[int(run)] = (firstLumis, lastLumis)
+
+    def isGoodRun(self, run):
+        """
+        Tell if this run passes both the run whitelist and the lumi mask
+        """
+        if self.runWhitelist and run not in self.runWhitelist:
+            return False
+        return self.runRanges is None or run in self.runRanges
+
+    def isGoodLumi(self, run, lumi):
+        """
+        Tell if this run/lumi combination is within the lumi mask
+        """
+        if self.runRanges is None:
+            return True
+        if run not in self.runRanges:
+            return False
+        firstLumis, lastLumis = self.runRanges[run]
+        idx = bisect.bisect_right(firstLumis, lumi) - 1
+        return idx >= 0 and lumi <= lastLumis[idx]
+
+    def filterLumis(self, run, lumis):
+        """
+        Return the set of lumis of this run that are within the lumi mask
+        """
+        if self.runRanges is None:
+            return set(lumis)
+        return set(lumi for lumi in lumis if self.isGoodLumi(run, lumi))
+
+
 class LumiChecker(object):
     """ 
     Simple utility class that helps correcting dataset that have lumis split across jobs:
@@ -202,6 +265,8 @@ class LumiBased(JobFactory):
                 logging.exception(msg)
                 return
 
+        lumiMask = LumiMaskFilter(goodRunList, runWhitelist)
+
         lDict = self.getFilesSortedByLocation(lumisPerJob)
         if not lDict:
             logging.info("There are not enough lumis/files to be splitted. Trying again next cycle")
@@ -261,12 +326,10 @@ class LumiBased(JobFactory):
                     stopJob = True
 
                 for run in f['runs']:
-                    if not isGoodRun(goodRunList=goodRunList, run=run.run):
-                        # Then skip this one
-                        continue
-                    if len(runWhitelist) > 0 and not run.run in runWhitelist:
-                        # Skip due to run whitelist
+                    if not lumiMask.isGoodRun(run.run):
+                        # Then skip this one, either not in the lumi mask or in the run whitelist
                         continue
+                    goodLumis = lumiMask.filterLumis(run.run, run)
                     firstLumi = None
 
                     if splitOnRun and run.run != lastRun:
@@ -276,7 +339,7 @@ class LumiBased(JobFactory):
                     # Now loop over the lumis
                     for lumi in run:
                         # splitLumi checks if the lumi is split across jobs
-                        if (not isGoodLumi(goodRunList, run=run.run, lumi=lumi)
+                        if (lumi not in goodLumis
                             or self.lumiChecker.isSplitLumi(run.run, lumi, f)):
                             # Kill the chain of good lumis
                             # Skip this lumi
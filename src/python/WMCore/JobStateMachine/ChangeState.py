@@ -128,6 +128,38 @@ def shrinkLargeSummary(couchDbInstance, sizeLimit):
                     logging.error("Unexpected data type: %s", type(doc[innerAttr]))
 
 
+def applyStateTransition(doc, docId, transition):
+    """
+    _applyStateTransition_
+
+    Python version of the JobDump/stateTransition update handler, to be
+    used with the bulk document updates. Appends the transition to the
+    states of the job document, creating the document if needed.
+    """
+    if doc is None:
+        doc = {"_id": docId, "states": {}}
+    maxKey = max([int(key) for key in doc.setdefault("states", {})] + [0])
+    doc["states"][str(maxKey + 1)] = transition
+    return doc
+
+
+def applySummaryTransition(doc, docId, summaryUpdate):
+    """
+    _applySummaryTransition_
+
+    Python version of the WMStatsAgent/jobSummaryState plus the
+    WMStatsAgent/jobStateTransition update handlers, to be used with
+    the bulk document updates. Job summaries that do not exist are left
+    aside (None is returned), like the update handler does.
+    """
+    if doc is None:
+        return None
+    doc["state"] = summaryUpdate["newstate"]
+    doc["timestamp"] = summaryUpdate["timestamp"]
+    doc.setdefault("state_history", []).append(summaryUpdate["transition"])
+    return doc
+
+
 def getDataFromSpecFile(specFile):
     workload = WMWorkloadHelper()
     workload.load(specFile)
@@ -159,6 +191,9 @@ class ChangeState(WMObject, WMConnectionBase):
 
         # max total number of documents to be committed in the same Couch operation
         self.maxBulkCommit = getattr(self.config.JobStateMachine, 'maxBulkCommitDocs', 250)
+        # number of state transitions applied through _bulk_docs in one go, 0 means one update request per job
+        self.transitionBatchSize = getattr(self.config.JobStateMachine, 'couchTransitionBatchSize', 0)
+        self.transitionConflictRetries = getattr(self.config.JobStateMachine, 'couchTransitionConflictRetries', 3)
         self.couchdb = CouchServer(self.config.JobStateMachine.couchurl)
         self._connectDatabases()
 
@@ -287,6 +322,10 @@ class ChangeState(WMObject, WMConnectionBase):
 
         timestamp = int(time.time())
         couchRecordsToUpdate = []
+        # transitions to be applied in bulk, key'ed by document id
+        jobTransitions = {}
+        summaryTransitions = {}
+        jobCouchDocIDs = []
 
         for job in jobs:
             couchDocID = job.get("couch_record", None)
@@ -353,41 +392,42 @@ class ChangeState(WMObject, WMConnectionBase):
                     self.jobsdatabase.commit(callback=discardConflictingDocument)
                 self.jobsdatabase.queue(jobDocument, callback=discardConflictingDocument)
             else:
-                # We send a PUT request to the stateTransition update handler.
-                # Couch expects the parameters to be passed as arguments to in
-                # the URI while the Requests class will only encode arguments
-                # this way for GET requests.  Changing the Requests class to
-                # encode PUT arguments as couch expects broke a bunch of code so
-                # we'll just do our own encoding here.
-                updateUri = "/" + self.jobsdatabase.name + "/_design/JobDump/_update/stateTransition/" + couchDocID
-                updateUri += "?oldstate=%s&newstate=%s&location=%s&timestamp=%s" % (oldstate,
-                                                                                    newstate,
-                                                                                    jobLocation,
-                                                                                    timestamp)
-                self.jobsdatabase.makeRequest(uri=updateUri, type="PUT", decode=False)
+                transition = {"oldstate": oldstate,
+                              "newstate": newstate,
+                              "location": jobLocation,
+                              "timestamp": timestamp}
+                if self.transitionBatchSize > 0:
+                    jobTransitions[couchDocID] = transition
+                else:
+                    self._putStateTransition(couchDocID, transition)
 
             # updating the status of the summary doc only when it is explicitely requested
             # doc is already in couch
             if updatesummary:
                 jobSummaryId = job["name"]
-                updateUri = "/" + self.jsumdatabase.name + "/_design/WMStatsAgent/_update/jobSummaryState/" + jobSummaryId
                 # map retrydone state to jobfailed state for monitoring
                 if newstate == "retrydone":
                     monitorState = "jobfailed"
                 else:
                     monitorState = newstate
-                updateUri += "?newstate=%s&timestamp=%s" % (monitorState, timestamp)
-                self.jsumdatabase.makeRequest(uri=updateUri, type="PUT", decode=False)
-                logging.debug("Updated job summary status for job %s", jobSummaryId)
-
-                updateUri = "/" + self.jsumdatabase.name + "/_design/WMStatsAgent/_update/jobStateTransition/" + jobSummaryId
-                updateUri += "?oldstate=%s&newstate=%s&location=%s&timestamp=%s" % (oldstate,
-                                                                                    monitorState,
-                                                                                    job["location"],
-                                                                                    timestamp)
-                self.jsumdatabase.makeRequest(uri=updateUri, type="PUT", decode=False)
-                logging.debug("Updated job summary state history for job %s", jobSummaryId)
+                summaryUpdate = {"newstate": monitorState,
+                                 "timestamp": timestamp,
+                                 "transition": {"oldstate": oldstate,
+                                                "newstate": monitorState,
+                                                "location": str(job["location"]),
+                                                "timestamp": timestamp}}
+                if self.transitionBatchSize > 0:
+                    summaryTransitions[jobSummaryId] = summaryUpdate
+                else:
+                    self._putSummaryTransition(jobSummaryId, summaryUpdate)
 
+            jobCouchDocIDs.append((job, couchDocID))
+
+        # the job summaries built from the fwjr below rely on the transitions being already applied
+        if jobTransitions or summaryTransitions:
+            self._bulkRecordTransitions(jobTransitions, summaryTransitions)
+
+        for job, couchDocID in jobCouchDocIDs:
             if job.get("fwjr", None):
 
                 cachedByWorkflow = self.workloadCache.setdefault(job['workflow'],
@@ -583,6 +623,73 @@ class ChangeState(WMObject, WMConnectionBase):
             self.jsumdatabase.commit()
         return
 
+    def _putStateTransition(self, couchDocID, transition):
+        """
+        _putStateTransition_
+
+        Record a single state transition in the job document.
+        """
+        # We send a PUT request to the stateTransition update handler.
+        # Couch expects the parameters to be passed as arguments to in
+        # the URI while the Requests class will only encode arguments
+        # this way for GET requests.  Changing the Requests class to
+        # encode PUT arguments as couch expects broke a bunch of code so
+        # we'll just do our own encoding here.
+        updateUri = "/" + self.jobsdatabase.name + "/_design/JobDump/_update/stateTransition/" + couchDocID
+        updateUri += "?oldstate=%s&newstate=%s&location=%s&timestamp=%s" % (transition["oldstate"],
+                                                                            transition["newstate"],
+                                                                            transition["location"],
+                                                                            transition["timestamp"])
+        self.jobsdatabase.makeRequest(uri=updateUri, type="PUT", decode=False)
+
+    def _putSummaryTransition(self, jobSummaryId, summaryUpdate):
+        """
+        _putSummaryTransition_
+
+        Update the state and the state history of a single job summary.
+        """
+        updateUri = "/" + self.jsumdatabase.name + "/_design/WMStatsAgent/_update/jobSummaryState/" + jobSummaryId
+        updateUri += "?newstate=%s&timestamp=%s" % (summaryUpdate["newstate"], summaryUpdate["timestamp"])
+        self.jsumdatabase.makeRequest(uri=updateUri, type="PUT", decode=False)
+        logging.debug("Updated job summary status for job %s", jobSummaryId)
+
+        transition = summaryUpdate["transition"]
+        updateUri = "/" + self.jsumdatabase.name + "/_design/WMStatsAgent/_update/jobStateTransition/" + jobSummaryId
+        updateUri += "?oldstate=%s&newstate=%s&location=%s&timestamp=%s" % (transition["oldstate"],
+                                                                            transition["newstate"],
+                                                                            transition["location"],
+                                                                            transition["timestamp"])
+        self.jsumdatabase.makeRequest(uri=updateUri, type="PUT", decode=False)
+        logging.debug("Updated job summary state history for job %s", jobSummaryId)
+
+    def _bulkRecordTransitions(self, jobTransitions, summaryTransitions):
+        """
+        _bulkRecordTransitions_
+
+        Apply the job and job summary state transitions through _bulk_docs,
+        in batches of couchTransitionBatchSize documents. Documents that
+        could not be updated in bulk (e.g. conflicts that persist after the
+        retries) fall back to the single document update handlers.
+        """
+        startTime = time.time()
+        failedIDs = self.jobsdatabase.updateBulkDocumentsWithFunction(jobTransitions, applyStateTransition,
+                                                                      updateLimits=self.transitionBatchSize,
+                                                                      maxConflictRetries=self.transitionConflictRetries)
+        for couchDocID in failedIDs:
+            self._putStateTransition(couchDocID, jobTransitions[couchDocID])
+
+        failedIDs = self.jsumdatabase.updateBulkDocumentsWithFunction(summaryTransitions, applySummaryTransition,
+                                                                      updateLimits=self.transitionBatchSize,
+                                                                      maxConflictRetries=self.transitionConflictRetries)
+        for jobSummaryId in failedIDs:
+            self._putSummaryTransition(jobSummaryId, summaryTransitions[jobSummaryId])
+
+        elapsed = time.time() - startTime
+        numTransitions = len(jobTransitions) + len(summaryTransitions)
+        logging.info("Recorded %d job state transitions in couch in %.2f secs (%.1f transitions/sec)",
+                     numTransitions, elapsed, numTransitions / elapsed if elapsed else 0.0)
+        return
+
     def persist(self, jobs, newstate, oldstate):
         """
         _persist_
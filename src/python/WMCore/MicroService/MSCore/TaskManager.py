@@ -16,6 +16,13 @@ import time
 import json
 import hashlib
 import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from concurrent.futures import wait as waitFutures
+try:
+    from concurrent.futures import InvalidStateError
+except ImportError:
+    # python < 3.8, where a done future can be silently set again, see setFutureResult
+    InvalidStateError = RuntimeError
 from queue import Queue
 
 # WMCore modules
@@ -107,15 +114,74 @@ class UidSet(object):
         "Get value for given uid"
         return self.set.get(uid, 0)
 
+class TaskStats(object):
+    """
+    Thread safe holder of the task durations, kept per function name
+    as a histogram of durations together with a few summary values
+    """
+    # upper bounds, in seconds, of the duration histogram buckets
+    buckets = (0.1, 0.5, 1, 5, 10, 30, 60, 300, 600, float('inf'))
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def record(self, name, duration, failed=False):
+        "Record the duration of a task executing the given function"
+        with self.lock:
+            stats = self.stats.setdefault(name, {'count': 0, 'failed': 0, 'total': 0.0, 'max': 0.0,
+                                                 'histogram': [0] * len(self.buckets)})
+            stats['count'] += 1
+            stats['failed'] += 1 if failed else 0
+            stats['total'] += duration
+            stats['max'] = max(stats['max'], duration)
+            for idx, bound in enumerate(self.buckets):
+                if duration <= bound:
+                    stats['histogram'][idx] += 1
+                    break
+
+    def summary(self):
+        "Return a summary of the task durations per function name"
+        summary = {}
+        with self.lock:
+            for name, stats in self.stats.items():
+                summary[name] = {'count': stats['count'], 'failed': stats['failed'],
+                                 'total': stats['total'], 'max': stats['max'],
+                                 'mean': stats['total'] / stats['count'],
+                                 'histogram': {'le_%s' % bound: count for bound, count
+                                               in zip(self.buckets, stats['histogram'])}}
+        return summary
+
+
+def setFutureResult(future, result=None, exc=None):
+    """
+    Set the result or the exception of a future, unless it is already done
+    e.g. it got cancelled or it timed out in the meantime.
+    :return: True if the future got updated, False otherwise
+    """
+    if future.done():
+        return False
+    try:
+        if exc is None:
+            future.set_result(result)
+        else:
+            future.set_exception(exc)
+    except InvalidStateError:
+        return False
+    return True
+
+
 class Worker(threading.Thread):
     """Thread executing worker from a given tasks queue"""
-    def __init__(self, name, taskq, pidq, uidq, logger=None):
+    def __init__(self, name, taskq, pidq, uidq, logger=None, stats=None, timeout=None):
         self.logger = getMSLogger(verbose=True, logger=logger)
         threading.Thread.__init__(self, name=name)
         self.exit = 0
         self.tasks = taskq
         self.pids = pidq
         self.uids = uidq
+        self.stats = stats if stats is not None else TaskStats()
+        self.timeout = timeout
         self.daemon = True
         self.start()
 
@@ -132,16 +198,48 @@ class Worker(threading.Thread):
             if task is None:
                 return
             if self.exit:
+                # release whoever waits for this task
+                task[5].cancel()
                 return
-            evt, pid, func, args, kwargs = task
             try:
-                func(*args, **kwargs)
-                self.pids.discard(pid)
-            except Exception as exc:
-                self.pids.discard(pid)
-                msg = "func=%s args=%s kwargs=%s" % (func, args, kwargs)
-                self.logger.error('error %s, call %s', str(exc), msg)
-            evt.set()
+                self.execute(task)
+            finally:
+                self.tasks.task_done()
+
+    def execute(self, task):
+        """
+        Execute a single task and set the outcome of its future, which in
+        turn releases the task pid and sets its event, see TaskManager.submit
+        """
+        _evt, _pid, func, args, kwargs, future, submitTime = task
+        if future.done() and not future.cancelled():
+            # the task timed out while waiting in the queue, see TaskManager._expire
+            return
+        try:
+            if not future.set_running_or_notify_cancel():
+                # the task got cancelled while waiting in the queue
+                return
+        except RuntimeError:
+            # the task timed out in the meantime
+            return
+        startTime = time.time()
+        if self.timeout is not None and startTime - submitTime > self.timeout:
+            msg = "task timed out after waiting %.1f secs in the queue" % (startTime - submitTime)
+            setFutureResult(future, exc=FutureTimeoutError(msg))
+            return
+        future.startTime = startTime
+        try:
+            result = func(*args, **kwargs)
+        except Exception as exc:
+            self.stats.record(getattr(func, '__name__', str(func)), time.time() - startTime, failed=True)
+            msg = "func=%s args=%s kwargs=%s" % (func, args, kwargs)
+            self.logger.error('error %s, call %s', str(exc), msg)
+            setFutureResult(future, exc=exc)
+        else:
+            self.stats.record(getattr(func, '__name__', str(func)), time.time() - startTime)
+            if not setFutureResult(future, result=result):
+                self.logger.warning("Result of func=%s args=%s discarded, its task timed out or got cancelled",
+                                    func, args)
 
 class TaskManager(object):
     """
@@ -150,6 +248,15 @@ class TaskManager(object):
     pool of thread workers, queue of tasks and pid
     set to monitor jobs execution.
 
+    Every task is backed by a concurrent.futures.Future, carrying
+    either the function result or the exception it raised. The
+    queue of tasks can be bounded (spawn and submit then block
+    while it is full), and tasks can be given a timeout: tasks
+    which do not complete within it, counting from their submission
+    when still queued and from their start when running, fail with
+    a concurrent.futures.TimeoutError. Running tasks cannot be
+    interrupted though, their late result is simply discarded.
+
     .. doctest::
 
         Use case:
@@ -158,21 +265,38 @@ class TaskManager(object):
         jobs.append(mgr.spawn(func, args))
         mgr.joinall(jobs)
 
+        or, collecting results:
+        futures = [mgr.submit(func, arg) for arg in args]
+        mgr.joinall(futures)
+        results = [future.result() for future in futures]
+
     """
-    def __init__(self, nworkers=10, name='TaskManager', logger=None):
+    def __init__(self, nworkers=10, name='TaskManager', logger=None, maxQueueSize=0, timeout=None):
+        """
+        :param nworkers: number of worker threads
+        :param name: name of the worker threads
+        :param logger: logger object
+        :param maxQueueSize: maximum number of queued tasks, 0 for no limit
+        :param timeout: per task timeout in seconds, None for no timeout
+        """
         self.logger = getMSLogger(verbose=True, logger=logger)
         self.name = name
+        self.timeout = timeout
         self.pids = set()
         self.uids = UidSet()
-        self.tasks = Queue()
-        self.workers = [Worker(name, self.tasks, self.pids, self.uids, logger) \
+        self.futures = {}
+        self.stats = TaskStats()
+        self.tasks = Queue(maxsize=maxQueueSize)
+        self.workers = [Worker(name, self.tasks, self.pids, self.uids, logger,
+                               stats=self.stats, timeout=timeout) \
                         for _ in range(0, nworkers)]
 
     def status(self):
         "Return status of task manager queue"
         info = {'qsize':self.tasks.qsize(), 'full':self.tasks.full(),
                 'unfinished':self.tasks.unfinished_tasks,
-                'nworkers':len(self.workers)}
+                'nworkers':len(self.workers),
+                'durations':self.stats.summary()}
         return {self.name: info}
 
     def nworkers(self):
@@ -184,15 +308,48 @@ class TaskManager(object):
         pid = kwargs.get('pid', genkey(str(args) + str(kwargs)))
         evt = threading.Event()
         if  not pid in self.pids:
-            self.pids.add(pid)
-            task = (evt, pid, func, args, kwargs)
-            self.tasks.put(task)
+            evt.future = self._enqueue(evt, pid, func, args, kwargs)
         else:
             # the event was not added to task list, invoke set()
             # to pass it in wait() call, see joinall
             evt.set()
         return evt, pid
 
+    def submit(self, func, *args, **kwargs):
+        """
+        Submit a task for given function, following the concurrent.futures.Executor API.
+        Tasks are identified by the same pid as in spawn, thus submitting a task which
+        is still pending returns the future of that task.
+        :return: a concurrent.futures.Future object
+        """
+        pid = kwargs.get('pid', genkey(str(args) + str(kwargs)))
+        future = self.futures.get(pid)
+        if future is None:
+            future = self._enqueue(threading.Event(), pid, func, args, kwargs)
+        return future
+
+    def _enqueue(self, evt, pid, func, args, kwargs):
+        """
+        Create the future of a new task and put the task in the queue,
+        blocking while the queue is full
+        """
+        future = Future()
+        future.pid = pid
+        future.submitTime = time.time()
+        future.startTime = None
+
+        def taskDone(_future):
+            "Release the task pid and set its event, once the future is done"
+            self.futures.pop(pid, None)
+            self.pids.discard(pid)
+            evt.set()
+
+        self.pids.add(pid)
+        self.futures[pid] = future
+        future.add_done_callback(taskDone)
+        self.tasks.put((evt, pid, func, args, kwargs, future, future.submitTime))
+        return future
+
     def remove(self, pid):
         """Remove pid and associative process from the queue"""
         self.pids.discard(pid)
@@ -208,9 +365,74 @@ class TaskManager(object):
         """
         _ = [t[0].clear() for t in tasks] # each task is return from spawn, i.e. a pair (evt, pid)
 
-    def joinall(self, tasks):
-        """Join all tasks in a queue and quit"""
-        _ = [t[0].wait() for t in tasks] # each task is return from spawn, i.e. a pair (evt, pid)
+    def joinall(self, tasks, timeout=None):
+        """
+        Join all tasks in a queue and quit
+        :param tasks: list of (evt, pid) pairs returned by spawn, or of futures returned by submit
+        :param timeout: maximum number of seconds to wait for, None to wait until they all complete
+        :return: True if all tasks completed, False otherwise
+        """
+        endTime = time.time() + timeout if timeout is not None else None
+        pending = set()
+        for task in tasks:
+            if isinstance(task, Future):
+                pending.add(task)
+            elif getattr(task[0], 'future', None) is not None:
+                pending.add(task[0].future)
+            elif not task[0].wait(timeout=self._remaining(endTime)):
+                return False
+        while pending:
+            # wake up regularly to time out the tasks, if there is a per task timeout
+            waitTime = self._remaining(endTime)
+            if self.timeout is not None:
+                waitTime = min(waitTime, 1) if waitTime is not None else 1
+            _, pending = waitFutures(pending, timeout=waitTime)
+            pending = self._expire(pending)
+            if pending and endTime is not None and time.time() >= endTime:
+                return False
+        return True
+
+    @staticmethod
+    def _remaining(endTime):
+        "Return the number of seconds left until endTime, None if there is no end time"
+        return max(endTime - time.time(), 0) if endTime is not None else None
+
+    def _expire(self, futures):
+        """
+        Fail the running tasks which went beyond the per task timeout, as
+        well as the queued tasks submitted longer than the timeout ago
+        :return: set with the futures which are still pending
+        """
+        if self.timeout is None:
+            return set(futures)
+        pending = set()
+        now = time.time()
+        for future in futures:
+            msg = None
+            if future.startTime is not None:
+                if now - future.startTime > self.timeout:
+                    msg = "task timed out after running for more than %s secs" % self.timeout
+            elif not future.running() and now - future.submitTime > self.timeout:
+                msg = "task timed out after waiting for more than %s secs in the queue" % self.timeout
+            if msg and setFutureResult(future, exc=FutureTimeoutError(msg)):
+                self.logger.warning("TaskManager %s: task with pid %s %s", self.name, future.pid, msg)
+            if not future.done():
+                pending.add(future)
+        return pending
+
+    def cancel(self):
+        """
+        Cancel all the tasks still waiting in the queue, running tasks are left to complete
+        :return: number of tasks cancelled
+        """
+        return len([future for future in list(self.futures.values()) if future.cancel()])
+
+    def stop(self):
+        """Cancel all the tasks still waiting in the queue and let the workers quit"""
+        ncancelled = self.cancel()
+        if ncancelled:
+            self.logger.info("TaskManager %s: cancelled %d queued tasks", self.name, ncancelled)
+        self.quit()
 
     def quit(self):
         """Put None task to all workers and let them quit"""
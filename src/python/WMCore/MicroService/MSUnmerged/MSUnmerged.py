@@ -36,6 +36,7 @@ from pymongo.errors  import NotPrimaryError
 from WMCore.MicroService.DataStructs.DefaultStructs import UNMERGED_REPORT
 from WMCore.MicroService.MSCore.MSCore import MSCore
 from WMCore.MicroService.MSUnmerged.MSUnmergedRSE import MSUnmergedRSE
+from WMCore.MicroService.Tools.LFNMatcher import LFNMatcher
 from WMCore.Services.RucioConMon.RucioConMon import RucioConMon
 from WMCore.Services.WMStatsServer.WMStatsServer import WMStatsServer
 from WMCore.Database.MongoDB import MongoDB
@@ -106,6 +107,11 @@ class MSUnmerged(MSCore):
         self.msConfig.setdefault("dirFilterExcl", [])
         self.msConfig.setdefault("emulateGfal2", False)
         self.msConfig.setdefault("filesToDeleteSliceSize", 100)
+        # stream the list of unmerged files from RucioConMon through the disk cache, and
+        # optionally skip an RSE whose ingestion takes the service memory (RSS) beyond a
+        # limit in MB (0 for no limit)
+        self.msConfig.setdefault("streamRucioConMon", True)
+        self.msConfig.setdefault("rseMemoryLimitMB", 0)
         # settings for parallel file and sub-directory deletion
         self.msConfig.setdefault("parallelFileDeletionMaxWorkers", 10)
         self.msConfig.setdefault("parallelFileDeletionBatchSize", 100)
@@ -171,6 +177,10 @@ class MSUnmerged(MSCore):
         # Initialization service common data structures:
         self.rseConsStats = {}
         self.protectedLFNs = set()
+        # protected LFNs and directory filters compiled into an LFNMatcher, together
+        # with the inputs it was compiled from
+        self.lfnMatcher = None
+        self.lfnMatcherInputs = (None, 0, None, None)
 
         # The basic /store/unmerged regular expression:
         self.regStoreUnmergedLfn = re.compile("^/store/unmerged/.*$")
@@ -690,8 +700,24 @@ class MSUnmerged(MSCore):
         :return:    rse
         """
         self.logger.info("Fetching data from Rucio ConMon for RSE: %s.", rse['name'])
-        for lfn in self.rucioConMon.getRSEUnmerged(rse['name'], zipped=True):
+        dirsToDelete = rse['dirs']['toDelete']
+        dirsProtected = rse['dirs']['protected']
+        memoryLimit = self.msConfig['rseMemoryLimitMB'] * 1024 * 1024
+        process = psutil.Process(os.getpid()) if memoryLimit else None
+        numFiles = numFilesToDelete = 0
+        startTime = time()
+        for lfn in self.rucioConMon.getRSEUnmerged(rse['name'], zipped=True,
+                                                    stream=self.msConfig['streamRucioConMon']):
             dirPath = self._cutPath(lfn)
+            # directories already seen have been checked and evaluated already
+            if dirPath in dirsToDelete:
+                numFiles += 1
+                numFilesToDelete += 1
+                continue
+            if dirPath in dirsProtected:
+                numFiles += 1
+                continue
+
             # Check if what is left is still under /store/unmerged/*
             if not self.regStoreUnmergedLfn.match(dirPath):
                 msg = f"Retrieved file from RucioConMon that does not belong to the unmerged area: {lfn}. Skipping it."
@@ -699,14 +725,29 @@ class MSUnmerged(MSCore):
                 continue
 
             # general counter for possible files and unique directories
-            rse['counters']['totalNumFiles'] += 1
+            numFiles += 1
 
             # now evaluate whether it is deletable or not, and persist it under the right field
             if self._isDeletable(dirPath):
-                rse['dirs']['toDelete'].add(dirPath)
-                rse['counters']['filesToDelete'] += 1
+                dirsToDelete.add(dirPath)
+                numFilesToDelete += 1
             else:
-                rse['dirs']['protected'].add(dirPath)
+                dirsProtected.add(dirPath)
+
+            # new directories are what makes the memory footprint grow
+            if memoryLimit and (len(dirsToDelete) + len(dirsProtected)) % 10000 == 0 \
+                    and process.memory_info().rss > memoryLimit:
+                msg = f"Memory usage went beyond {self.msConfig['rseMemoryLimitMB']} MB while fetching "
+                msg += f"the unmerged files for RSE: {rse['name']}, after {numFiles} files. Skipping it."
+                rse['dirs']['toDelete'] = set()
+                rse['dirs']['protected'] = set()
+                raise MSUnmergedPlineExit(msg)
+
+        rse['counters']['totalNumFiles'] += numFiles
+        rse['counters']['filesToDelete'] += numFilesToDelete
+        timeTaken = time() - startTime
+        self.logger.info("Fetched %d unmerged files for RSE: %s in %.1f secs (%.0f files/s).",
+                         numFiles, rse['name'], timeTaken, numFiles / timeTaken if timeTaken else 0)
 
         if not rse['counters']['totalNumFiles']:
             self.logger.error("RSE: %s has an empty list of unmerged files in Rucio ConMon.", rse['name'])
@@ -724,6 +765,12 @@ class MSUnmerged(MSCore):
         :param filePath:   The full (absolute) file path together with the file name
         :return finalPath: The final path cut the to correct level
         """
+        # Fast path for well formed absolute LFNs: split the path into the root and
+        # up to 6 directory levels e.g. ['', 'store', 'unmerged', 'RunIISummer20UL17SIM', ...],
+        # leaving the rest in the last element, and build the path out of the levels found
+        if filePath.startswith('/') and not filePath.endswith('/') and '//' not in filePath:
+            return '/'.join(filePath.split('/', 7)[:7])
+
         # pylint: disable=E1120
         # This is a known issue when when passing an unpacked list to a method expecting
         # at least one variable. In this case the signature of the method breaking the
@@ -760,22 +807,22 @@ class MSUnmerged(MSCore):
         :param dirPath: string with a shorter version of the LFN
         :return _type_: True if the directory can be deleted, False otherwise
         """
-        # Check against the inclusion filter
-        if self.msConfig['dirFilterIncl']:
-            respFilter = [dirPath.startswith(filterItem) for filterItem in self.msConfig['dirFilterIncl']]
-            if any(respFilter) is False:
-                # does not match against any of the inclusion filters
-                return False
-
-        # Check against the exclusion filter
-        if self.msConfig['dirFilterExcl']:
-            respFilter = [dirPath.startswith(filterItem) for filterItem in self.msConfig['dirFilterExcl']]
-            if any(respFilter) is True:
-                # matches against at least one exclusion filter
-                return False
-
-        # Finally, check against the protected LFNs
-        return dirPath not in self.protectedLFNs
+        # Check against the inclusion and exclusion filters, and finally against the
+        # protected LFNs: neither the directory nor any of its parents may be protected
+        return self._getLFNMatcher().isDeletable(dirPath)
+
+    def _getLFNMatcher(self):
+        """
+        Compile the protected LFNs and the inclusion and exclusion directory filters
+        into an LFNMatcher, unless they have not changed since they were compiled last.
+        :return: an LFNMatcher instance
+        """
+        inputs = (self.protectedLFNs, len(self.protectedLFNs),
+                  tuple(self.msConfig['dirFilterIncl']), tuple(self.msConfig['dirFilterExcl']))
+        if inputs[0] is not self.lfnMatcherInputs[0] or inputs[1:] != self.lfnMatcherInputs[1:]:
+            self.lfnMatcher = LFNMatcher(self.protectedLFNs, inputs[2], inputs[3])
+            self.lfnMatcherInputs = inputs
+        return self.lfnMatcher
 
     def getPfn(self, rse):
         """
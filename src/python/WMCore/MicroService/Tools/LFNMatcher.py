@@ -0,0 +1,95 @@
+"""
+File       : LFNMatcher.py
+Description: Matches LFNs (or directories in the LFN namespace) against a set of
+             protected LFNs and against inclusion and exclusion directory filters,
+             all of them compiled once into prefix tries, such that every lookup
+             costs at most the depth of the path, regardless of the number of
+             protected LFNs and filters.
+"""
+
+# futures
+from __future__ import division, print_function
+
+# WMCore modules
+from Utils.PrefixTrie import PathTrie, PrefixTrie
+
+
+class LFNMatcher(object):
+    """
+    Compiled set of protected LFNs together with inclusion and exclusion
+    directory filters. Protected LFNs are matched by whole path components,
+    while the filters are matched as plain string prefixes (like str.startswith).
+    """
+
+    def __init__(self, protectedLFNs=None, dirFilterIncl=None, dirFilterExcl=None):
+        """
+        :param protectedLFNs: iterable with the protected LFNs
+        :param dirFilterIncl: list of prefixes a directory must start with, if any
+        :param dirFilterExcl: list of prefixes a directory must not start with
+        """
+        self.protected = PathTrie(protectedLFNs)
+        self.dirFilterIncl = list(dirFilterIncl or [])
+        self.dirFilterExcl = list(dirFilterExcl or [])
+        self._filterIncl = PrefixTrie(self.dirFilterIncl)
+        self._filterExcl = PrefixTrie(self.dirFilterExcl)
+
+    def __len__(self):
+        return len(self.protected)
+
+    def isProtected(self, lfn):
+        """
+        Check whether an LFN, or any of its parent directories, is protected
+        :param lfn: LFN or directory path
+        :return: True if it is protected, False otherwise
+        """
+        return self.protected.hasPrefixOf(lfn)
+
+    def protectedBy(self, lfn):
+        """
+        Find the deepest protected LFN covering this LFN
+        :param lfn: LFN or directory path
+        :return: the protected LFN, None if it is not protected
+        """
+        return self.protected.longestPrefix(lfn)
+
+    def isSelected(self, dirPath):
+        """
+        Check a directory against the inclusion and exclusion filters
+        :param dirPath: directory path
+        :return: True if it matches one of the inclusion filters (if any)
+                 and none of the exclusion filters, False otherwise
+        """
+        if self._filterIncl and not self._filterIncl.hasPrefixOf(dirPath):
+            return False
+        if self._filterExcl and self._filterExcl.hasPrefixOf(dirPath):
+            return False
+        return True
+
+    def isDeletable(self, dirPath):
+        """
+        Check whether a directory passes the filters and is not protected
+        :param dirPath: directory path
+        :return: True if it can be deleted, False otherwise
+        """
+        return self.isSelected(dirPath) and not self.isProtected(dirPath)
+
+    def toDict(self):
+        """
+        Serialize the matcher into a JSON serializable dictionary, such that
+        it can be cached between cycles and restored with LFNMatcher.fromDict
+        :return: dictionary
+        """
+        return {"protected": self.protected.toDict(),
+                "dirFilterIncl": self.dirFilterIncl,
+                "dirFilterExcl": self.dirFilterExcl}
+
+    @classmethod
+    def fromDict(cls, data):
+        """
+        Build a matcher out of a dictionary created by LFNMatcher.toDict
+        :param data: dictionary
+        :return: an LFNMatcher instance
+        """
+        matcher = cls(dirFilterIncl=data["dirFilterIncl"], dirFilterExcl=data["dirFilterExcl"])
+        matcher.protected = PathTrie.fromDict(data["protected"])
+        return matcher
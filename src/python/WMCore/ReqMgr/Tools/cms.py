@@ -40,8 +40,9 @@ def sites():
     return site_list
 
 
-# create a site cache and pnn cache 2 hour duration
-SITE_CACHE = MemoryCacheStruct(5200, sites)
+# create a site cache and pnn cache 2 hour duration, serving stale data
+# for another hour while it gets refreshed in the background
+SITE_CACHE = MemoryCacheStruct(5200, sites, staleTime=3600)
 
 
 def pnns():
@@ -58,8 +59,9 @@ def pnns():
     return pnn_list
 
 
-# create a site cache and pnn cache 2 hour duration
-PNN_CACHE = MemoryCacheStruct(5200, pnns)
+# create a site cache and pnn cache 2 hour duration, serving stale data
+# for another hour while it gets refreshed in the background
+PNN_CACHE = MemoryCacheStruct(5200, pnns, staleTime=3600)
 
 
 def site_white_list():
@@ -22,7 +22,7 @@ from WMCore.WMFactory import WMFactory
 from WMCore.WMSpec.StdSpecs.StdBase import StdBase
 from WMCore.WMSpec.WMWorkload import WMWorkloadHelper
 from WMCore.WMSpec.WMWorkloadTools import loadSpecClassByType, setArgumentsWithDefault
-from WMCore.Cache.GenericDataCache import GenericDataCache, MemoryCacheStruct
+from WMCore.Cache.GenericDataCache import GenericDataCache, MemoryCacheStruct, CacheExistException
 
 
 def workqueue_stat_validation(request_args):
@@ -317,8 +317,12 @@ def _validateDatatier(datatier, dbsUrl, expiration=3600):
     """
     cacheName = "dataTierList_" + md5(encodeUnicodeToBytesConditional(dbsUrl, condition=PY3)).hexdigest()
     if not GenericDataCache.cacheExists(cacheName):
-        mc = MemoryCacheStruct(expiration, getDataTiers, kwargs={'dbsUrl': dbsUrl})
-        GenericDataCache.registerCache(cacheName, mc)
+        mc = MemoryCacheStruct(expiration, getDataTiers, kwargs={'dbsUrl': dbsUrl}, staleTime=expiration)
+        try:
+            GenericDataCache.registerCache(cacheName, mc)
+        except CacheExistException:
+            # registered by a concurrent request thread
+            pass
 
     cacheData = GenericDataCache.getCacheData(cacheName)
     dbsTiers = cacheData.getData()
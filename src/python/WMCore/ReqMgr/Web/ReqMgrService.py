@@ -381,7 +381,8 @@ class ReqMgrService(TemplatedPage):
         if not self.wmstatsurl:
             raise Exception('ReqMgr2 configuration file does not provide wmstats url')
         # cache team information for 2 hours to limit wmstatsserver API calls
-        self.TEAM_CACHE = MemoryCacheStruct(7200, self.refreshTeams)
+        # and refresh it in the background, without blocking the web requests
+        self.TEAM_CACHE = MemoryCacheStruct(7200, self.refreshTeams, staleTime=3600)
 
         # fetch assignment arguments specification from StdBase
         self.assignArgs = StdBase().getWorkloadAssignArgs()
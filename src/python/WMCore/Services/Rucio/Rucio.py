@@ -433,6 +433,44 @@ class Rucio(object):
 
         return response
 
+    def createBlocksReplicas(self, rse, blockFiles, scope='cms', ignoreAvailability=True):
+        """
+        _createBlocksReplicas_
+
+        Create the file replicas of several blocks - in a single bulk call - to a RSE.
+        Then attach them to their block names, with a single call for all the blocks.
+        :param rse: string with the RSE name
+        :param blockFiles: dictionary with the block names as keys and the list of their files
+            as values, each file like in createReplicas
+        :param scope: string with the scope name
+        :param ignoreAvailability: boolean to ignore the RSE blacklisting
+        :return: a boolean to represent whether it succeeded or not. In case of failure, the
+            replicas of some blocks might have been created already.
+        """
+        files = []
+        attachments = []
+        for block, blockReplicas in viewitems(blockFiles):
+            for item in blockReplicas:
+                item['scope'] = scope
+            files.extend(blockReplicas)
+            attachments.append({'scope': scope, 'name': block, 'rse': rse,
+                                'dids': [{'scope': scope, 'name': item['name']} for item in blockReplicas]})
+
+        try:
+            self.cli.add_replicas(rse, files, ignoreAvailability)
+        except Exception as exc:
+            self.logger.error("Failed to add %d replicas for %d blocks at %s. Error: %s",
+                              len(files), len(blockFiles), rse, str(exc))
+            return False
+
+        try:
+            self.cli.attach_dids_to_dids(attachments, ignore_duplicate=True)
+        except Exception as exc:
+            self.logger.error("Failed to attach %d replicas to %d blocks at %s. Error: %s",
+                              len(files), len(blockFiles), rse, str(exc))
+            return False
+        return True
+
     def closeBlockContainer(self, name, scope='cms'):
         """
         _closeBlockContainer_
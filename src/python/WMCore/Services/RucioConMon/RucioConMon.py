@@ -11,8 +11,11 @@ from future import standard_library
 
 from urllib.parse import urlencode
 
+import gzip
+import io
 import json
 import logging
+import os
 
 from WMCore.Services.Service import Service
 from Utils.Utilities import decodeBytesToUnicode
@@ -20,6 +23,26 @@ from Utils.Utilities import decodeBytesToUnicode
 
 standard_library.install_aliases()
 
+# size of the chunks read from the disk cache when streaming data
+STREAM_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def openCachedStream(filename, chunkSize=STREAM_CHUNK_SIZE):
+    """
+    Open a cached file for reading text lines, decompressing it on the fly, in
+    chunks, if it is gzip compressed.
+    :param filename: the path to the cached file
+    :param chunkSize: size of the chunks read from the file
+    :return: a text file object
+    """
+    with open(filename, 'rb') as fobj:
+        isGzip = fobj.read(2) == b'\x1f\x8b'
+    if isGzip:
+        binStream = io.BufferedReader(gzip.open(filename, 'rb'), buffer_size=chunkSize)
+    else:
+        binStream = open(filename, 'rb', buffering=chunkSize)
+    return io.TextIOWrapper(binStream, encoding='utf-8')
+
 
 class RucioConMon(Service):
     """
@@ -85,6 +108,41 @@ class RucioConMon(Service):
                 line = decodeBytesToUnicode(line).replace("\n", "")
                 yield line
 
+    def _getResultStreamed(self, uri, callname=""):
+        """
+        This method retrieves the same content as _getResultZipped, but the data is
+        streamed to the disk cache as it arrives - still compressed - and then decoded
+        from there in chunks, such that neither the compressed nor the decompressed
+        data is ever fully loaded in memory.
+        It falls back to _getResultZipped if there is no disk cache, or if the requests
+        are not made with pycurl.
+        :param uri: The endpoint uri
+        :param callname: alias for caller function
+        :return: yields a single record from the data retrieved
+        """
+        requests = self['requests']
+        if not self['cachepath'] or not getattr(requests, 'pycurl', False):
+            yield from self._getResultZipped(uri, callname=callname, clearCache=True)
+            return
+
+        cachefile = self.cacheFileName(callname)
+        ckey, cert = requests.getKeyCert()
+        # write the data to a temporary file first, so a failed download never leaves a truncated cache
+        partfile = cachefile + ".part"
+        try:
+            with open(partfile, 'w+b') as ostream:
+                requests.reqmgr.request_to_file(requests['host'] + uri, {}, ostream,
+                                                headers={"Accept-Encoding": "gzip"},
+                                                ckey=ckey, cert=cert, capath=requests.getCAPath())
+            os.replace(partfile, cachefile)
+        finally:
+            if os.path.exists(partfile):
+                os.remove(partfile)
+
+        with openCachedStream(cachefile) as istream:
+            for line in istream:
+                yield line.rstrip("\n")
+
     def getRSEStats(self):
         """
         Gets the latest statistics from the RucioConMon, together with the last
@@ -95,23 +153,26 @@ class RucioConMon(Service):
         rseStats = self._getResult(uri, callname='stats')
         return rseStats
 
-    def getRSEUnmerged(self, rseName, zipped=False):
+    def getRSEUnmerged(self, rseName, zipped=False, stream=False):
         """
         Gets the list of all unmerged files in an RSE
         :param rseName: The RSE whose list of unmerged files to be retrieved
         :param zipped:  If True the interface providing the zipped lists will be called
+        :param stream:  If True (together with zipped) the zipped list is streamed
+                        through the disk cache instead of being loaded in memory
         :return: a generator of unmerged files for the RSE in question
         """
         # NOTE: The default API provided by Rucio Consistency Monitor is in a form of a
-        #       zipped file/stream. Currently we are using the newly provided json API
-        #       But in in case we figure out the data is too big we may need to
-        #       implement the method with the zipped API and use disc cache for
-        #       reading/streaming from file. This will prevent any set arithmetic
-        #       in the future.
+        #       zipped file/stream. For big RSEs, with tens of millions of files, the
+        #       zipped API should be used in stream mode, which reads it from the disk
+        #       cache as it gets decompressed.
         if zipped:
             uri = "files?rse=%s&format=raw" % rseName
             callname = '{}.zipped'.format(rseName)
-            rseUnmerged = self._getResultZipped(uri, callname=callname, clearCache=True)
+            if stream:
+                rseUnmerged = self._getResultStreamed(uri, callname=callname)
+            else:
+                rseUnmerged = self._getResultZipped(uri, callname=callname, clearCache=True)
         else:
             uri = "files?rse=%s&format=json" % rseName
             callname = '{}.json'.format(rseName)
@@ -356,6 +356,28 @@ class RequestHandler(object):
         hbuf.flush()
         return header, data
 
+    @portForward(8443)
+    def request_to_file(self, url, params, fobj, headers=None, verb='GET',
+                        verbose=0, ckey=None, cert=None, capath=None,
+                        doseq=True, encode=False, cainfo=None, cookie=None):
+        """
+        Fetch data for given set of parameters, writing the response body - as it
+        arrives and without decompressing it - to the given binary file object,
+        instead of holding it in memory. Return the response header.
+        """
+        curl = pycurl.Curl()
+        _, hbuf = self.set_opts(curl, url, params, headers, ckey, cert, capath,
+                                verbose, verb, doseq, encode, cainfo, cookie)
+        curl.setopt(pycurl.WRITEFUNCTION, fobj.write)
+        curl.perform()
+        curl.close()
+        header = self.parse_header(hbuf.getvalue())
+        if header.status >= 300:
+            fobj.seek(0)
+            data = decompress(fobj.read(), header.header)
+            raise getException(url, params, headers, header, data)
+        return header
+
     def getdata(self, url, params, headers=None, verb='GET',
                 verbose=0, ckey=None, cert=None, doseq=True,
                 encode=False, decode=False, cookie=None):
@@ -8,7 +8,15 @@ MySQL implementation of Jobs.GetOutputMap
 from WMCore.Database.DBFormatter import DBFormatter
 
 class GetOutputMap(DBFormatter):
-    sql = """SELECT wmbs_workflow_output.output_identifier AS wf_output_id,
+    """
+    _GetOutputMap_
+
+    Given a job ID, get the output map of its workflow. A list of job IDs can
+    also be provided, in which case a dictionary of output maps keyed by the
+    job ID is returned.
+    """
+    sql = """SELECT wmbs_job.id AS jobid,
+                    wmbs_workflow_output.output_identifier AS wf_output_id,
                     wmbs_workflow_output.output_fileset AS wf_output_fset,
                     wmbs_workflow_output.merged_output_fileset AS wf_output_mfset
                     FROM wmbs_workflow_output
@@ -21,14 +29,22 @@ class GetOutputMap(DBFormatter):
              WHERE wmbs_job.id = :jobid"""
 
     def execute(self, jobID, conn = None, transaction = False):
-        results = self.dbi.processData(self.sql, {"jobid": jobID}, conn = conn,
+        isList = isinstance(jobID, list)
+        if isList:
+            if not jobID:
+                return {}
+            binds = [{"jobid": job} for job in jobID]
+        else:
+            binds = {"jobid": jobID}
+        results = self.dbi.processData(self.sql, binds, conn = conn,
                                        transaction = transaction)
 
-        outputMap = {}
+        outputMaps = dict((job, {}) for job in jobID) if isList else {jobID: {}}
         for result in self.formatDict(results):
-            if result["wf_output_id"] not in outputMap:
-                outputMap[result["wf_output_id"]] = []
-
+            outputMap = outputMaps.setdefault(result["jobid"], {})
+            outputMap.setdefault(result["wf_output_id"], [])
             outputMap[result["wf_output_id"]].append({"output_fileset": result["wf_output_fset"],
                                                       "merged_output_fileset": result["wf_output_mfset"]})
-        return outputMap
+        if isList:
+            return outputMaps
+        return outputMaps[jobID]
@@ -15,6 +15,7 @@ from future.utils import listvalues
 import logging
 from collections import Counter
 
+from Utils.IteratorTools import grouper
 from WMCore.DataStructs.Fileset import Fileset as WMFileset
 from WMCore.DataStructs.Subscription import Subscription as WMSubscription
 from WMCore.Services.UUIDLib import makeUUID
@@ -530,12 +531,15 @@ class Subscription(WMBSBase, WMSubscription):
 
         return
 
-    def bulkCommit(self, jobGroups):
+    def bulkCommit(self, jobGroups, chunkSize=5000):
         """
         _bulkCommit_
 
         Commits all objects created during job splitting.  This is dangerous because it assumes
         that you can pass in all jobGroups.
+
+        Jobs, their masks and their input files are inserted in chunks of
+        chunkSize jobs, all of them within the same transaction.
         """
 
         jobList = []
@@ -578,12 +582,11 @@ class Subscription(WMBSBase, WMSubscription):
                                conn=self.getDBConn(),
                                transaction=self.existingTransaction())
 
+        # This should assign an ID to the right job group
+        uidToID = dict((idUID['guid'], idUID['id']) for idUID in jgIDs)
         for jobGroup in jobGroups:
-            for idUID in jgIDs:
-                # This should assign an ID to the right job
-                if jobGroup.uid == idUID['guid']:
-                    jobGroup.id = idUID['id']
-                    break
+            if jobGroup.uid in uidToID:
+                jobGroup.id = uidToID[jobGroup.uid]
 
         for jobGroup in jobGroups:
             for job in jobGroup.newjobs:
@@ -596,49 +599,49 @@ class Subscription(WMBSBase, WMSubscription):
                     job["name"] = makeUUID()
                 jobList.append(job)
 
-        bulkAction = self.daofactory(classname="Jobs.New")
-        result = bulkAction.execute(jobList=jobList, conn=self.getDBConn(),
-                                    transaction=self.existingTransaction())
-
         # Move jobs to jobs from newjobs
         for jobGroup in jobGroups:
             jobGroup.jobs.extend(jobGroup.newjobs)
             jobGroup.newjobs = []
 
-        # Use the results of the bulk commit to get the jobIDs
-        fileDict = {}
+        bulkAction = self.daofactory(classname="Jobs.New")
+        maskAction = self.daofactory(classname="Masks.Save")
+        fileAction = self.daofactory(classname="Jobs.AddFiles")
         jobFileRunLumis = []
-        for job in jobList:
-            job['id'] = result[job['name']]
-            fileDict[job['id']] = []
-            for f in job['input_files']:
-                fileDict[job['id']].append(f['id'])
-                fileMask = job['mask'].filterRunLumisByMask(runs=f['runs'])
-                for runObj in fileMask:
-                    run = runObj.run
-                    lumis = runObj.lumis
-                    for lumi in lumis:
-                        jobFileRunLumis.append((job['id'], f['id'], run, lumi))
-
-        # Create a list of mask binds
-        maskList = []
-        for job in jobList:
-            mask = job['mask']
-            if len(list(mask['runAndLumis'].keys())) > 0:
-                # Then we have multiple binds
-                binds = mask.produceCommitBinds(jobID=job['id'])
-                maskList.extend(binds)
-            else:
-                mask['jobID'] = job['id']
-                maskList.append(mask)
+        for jobChunk in grouper(jobList, chunkSize):
+            result = bulkAction.execute(jobList=jobChunk, conn=self.getDBConn(),
+                                        transaction=self.existingTransaction())
 
-        maskAction = self.daofactory(classname="Masks.Save")
-        maskAction.execute(jobid=None, mask=maskList, conn=self.getDBConn(),
-                           transaction=self.existingTransaction())
+            # Use the results of the bulk commit to get the jobIDs
+            fileDict = {}
+            maskList = []
+            for job in jobChunk:
+                job['id'] = result[job['name']]
+                fileDict[job['id']] = []
+                for f in job['input_files']:
+                    fileDict[job['id']].append(f['id'])
+                    fileMask = job['mask'].filterRunLumisByMask(runs=f['runs'])
+                    for runObj in fileMask:
+                        run = runObj.run
+                        lumis = runObj.lumis
+                        for lumi in lumis:
+                            jobFileRunLumis.append((job['id'], f['id'], run, lumi))
+
+                # Create a list of mask binds
+                mask = job['mask']
+                if len(mask['runAndLumis']) > 0:
+                    # Then we have multiple binds
+                    binds = mask.produceCommitBinds(jobID=job['id'])
+                    maskList.extend(binds)
+                else:
+                    mask['jobID'] = job['id']
+                    maskList.append(mask)
+
+            maskAction.execute(jobid=None, mask=maskList, conn=self.getDBConn(),
+                               transaction=self.existingTransaction())
 
-        fileAction = self.daofactory(classname="Jobs.AddFiles")
-        fileAction.execute(jobDict=fileDict, conn=self.getDBConn(),
-                           transaction=self.existingTransaction())
+            fileAction.execute(jobDict=fileDict, conn=self.getDBConn(),
+                               transaction=self.existingTransaction())
 
         # wfid = self['workflow'].id
         # Add work units and associate them
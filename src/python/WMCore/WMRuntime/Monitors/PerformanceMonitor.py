@@ -15,6 +15,7 @@ import os.path
 import signal
 import time
 
+from Utils.ProcFS import processTreeUsage, systemUptime, totalMemory
 import WMCore.Algorithms.SubprocessAlgos as subprocessAlgos
 import WMCore.FwkJobReport.Report as Report
 from WMCore.WMException import WMException
@@ -59,6 +60,70 @@ def average(numbers):
     return float(sum(numbers)) / len(numbers)
 
 
+class PerformanceSamples(object):
+    """
+    _PerformanceSamples_
+
+    Accumulate the performance samples of a step: min/max/average of every
+    metric plus a time series bounded to maxPoints. Once the time series is
+    full, every other point is dropped and only one sample out of two is
+    recorded from then on, such that it covers the whole step.
+    """
+
+    def __init__(self, maxPoints=120):
+        self.maxPoints = max(2, maxPoints)
+        self.startTime = None
+        self.stats = {}
+        self.timeSeries = []
+        self.numSamples = 0
+        self.stride = 1
+
+    def addSample(self, sample, timestamp=None):
+        """
+        Add a sample, a dictionary of metric names and values (None values are ignored)
+        """
+        timestamp = timestamp or time.time()
+        if self.startTime is None:
+            self.startTime = timestamp
+        for metric, value in sample.items():
+            if value is None:
+                continue
+            if metric not in self.stats:
+                self.stats[metric] = {'min': value, 'max': value, 'sum': 0, 'count': 0}
+            metricStats = self.stats[metric]
+            metricStats['min'] = min(metricStats['min'], value)
+            metricStats['max'] = max(metricStats['max'], value)
+            metricStats['sum'] += value
+            metricStats['count'] += 1
+
+        if self.numSamples % self.stride == 0:
+            point = {'time': int(timestamp - self.startTime)}
+            point.update(sample)
+            self.timeSeries.append(point)
+            if len(self.timeSeries) >= self.maxPoints:
+                self.timeSeries = self.timeSeries[::2]
+                self.stride *= 2
+        self.numSamples += 1
+
+    def summary(self, metric):
+        """
+        Return a (min, max, average) tuple for the metric, or None without samples
+        """
+        metricStats = self.stats.get(metric)
+        if not metricStats:
+            return None
+        return metricStats['min'], metricStats['max'], float(metricStats['sum']) / metricStats['count']
+
+    def compactTimeSeries(self):
+        """
+        Return the time series as a dictionary of lists, one per metric
+        """
+        series = {'time': [point['time'] for point in self.timeSeries]}
+        for metric in self.stats:
+            series[metric] = [point.get(metric) for point in self.timeSeries]
+        return series
+
+
 class PerformanceMonitorException(WMException):
     """
     _PerformanceMonitorException_
@@ -72,8 +137,9 @@ class PerformanceMonitor(WMRuntimeMonitor):
     """
     _PerformanceMonitor_
 
-    Monitors the performance by pinging ps and
-    recording data regarding the current step
+    Monitors the performance of the current step process tree, either reading
+    /proc directly (default) or pinging ps, and records data regarding the
+    current step
     """
 
     def __init__(self):
@@ -90,9 +156,11 @@ class PerformanceMonitor(WMRuntimeMonitor):
         self.currentStepSpace = None
         self.currentStepName = None
 
-        self.rss = []
-        self.pcpu = []
-        self.pmem = []
+        self.samplingMethod = 'procfs'
+        self.maxTimeSeriesPoints = 120
+        self.samples = PerformanceSamples()
+        self.lastCPUSample = None
+        self.memTotal = None
 
         self.maxPSS = None
         self.softTimeout = None
@@ -125,6 +193,12 @@ class PerformanceMonitor(WMRuntimeMonitor):
         self.softTimeout = args.get('softTimeout', None)
         self.hardTimeout = args.get('hardTimeout', None)
         self.numOfCores = args.get('cores', None)
+        self.samplingMethod = args.get('samplingMethod', 'procfs')
+        if self.samplingMethod == 'procfs' and not os.path.isdir('/proc/self'):
+            logging.warning("/proc not available, PerformanceMonitor falling back to ps sampling")
+            self.samplingMethod = 'ps'
+        self.maxTimeSeriesPoints = args.get('maxTimeSeriesPoints', 120)
+        self.memTotal = totalMemory()
 
         self.logPath = os.path.join(logPath)
 
@@ -150,6 +224,8 @@ class PerformanceMonitor(WMRuntimeMonitor):
         self.stepHelper = WMStepHelper(step)
         self.currentStepName = getStepName(step)
         self.currentStepSpace = None
+        self.samples = PerformanceSamples(self.maxTimeSeriesPoints)
+        self.lastCPUSample = None
 
         if not self.stepHelper.stepType() in self.watchStepTypes:
             self.disableStep = True
@@ -168,9 +244,8 @@ class PerformanceMonitor(WMRuntimeMonitor):
         Package the information and send it off
         """
 
-        if not self.disableStep:
-            # No information to correlate
-            return
+        if not self.disableStep and stepReport is not None and self.samples.numSamples:
+            self.recordPerformance(stepReport, self.currentStepName)
 
         self.currentStepName = None
         self.currentStepSpace = None
@@ -208,38 +283,20 @@ class PerformanceMonitor(WMRuntimeMonitor):
             # Then we have no step PID, we can do nothing
             return
 
-        # Now we run the ps monitor command and collate the data
-        # Gathers RSS, %CPU and %MEM statistics from ps
-        ps_cmd = self.monitorBase % (stepPID)
-        stdout, _stderr, _retcode = subprocessAlgos.runCommand(ps_cmd)
-
-        ps_output = stdout.split()
-        if not len(ps_output) > 6:
-            # Then something went wrong in getting the ps data
-            msg = "Error when grabbing output from process ps\n"
-            msg += "output = %s\n" % ps_output
-            msg += "command = %s\n" % ps_cmd
-            logging.error(msg)
-            return
-
-        # run the command to gather PSS memory statistics from /proc/<pid>/smaps
-        smaps_cmd = self.pssMemoryCommand % (stepPID)
-        stdout, _stderr, _retcode = subprocessAlgos.runCommand(smaps_cmd)
-
-        smaps_output = stdout.split()
-        if not len(smaps_output) == 1:
-            # Then something went wrong in getting the smaps data
-            msg = "Error when grabbing output from smaps\n"
-            msg += "output = %s\n" % smaps_output
-            msg += "command = %s\n" % smaps_cmd
-            logging.error(msg)
+        if self.samplingMethod == 'procfs':
+            sample = self.sampleProcFS(stepPID)
+        else:
+            sample = self.samplePS(stepPID)
+        if sample is None:
             return
+        self.samples.addSample(sample)
 
-        # smaps also returns data in kiloBytes, let's make it megaBytes
+        # pss is reported in kiloBytes, let's make it megaBytes
         # I'm also confused with these megabytes and mebibytes...
-        pss = int(smaps_output[0]) // 1000
+        pss = sample['pss'] // 1000
 
-        logging.info("PSS: %s; RSS: %s; PCPU: %s; PMEM: %s", smaps_output[0], ps_output[2], ps_output[3], ps_output[4])
+        logging.info("PSS: %s; RSS: %s; PCPU: %s; PMEM: %s",
+                     sample['pss'], sample['rss'], sample['pcpu'], sample['pmem'])
 
         msg = 'Error in CMSSW step %s\n' % self.currentStepName
         msg += 'Number of Cores: %s\n' % self.numOfCores
@@ -306,3 +363,102 @@ class PerformanceMonitor(WMRuntimeMonitor):
             self.killRetry = True
 
         return
+
+    def sampleProcFS(self, stepPID):
+        """
+        _sampleProcFS_
+
+        Sample the memory and CPU usage of the step process and its children
+        straight from /proc, without forking any process.
+        Return a dictionary with pss and rss (in kB), pcpu and pmem; or None
+        if the process is gone.
+        """
+        try:
+            usage = processTreeUsage(stepPID)
+            now = systemUptime()
+        except Exception as ex:
+            logging.error("Error when reading /proc for process %s: %s", stepPID, str(ex))
+            return None
+        if usage is None:
+            logging.error("Error when reading /proc: process %s not found", stepPID)
+            return None
+
+        # CPU usage since the previous sample, or over the process lifetime (like ps) for the first one
+        if self.lastCPUSample is not None and now > self.lastCPUSample[0]:
+            prevTime, prevCPU = self.lastCPUSample
+        else:
+            prevTime, prevCPU = usage['startTime'], 0.0
+        pcpu = 100.0 * max(usage['cpuTime'] - prevCPU, 0.0) / (now - prevTime) if now > prevTime else 0.0
+        self.lastCPUSample = (now, usage['cpuTime'])
+
+        pmem = 100.0 * usage['rss'] / self.memTotal if self.memTotal else None
+        return {'pss': usage['pss'], 'rss': usage['rss'],
+                'pcpu': round(pcpu, 1), 'pmem': round(pmem, 1) if pmem is not None else None}
+
+    def samplePS(self, stepPID):
+        """
+        _samplePS_
+
+        Sample the memory and CPU usage of the step process with ps and
+        the PSS memory from /proc/<pid>/smaps.
+        Return a dictionary with pss and rss (in kB), pcpu and pmem; or None
+        if ps or smaps could not be read.
+        """
+        # Now we run the ps monitor command and collate the data
+        # Gathers RSS, %CPU and %MEM statistics from ps
+        ps_cmd = self.monitorBase % (stepPID)
+        stdout, _stderr, _retcode = subprocessAlgos.runCommand(ps_cmd)
+
+        ps_output = stdout.split()
+        if not len(ps_output) > 6:
+            # Then something went wrong in getting the ps data
+            msg = "Error when grabbing output from process ps\n"
+            msg += "output = %s\n" % ps_output
+            msg += "command = %s\n" % ps_cmd
+            logging.error(msg)
+            return None
+
+        # run the command to gather PSS memory statistics from /proc/<pid>/smaps
+        smaps_cmd = self.pssMemoryCommand % (stepPID)
+        stdout, _stderr, _retcode = subprocessAlgos.runCommand(smaps_cmd)
+
+        smaps_output = stdout.split()
+        if not len(smaps_output) == 1:
+            # Then something went wrong in getting the smaps data
+            msg = "Error when grabbing output from smaps\n"
+            msg += "output = %s\n" % smaps_output
+            msg += "command = %s\n" % smaps_cmd
+            logging.error(msg)
+            return None
+
+        return {'pss': int(smaps_output[0]), 'rss': int(ps_output[2]),
+                'pcpu': float(ps_output[3]), 'pmem': float(ps_output[4])}
+
+    def recordPerformance(self, stepReport, stepName):
+        """
+        _recordPerformance_
+
+        Write the min/max/average of the step samples, together with their
+        compact time series, into the performance section of the step report.
+        Memory values are reported in MB.
+        """
+        if stepReport.retrieveStep(stepName) is None:
+            logging.warning("Step %s not found in the job report, not recording its performance", stepName)
+            return
+
+        for metric, setter in (('rss', stepReport.setStepRSS), ('pss', stepReport.setStepPSS)):
+            summary = self.samples.summary(metric)
+            if summary is not None:
+                setter(stepName, *[value / 1000. for value in summary])
+        for metric, setter in (('pcpu', stepReport.setStepPCPU), ('pmem', stepReport.setStepPMEM)):
+            summary = self.samples.summary(metric)
+            if summary is not None:
+                setter(stepName, *summary)
+
+        timeSeries = self.samples.compactTimeSeries()
+        for metric in ('rss', 'pss'):
+            if metric in timeSeries:
+                timeSeries[metric] = [value // 1000 if value is not None else None
+                                      for value in timeSeries[metric]]
+        stepReport.setStepPerformanceTimeSeries(stepName, timeSeries, self.samples.numSamples)
+        return
@@ -1,7 +1,9 @@
 from builtins import object, str, bytes
 from future.utils import viewitems
 
+import threading
 import time
+from collections import defaultdict
 from WMCore.ReqMgr.DataStructs.Request import RequestInfo, protectedLFNs
 
 class DataCache(object):
@@ -10,6 +12,12 @@ class DataCache(object):
     # from each server.
     _duration = 300  # 5 minitues
     _lastedActiveDataFromAgent = {}
+    # inverted indexes (request property -> value -> request names) and protected
+    # LFNs for the latest job data. Indexes are built when the data is set for the
+    # most common filters, and on their first use for any other request property.
+    _indexedData = {}
+    _defaultIndexes = ["RequestStatus", "RequestType", "Campaign"]
+    _indexLock = threading.Lock()
 
     @staticmethod
     def getDuration():
@@ -33,8 +41,111 @@ class DataCache(object):
 
     @staticmethod
     def setlatestJobData(jobData):
+        indexedData = DataCache._buildIndexedData(jobData)
         DataCache._lastedActiveDataFromAgent["time"] = int(time.time())
         DataCache._lastedActiveDataFromAgent["data"] = jobData
+        DataCache._indexedData = indexedData
+
+    @staticmethod
+    def _buildIndexedData(jobData):
+        """
+        Create the index structure for a given job data, with the default
+        indexes and the list of protected LFNs
+        """
+        indexedData = {"data": jobData, "indexes": {}, "positions": {}, "protectedLFNs": []}
+        if not isinstance(jobData, dict):
+            return indexedData
+        indexedData["positions"] = {reqName: pos for pos, reqName in enumerate(jobData)}
+        for prop in DataCache._defaultIndexes:
+            indexedData["indexes"][prop] = DataCache._buildIndex(jobData, prop)
+        lfns = {}
+        for reqInfo in jobData.values():
+            lfns.update(dict.fromkeys(protectedLFNs(reqInfo)))
+        indexedData["protectedLFNs"] = list(lfns)
+        return indexedData
+
+    @staticmethod
+    def _getIndexedData(reqData):
+        """
+        Return the index structure for the given job data, building it if needed
+        """
+        indexedData = DataCache._indexedData
+        if indexedData.get("data") is not reqData:
+            with DataCache._indexLock:
+                indexedData = DataCache._indexedData
+                if indexedData.get("data") is not reqData:
+                    indexedData = DataCache._buildIndexedData(reqData)
+                    DataCache._indexedData = indexedData
+        return indexedData
+
+    @staticmethod
+    def _buildIndex(reqData, prop):
+        """
+        Build an inverted index of request names by the value of a request property.
+        Requests with values that cannot be indexed (not hashable) are returned
+        apart, such that they are evaluated with RequestInfo.andFilterCheck
+        :return: a tuple with the index dictionary and the set of non-indexed requests
+        """
+        index = defaultdict(set)
+        nonIndexed = set()
+        for reqName, reqDict in viewitems(reqData):
+            reqValue = RequestInfo(reqDict).get(prop)
+            if reqValue is None:
+                continue
+            try:
+                for value in (reqValue if isinstance(reqValue, list) else [reqValue]):
+                    index[value].add(reqName)
+            except TypeError:
+                nonIndexed.add(reqName)
+        return dict(index), nonIndexed
+
+    @staticmethod
+    def _scanRequests(reqData, reqNames, prop, value):
+        return set(reqName for reqName in reqNames
+                   if RequestInfo(reqData[reqName]).andFilterCheck({prop: value}))
+
+    @staticmethod
+    def _filterRequestNames(reqData, filterDict):
+        """
+        Return the names of the requests matching all the filterDict conditions,
+        with the same semantics as RequestInfo.andFilterCheck, in the same order
+        as they are in the job data.
+        """
+        indexedData = DataCache._getIndexedData(reqData)
+        matches = None
+        for prop, value in viewitems(filterDict):
+            if isinstance(value, dict):
+                # not supported by andFilterCheck, ignored
+                continue
+            if value == "CLEANED" and prop == "AgentJobInfo":
+                reqNames = DataCache._scanRequests(reqData, reqData if matches is None else matches, prop, value)
+            else:
+                if value in ["false", "False", "FALSE"]:
+                    lookupValues = [False]
+                elif value in ["true", "True", "TRUE"]:
+                    lookupValues = [True]
+                else:
+                    lookupValues = value if isinstance(value, list) else [value]
+                if prop not in indexedData["indexes"]:
+                    with DataCache._indexLock:
+                        if prop not in indexedData["indexes"]:
+                            indexedData["indexes"][prop] = DataCache._buildIndex(reqData, prop)
+                index, nonIndexed = indexedData["indexes"][prop]
+                try:
+                    reqNames = set()
+                    for lookupValue in lookupValues:
+                        reqNames.update(index.get(lookupValue, ()))
+                except TypeError:
+                    # filter values which cannot be looked up
+                    reqNames = DataCache._scanRequests(reqData, reqData, prop, value)
+                else:
+                    reqNames.update(DataCache._scanRequests(reqData, nonIndexed, prop, value))
+            matches = reqNames if matches is None else matches & reqNames
+            if not matches:
+                return []
+        if matches is None:
+            return list(reqData)
+        return sorted(matches, key=indexedData["positions"].get)
 
     @staticmethod
     def islatestJobDataExpired():
@@ -49,17 +160,16 @@ class DataCache(object):
     def filterData(filterDict, maskList):
         reqData = DataCache.getlatestJobData()
 
-        for _, reqInfo in viewitems(reqData):
-            reqData = RequestInfo(reqInfo)
-            if reqData.andFilterCheck(filterDict):
-                for prop in maskList:
-                    result = reqData.get(prop, [])
+        for reqName in DataCache._filterRequestNames(reqData, filterDict):
+            reqInfo = RequestInfo(reqData[reqName])
+            for prop in maskList:
+                result = reqInfo.get(prop, [])
 
-                    if isinstance(result, list):
-                        for value in result:
-                            yield value
-                    elif result is not None and result != "":
-                        yield result
+                if isinstance(result, list):
+                    for value in result:
+                        yield value
+                elif result is not None and result != "":
+                    yield result
 
     @staticmethod
     def filterDataByRequest(filterDict, maskList=None):
@@ -71,22 +181,20 @@ class DataCache(object):
             if "RequestName" not in maskList:
                 maskList.append("RequestName")
 
-        for _, reqDict in viewitems(reqData):
-            reqInfo = RequestInfo(reqDict)
-            if reqInfo.andFilterCheck(filterDict):
-
-                if maskList is None:
-                    yield reqDict
-                else:
-                    resultItem = {}
-                    for prop in maskList:
-                        resultItem[prop] = reqInfo.get(prop, None)
-                    yield resultItem
+        for reqName in DataCache._filterRequestNames(reqData, filterDict):
+            reqDict = reqData[reqName]
+            if maskList is None:
+                yield reqDict
+            else:
+                reqInfo = RequestInfo(reqDict)
+                resultItem = {}
+                for prop in maskList:
+                    resultItem[prop] = reqInfo.get(prop, None)
+                yield resultItem
 
     @staticmethod
     def getProtectedLFNs():
         reqData = DataCache.getlatestJobData()
 
-        for _, reqInfo in viewitems(reqData):
-            for dirPath in protectedLFNs(reqInfo):
-                yield dirPath
\ No newline at end of file
+        for dirPath in DataCache._getIndexedData(reqData)["protectedLFNs"]:
+            yield dirPath
\ No newline at end of file
@@ -121,6 +121,7 @@ class WorkQueue(WorkQueueBase):
         self.params.setdefault('WorkPerCycle', 100)
         self.params.setdefault('RowsPerSlice', 2500)
         self.params.setdefault('MaxRowsPerCycle', 50000)
+        self.params.setdefault('PreFilterSites', False)
         self.params.setdefault('LocationRefreshInterval', 600)
         self.params.setdefault('FullLocationRefreshInterval', 7200)
         self.params.setdefault('TrackLocationOrSubscription', 'location')
@@ -321,7 +322,8 @@ class WorkQueue(WorkQueueBase):
                                                 excludeWorkflows=excludeWorkflows,
                                                 numElems=self.params['WorkPerCycle'],
                                                 rowsPerSlice=self.params['RowsPerSlice'],
-                                                maxRows=self.params['MaxRowsPerCycle'])
+                                                maxRows=self.params['MaxRowsPerCycle'],
+                                                preFilterSites=self.params['PreFilterSites'])
 
         self.logger.info('Got %i elements matching the constraints', len(matches))
         if not matches:
@@ -843,7 +845,8 @@ class WorkQueue(WorkQueueBase):
         work, _ = self.parent_queue.availableWork(resources, jobCounts, self.params['Team'],
                                                   numElems=self.params['WorkPerCycle'],
                                                   rowsPerSlice=self.params['RowsPerSlice'],
-                                                  maxRows=self.params['MaxRowsPerCycle'])
+                                                  maxRows=self.params['MaxRowsPerCycle'],
+                                                  preFilterSites=self.params['PreFilterSites'])
         if not work:
             self._printLog('No available work in parent queue.', printFlag, "warning")
         return work
@@ -6,6 +6,7 @@ Interface to WorkQueue persistent storage
 """
 
 from builtins import object
+from bisect import bisect_left
 from math import ceil
 
 from future.utils import viewitems
@@ -51,6 +52,68 @@ def sortAvailableElements(elementsList):
     elementsList.sort(key=lambda element: element['Priority'], reverse=True)
 
 
+def possibleSitesSignature(element):
+    """
+    Build a hashable signature out of all the element attributes considered
+    by the `possibleSites` function, such that elements with the same site
+    and data location restrictions can share their list of possible sites.
+    :param element: a workqueue element dictionary
+    :return: a tuple
+    """
+    elem = element.get('WMCore.WorkQueue.DataStructs.WorkQueueElement.WorkQueueElement', element)
+    return (tuple(elem['SiteWhitelist']), tuple(elem['SiteBlacklist']),
+            elem['NoInputUpdate'], elem['NoPileupUpdate'], elem['ParentFlag'],
+            tuple(tuple(locs) for locs in elem['Inputs'].values()),
+            tuple(tuple(locs) for locs in elem['ParentData'].values()),
+            tuple(tuple(locs) for locs in elem['PileupData'].values()))
+
+
+class SiteJobCounter(object):
+    """
+    Index the number of jobs per site and priority, such that the amount of jobs
+    with a priority greater or equal than a given one can be found with a binary
+    search over the (sorted) priorities and their cumulative job counts.
+
+    The siteJobCounts dictionary-of-dictionaries provided is updated in place.
+    """
+
+    def __init__(self, siteJobCounts):
+        self.siteJobCounts = siteJobCounts
+        # site name -> (priorities in ascending order, jobs with priority >= prios[i])
+        self._index = {}
+
+    def _siteIndex(self, site):
+        if site not in self._index:
+            jobsByPrio = self.siteJobCounts.get(site, {})
+            prios = sorted(jobsByPrio)
+            cumulative = [0] * (len(prios) + 1)
+            for idx in range(len(prios) - 1, -1, -1):
+                cumulative[idx] = cumulative[idx + 1] + jobsByPrio[prios[idx]]
+            self._index[site] = (prios, cumulative)
+        return self._index[site]
+
+    def jobCount(self, site, priority):
+        """
+        Return the number of jobs at a site with priority greater or equal than priority
+        """
+        prios, cumulative = self._siteIndex(site)
+        return cumulative[bisect_left(prios, priority)]
+
+    def addJobs(self, site, priority, jobs):
+        """
+        Account for jobs of a given priority at a site
+        """
+        prios, cumulative = self._siteIndex(site)
+        idx = bisect_left(prios, priority)
+        if idx == len(prios) or prios[idx] != priority:
+            prios.insert(idx, priority)
+            cumulative.insert(idx, cumulative[idx])
+        for i in range(idx + 1):
+            cumulative[i] += jobs
+        self.siteJobCounts.setdefault(site, {})
+        self.siteJobCounts[site][priority] = self.siteJobCounts[site].get(priority, 0) + jobs
+
+
 class WorkQueueBackend(object):
     """
     Represents persistent storage for WorkQueue
@@ -381,29 +444,28 @@ class WorkQueueBackend(object):
             sortedElements.append(element)
         sortAvailableElements(sortedElements)
 
+        jobCounter = SiteJobCounter(siteJobCounts)
+        sitesCache = {}
         for element in sortedElements:
-            commonSites = possibleSites(element)
+            commonSites = self._candidateSites(element, thresholds, sitesCache)
             prio = element['Priority']
             # shuffle list of common sites all the time to give everyone the same chance
             random.shuffle(commonSites)
             possibleSite = None
             for site in commonSites:
-                if site in thresholds:
-                    # Count the number of jobs currently running of greater priority, if they
-                    # are less than the site thresholds, then accept this element
-                    curJobCount = sum([x[1] if x[0] >= prio else 0 for x in viewitems(siteJobCounts.get(site, {}))])
-                    self.logger.debug("Job Count: %s, site: %s thresholds: %s", curJobCount, site, thresholds[site])
-                    if curJobCount < thresholds[site]:
-                        possibleSite = site
-                        break
+                # Count the number of jobs currently running of greater priority, if they
+                # are less than the site thresholds, then accept this element
+                curJobCount = jobCounter.jobCount(site, prio)
+                self.logger.debug("Job Count: %s, site: %s thresholds: %s", curJobCount, site, thresholds[site])
+                if curJobCount < thresholds[site]:
+                    possibleSite = site
+                    break
 
             if possibleSite:
                 self.logger.debug("Meant to accept workflow: %s, with prio: %s, element id: %s, for site: %s",
                                   element['RequestName'], prio, element.id, possibleSite)
                 elements.append(element)
-                siteJobCounts.setdefault(possibleSite, {})
-                siteJobCounts[possibleSite][prio] = siteJobCounts[possibleSite].setdefault(prio, 0) + \
-                                                    element['Jobs'] * element.get('blowupFactor', 1.0)
+                jobCounter.addJobs(possibleSite, prio, element['Jobs'] * element.get('blowupFactor', 1.0))
             else:
                 self.logger.debug("No available resources for %s with localdoc id %s",
                                   element['RequestName'], element.id)
@@ -413,7 +475,7 @@ class WorkQueueBackend(object):
         return elements, siteJobCounts
 
     def availableWork(self, thresholds, siteJobCounts, team=None, excludeWorkflows=None,
-                      numElems=1000, rowsPerSlice=1000, maxRows=1000):
+                      numElems=1000, rowsPerSlice=1000, maxRows=1000, preFilterSites=False):
         """
         Get work - either from local or global queue - which is available to be run.
 
@@ -428,6 +490,8 @@ class WorkQueueBackend(object):
              of a couchdb view request).
         :param maxRows: maximum number of available elements (rows) to be considered
             when pulling work down to the agent.
+        :param preFilterSites: boolean to only send to the couch list function the sites
+            that still have free slots for the priority of the elements in each slice.
         :return: a tuple with the elements accepted and an overview of job counts per site
         """
         excludeWorkflows = excludeWorkflows or []
@@ -462,37 +526,97 @@ class WorkQueueBackend(object):
         if team:
             options['team'] = team
 
-        # Fetch workqueue elements in slices, using the CouchDB "limit" and "skip"
-        # options for couch views. Conditions to stop this loop are:
-        #  a) stop once total_rows is reached (exhausted all available elements)
+        # Fetch workqueue elements in slices, paginating over the availableByPriority
+        # view with a startkey/startkey_docid cursor (instead of "skip", which makes
+        # CouchDB rescan all the skipped rows). Conditions to stop this loop are:
+        #  a) stop once the view is exhausted (no more available elements)
         #  b) hit maximum allowed elements/rows to be considered for data acquisition (maxRows)
         #  c) or, once the targeted number of elements has been accepted (numElems)
+        #  d) or, when pre-filtering sites, once no site has free slots left
         numSlices = ceil(numAvail / rowsPerSlice)
         numSlices = min(numSlices, int(maxRows / rowsPerSlice))
+        cursor = None
+        jobCounter = SiteJobCounter(siteJobCounts)
+        sitesCache = {}
         for sliceNum in range(numSlices):
-            # documents to skip as a function of the slice number
-            options['skip'] = sliceNum * rowsPerSlice
-            self.logger.info("  for slice: %s, with rows range [%s - %s]",
-                             sliceNum, options['skip'], options['skip'] + options['limit'])
+            # retrieve only the keys of this slice, plus the first row of the next one
+            cursorOpts = {'descending': True, 'limit': rowsPerSlice + 1}
+            if cursor:
+                cursorOpts['startkey'], cursorOpts['startkey_docid'] = cursor
+            rows = self.db.loadView('WorkQueue', 'availableByPriority', cursorOpts)['rows']
+            if not rows:
+                break
+            options['startkey'], options['startkey_docid'] = rows[0]['key'], rows[0]['id']
+            self.logger.info("  for slice: %s, starting at priority: %s and element id: %s",
+                             sliceNum, options['startkey'], options['startkey_docid'])
+            if preFilterSites:
+                options['resources'] = self._sitesWithFreeSlots(thresholds, jobCounter,
+                                                                options['startkey'])
+                if not options['resources']:
+                    self.logger.info("No sites with free slots left for priority: %s", options['startkey'])
+                    break
 
             result = self.db.loadList('WorkQueue', 'workRestrictions', 'availableByPriority', options)
             # now check the remaining restrictions and priority
             wqeSlots = numElems - len(acceptedElems)
-            elems = self._evalAvailableWork(json.loads(result), thresholds, siteJobCounts,
-                                            excludeWorkflows, wqeSlots)
+            elems = self._evalAvailableWork(json.loads(result), thresholds, jobCounter,
+                                            excludeWorkflows, wqeSlots, sitesCache)
             acceptedElems.extend(elems)
             if len(acceptedElems) >= numElems:
                 msg = f"Reached maximum number of elements to be accepted, "
                 msg += f"configured to: {numElems}, from queue: {self.queueUrl}"
                 self.logger.info(msg)
                 break
+            if len(rows) <= rowsPerSlice:
+                # that was the last slice
+                break
+            cursor = (rows[-1]['key'], rows[-1]['id'])
 
         self.logger.info("Total of %d elements passed location and siteJobCounts restrictions for: %s",
                          len(acceptedElems), self.queueUrl)
         return acceptedElems, siteJobCounts
 
-    def _evalAvailableWork(self, listElems, thresholds, siteJobCounts,
-                           excludeWorkflows, numElems):
+    @staticmethod
+    def _sitesWithFreeSlots(thresholds, jobCounter, priority):
+        """
+        Filter the thresholds dictionary to the sites that can still accept work
+        for elements with a given priority. Given that the job counts are only
+        considered for jobs with a priority greater or equal than the element
+        priority, a site that is full for a given priority is also full for any
+        lower priority.
+
+        :param thresholds: a dictionary key'ed by the site name, values representing the
+            maximum number of jobs allowed at that site.
+        :param jobCounter: a SiteJobCounter object with the number of jobs running
+            per site and priority.
+        :param priority: the highest priority of the elements to be evaluated
+        :return: a thresholds dictionary only with the sites with free slots
+        """
+        resources = {}
+        for site, threshold in viewitems(thresholds):
+            if jobCounter.jobCount(site, priority) < threshold:
+                resources[site] = threshold
+        return resources
+
+    @staticmethod
+    def _candidateSites(element, thresholds, sitesCache):
+        """
+        Return a new list with the sites an element can run at, restricted to
+        the sites in thresholds. Results are cached by the element signature,
+        given that many elements share the same site and location restrictions.
+
+        :param element: a workqueue element
+        :param thresholds: a dictionary key'ed by the site name
+        :param sitesCache: a dictionary used to cache the sites by element signature
+        :return: a list of site names
+        """
+        signature = possibleSitesSignature(element)
+        if signature not in sitesCache:
+            sitesCache[signature] = [site for site in possibleSites(element) if site in thresholds]
+        return list(sitesCache[signature])
+
+    def _evalAvailableWork(self, listElems, thresholds, jobCounter,
+                           excludeWorkflows, numElems, sitesCache=None):
         """
         Evaluate work available in workqueue and decide whether it can be
         accepted or not.
@@ -500,14 +624,15 @@ class WorkQueueBackend(object):
         :param listElems: list of dictionaries that correspond to the workqueue elements.
         :param thresholds: a dictionary key'ed by the site name, values representing the
             maximum number of jobs allowed at that site.
-        :param siteJobCounts: a dictionary-of-dictionaries key'ed by the site name; value
-            is a dictionary with the number of jobs running at a given priority.
-            NOTE that it is updated in place.
+        :param jobCounter: a SiteJobCounter object with the number of jobs running per
+            site and priority. NOTE that it is updated in place.
         :param excludeWorkflows: list of (aborted) workflows that should not be accepted
         :param numElems: integer with the maximum number of elements to be accepted (default
             to a very large number when pulling work from local queue, read unlimited)
+        :param sitesCache: optional dictionary caching the candidate sites by element signature
         :return: a tuple with the elements accepted and an overview of job counts per site
         """
+        sitesCache = {} if sitesCache is None else sitesCache
         elems = []
         self.logger.info("Retrieved %d elements from workRestrictions list for: %s",
                          len(listElems), self.queueUrl)
@@ -533,30 +658,27 @@ class WorkQueueBackend(object):
             if numElems <= 0:
                 # it means we accepted the configured number of elements
                 break
-            commonSites = possibleSites(element)
+            commonSites = self._candidateSites(element, thresholds, sitesCache)
             prio = element['Priority']
             # shuffle list of common sites all the time to give everyone the same chance
             random.shuffle(commonSites)
             possibleSite = None
             for site in commonSites:
-                if site in thresholds:
-                    # Count the number of jobs currently running of greater priority, if they
-                    # are less than the site thresholds, then accept this element
-                    curJobCount = sum([x[1] if x[0] >= prio else 0 for x in viewitems(siteJobCounts.get(site, {}))])
-                    self.logger.debug("Job Count: %s, site: %s thresholds: %s",
-                                      curJobCount, site, thresholds[site])
-                    if curJobCount < thresholds[site]:
-                        possibleSite = site
-                        break
+                # Count the number of jobs currently running of greater priority, if they
+                # are less than the site thresholds, then accept this element
+                curJobCount = jobCounter.jobCount(site, prio)
+                self.logger.debug("Job Count: %s, site: %s thresholds: %s",
+                                  curJobCount, site, thresholds[site])
+                if curJobCount < thresholds[site]:
+                    possibleSite = site
+                    break
 
             if possibleSite:
                 self.logger.info("Accepting workflow: %s, with prio: %s, element id: %s, for site: %s",
                                  element['RequestName'], prio, element.id, possibleSite)
                 numElems -= 1
                 elems.append(element)
-                siteJobCounts.setdefault(possibleSite, {})
-                siteJobCounts[possibleSite][prio] = siteJobCounts[possibleSite].setdefault(prio, 0) + \
-                                                    element['Jobs'] * element.get('blowupFactor', 1.0)
+                jobCounter.addJobs(possibleSite, prio, element['Jobs'] * element.get('blowupFactor', 1.0))
             else:
                 self.logger.debug("No available resources for %s with doc id %s",
                                   element['RequestName'], element.id)
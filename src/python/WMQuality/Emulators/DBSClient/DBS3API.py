@@ -62,16 +62,20 @@ class DbsApi(object):
 
         return
 
-    def listBlocks(self, block_name):
+    def listBlocks(self, block_name=None, dataset=None):
         """
         _listBlocks_
 
-        Return the requested block information if it exists.
+        Return the requested block information if it exists,
+        or the names of all the blocks in the requested dataset.
         """
         if os.path.getsize(self.dbsPath):
             with open(self.dbsPath, 'r') as inFileHandle:
                 currentInfo = json.load(inFileHandle)
                 inFileHandle.close()
+                if dataset:
+                    return [{'block_name': block["block"]["block_name"]} for block in currentInfo
+                            if block["block"]["block_name"].split('#')[0] == dataset]
                 for block in currentInfo:
                     if block["block"]["block_name"] == block_name:
                         return [block["block"]]
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""
+Unittests for ConcurrentCache object
+"""
+
+import threading
+import unittest
+from time import sleep
+
+from Utils.ConcurrentCache import ConcurrentCache
+
+
+class ConcurrentCacheTest(unittest.TestCase):
+    """
+    unittest for ConcurrentCache functions
+    """
+
+    def testBasics(self):
+        cache = ConcurrentCache(1)
+        self.assertNotIn("key", cache)
+        self.assertRaises(KeyError, cache.get, "key")
+        self.assertEqual(cache.get("key", lambda: [1, 2]), [1, 2])
+        self.assertIn("key", cache)
+        self.assertEqual(cache.get("key"), [1, 2])
+        # while fresh, the refresh function is not called
+        self.assertEqual(cache.get("key", lambda: [3]), [1, 2])
+        sleep(1.5)
+        self.assertTrue(cache.isExpired("key"))
+        self.assertEqual(cache.peek("key"), [1, 2])
+        self.assertEqual(cache.get("key", lambda: [3]), [3])
+
+        cache.set("other", {"a": 1})
+        self.assertEqual(len(cache), 2)
+        cache.invalidate("key")
+        self.assertNotIn("key", cache)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 3)
+        self.assertEqual(stats["refreshes"], 2)
+
+    def testReadOnly(self):
+        cache = ConcurrentCache(10)
+        cache.set("key", {"a": 1})
+        view = cache.get("key", readOnly=True)
+        self.assertEqual(view["a"], 1)
+        with self.assertRaises(TypeError):
+            view["b"] = 2
+
+    def testLRUEviction(self):
+        cache = ConcurrentCache(10, maxSize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def testRefreshError(self):
+        def failure():
+            raise RuntimeError("upstream is down")
+
+        cache = ConcurrentCache(0)
+        self.assertRaises(RuntimeError, cache.get, "key", failure)
+        self.assertEqual(cache.stats()["refreshErrors"], 1)
+
+    def testSingleFlight(self):
+        calls = []
+
+        def slowRefresh():
+            calls.append(1)
+            sleep(0.5)
+            return len(calls)
+
+        cache = ConcurrentCache(10)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get("key", slowRefresh)))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [1] * 5)
+
+    def testStaleWhileRevalidate(self):
+        refreshed = threading.Event()
+
+        def refresh():
+            refreshed.set()
+            return "new"
+
+        cache = ConcurrentCache(0.5, staleTime=10)
+        cache.set("key", "old")
+        sleep(1)
+        # stale data is returned right away, while refreshed in the background
+        self.assertEqual(cache.get("key", refresh), "old")
+        self.assertTrue(refreshed.wait(5))
+        sleep(0.1)
+        self.assertEqual(cache.get("key", refresh), "new")
+        self.assertEqual(cache.stats()["staleHits"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
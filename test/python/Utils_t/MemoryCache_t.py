@@ -71,6 +71,19 @@ class MemoryCacheTest(unittest.TestCase):
         self.assertRaises(TypeError, cache.addItemToCache, "item4")
         self.assertRaises(TypeError, cache.addItemToCache, ["item4"])
 
+    def testGetItem(self):
+        cache = MemoryCache(2, {"item1": ["a", "b"], "item2": {"c": 1}})
+        item = cache["item1"]
+        item.append("c")
+        self.assertEqual(cache["item1"], ["a", "b"])
+        # now without copying the items
+        cache = MemoryCache(2, {"item1": ["a", "b"], "item2": {"c": 1}}, copyOnRead=False)
+        self.assertIs(cache["item1"], cache.getCache()["item1"])
+        self.assertEqual(cache["item2"]["c"], 1)
+        with self.assertRaises(TypeError):
+            cache["item2"]["d"] = 2
+        self.assertIsNone(cache["item3"])
+
     def testSetDiffTypes(self):
         cache = MemoryCache(2, set())
         self.assertItemsEqual(cache.getCache(), set())
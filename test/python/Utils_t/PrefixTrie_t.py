@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""
+Unittests for the PrefixTrie module
+"""
+
+import json
+import unittest
+
+from Utils.PrefixTrie import PathTrie, PrefixTrie
+
+
+class PrefixTrieTest(unittest.TestCase):
+    """
+    unittest for the PrefixTrie class
+    """
+
+    def setUp(self):
+        self.prefixes = ["/store/unmerged/data/prod/2018/",
+                         "/store/unmerged/express",
+                         "/store/unmerged/express/prod/2020"]
+
+    def testAdd(self):
+        """
+        Test adding prefixes to the trie
+        """
+        trie = PrefixTrie()
+        self.assertFalse(trie)
+        self.assertEqual(len(trie), 0)
+
+        trie = PrefixTrie(self.prefixes)
+        self.assertTrue(trie)
+        self.assertEqual(len(trie), 3)
+        trie.add("/store/unmerged/express")
+        self.assertEqual(len(trie), 3)
+
+        self.assertIn("/store/unmerged/express", trie)
+        self.assertIn("/store/unmerged/data/prod/2018/", trie)
+        self.assertNotIn("/store/unmerged/data/prod/2018", trie)
+        self.assertNotIn("/store/unmerged", trie)
+
+    def testPrefixMatching(self):
+        """
+        Test the shortest and longest prefix lookups
+        """
+        trie = PrefixTrie(self.prefixes)
+        lfn = "/store/unmerged/express/prod/2020/1/12"
+        self.assertEqual(trie.shortestPrefix(lfn), "/store/unmerged/express")
+        self.assertEqual(trie.longestPrefix(lfn), "/store/unmerged/express/prod/2020")
+        self.assertTrue(trie.hasPrefixOf(lfn))
+
+        # prefixes are matched as plain strings, like str.startswith does
+        lfn = "/store/unmerged/express_Run2022"
+        self.assertEqual(trie.longestPrefix(lfn), "/store/unmerged/express")
+        self.assertTrue(trie.hasPrefixOf(lfn))
+
+        lfn = "/store/unmerged/data/prod/2018"
+        self.assertIsNone(trie.shortestPrefix(lfn))
+        self.assertIsNone(trie.longestPrefix(lfn))
+        self.assertFalse(trie.hasPrefixOf(lfn))
+        self.assertFalse(PrefixTrie().hasPrefixOf(lfn))
+
+        # the empty prefix matches everything
+        trie.add("")
+        self.assertEqual(trie.shortestPrefix(lfn), "")
+        self.assertTrue(trie.hasPrefixOf("/store/mc"))
+        self.assertEqual(trie.longestPrefix("/store/unmerged/express/1"), "/store/unmerged/express")
+
+    def testPathTrie(self):
+        """
+        Test the path trie, matching whole path components
+        """
+        trie = PathTrie(["/store/unmerged/express/", "/store//unmerged/data/prod/2018"])
+        self.assertEqual(len(trie), 2)
+        trie.add("/store/unmerged/express")
+        self.assertEqual(len(trie), 2)
+        self.assertIn("/store/unmerged/express", trie)
+        self.assertIn("/store/unmerged/data/prod/2018/", trie)
+        self.assertNotIn("/store/unmerged/data/prod", trie)
+
+        self.assertTrue(trie.hasPrefixOf("/store/unmerged/express/prod/2020"))
+        self.assertTrue(trie.hasPrefixOf("/store/unmerged/express"))
+        self.assertFalse(trie.hasPrefixOf("/store/unmerged/express_Run2022"))
+        self.assertFalse(trie.hasPrefixOf("/store/unmerged"))
+        self.assertEqual(trie.longestPrefix("/store/unmerged/data/prod/2018/1/12"),
+                         "/store/unmerged/data/prod/2018")
+        self.assertIsNone(trie.longestPrefix("/store/unmerged/data/prod/2019"))
+
+        trie.add("/store/unmerged/data/prod/2018/1")
+        self.assertEqual(trie.longestPrefix("/store/unmerged/data/prod/2018/1/12"),
+                         "/store/unmerged/data/prod/2018/1")
+
+        # serialization
+        newTrie = PathTrie.fromDict(json.loads(json.dumps(trie.toDict())))
+        self.assertEqual(len(newTrie), 3)
+        self.assertIn("/store/unmerged/data/prod/2018/1", newTrie)
+        self.assertEqual(newTrie.longestPrefix("/store/unmerged/express/1"), "/store/unmerged/express")
+
+
+if __name__ == "__main__":
+    unittest.main()
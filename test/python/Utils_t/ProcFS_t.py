@@ -6,11 +6,16 @@ Unittests for ProcFS functions
 # system modules
 import unittest
 import os
+import subprocess
 import time
 import threading
 
 # WMCore modules
-from Utils.ProcFS import processStatus
+from Utils.ProcFS import (processStatus, processTree, processTreeUsage, readProcPss, readProcStat,
+                          readProcStatm, systemUptime, totalMemory)
+
+# larger than the maximum pid_max value (2^22) supported by the kernel
+MISSING_PID = 2 ** 22 + 1
 
 
 def daemon(nloops=2):
@@ -78,5 +83,69 @@ class TestProcessStatus(unittest.TestCase):
         self.assertTrue(len(pids), 1)
 
 
+class TestProcReaders(unittest.TestCase):
+    """
+    Unit tests for the /proc readers
+    """
+    def setUp(self):
+        self.child = subprocess.Popen(["sleep", "30"])  # pylint: disable=consider-using-with
+
+    def tearDown(self):
+        self.child.kill()
+        self.child.wait()
+
+    def testReadProcStat(self):
+        """Test readProcStat with the current and a child process"""
+        stat = readProcStat(os.getpid())
+        self.assertEqual(stat["pid"], os.getpid())
+        self.assertEqual(stat["ppid"], os.getppid())
+        self.assertGreater(stat["vsize"], 0)
+        self.assertGreater(stat["rss"], 0)
+
+        stat = readProcStat(self.child.pid)
+        self.assertEqual(stat["name"], "sleep")
+        self.assertEqual(stat["ppid"], os.getpid())
+
+    def testReadProcMemory(self):
+        """Test readProcStatm and readProcPss with the current process"""
+        statm = readProcStatm(os.getpid())
+        self.assertGreater(statm["resident"], 0)
+        self.assertGreaterEqual(statm["size"], statm["resident"])
+        pss = readProcPss(os.getpid())
+        if pss is not None:  # smaps might not be readable in some containers
+            self.assertGreater(pss, 0)
+            self.assertLessEqual(pss, statm["resident"])
+
+    def testMissingProcess(self):
+        """Test the readers with a process which does not exist"""
+        self.assertIsNone(readProcStat(MISSING_PID))
+        self.assertIsNone(readProcStatm(MISSING_PID))
+        self.assertIsNone(readProcPss(MISSING_PID))
+        self.assertEqual(processTree(MISSING_PID), [])
+        self.assertIsNone(processTreeUsage(MISSING_PID))
+
+    def testProcessTree(self):
+        """Test processTree and processTreeUsage with a child process"""
+        pids = processTree(os.getpid())
+        self.assertEqual(pids[0], os.getpid())
+        self.assertIn(self.child.pid, pids)
+        self.assertEqual(processTree(self.child.pid), [self.child.pid])
+
+        usage = processTreeUsage(os.getpid())
+        childUsage = processTreeUsage(self.child.pid)
+        self.assertEqual(usage["pids"], len(pids))
+        self.assertEqual(childUsage["pids"], 1)
+        # the memory of the current process is not constant, while the sleep one is
+        self.assertGreater(usage["rss"], childUsage["rss"])
+        self.assertGreaterEqual(usage["pss"], childUsage["pss"])
+        self.assertIsNone(processTreeUsage(self.child.pid, withPss=False)["pss"])
+        self.assertLessEqual(usage["startTime"], systemUptime())
+
+    def testSystemInfo(self):
+        """Test systemUptime and totalMemory"""
+        self.assertGreater(systemUptime(), 0)
+        self.assertGreater(totalMemory(), readProcStatm(os.getpid())["resident"])
+
+
 if __name__ == "__main__":
     unittest.main()
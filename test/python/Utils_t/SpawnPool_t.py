@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+"""
+Unittests for the SpawnPool module
+"""
+
+import logging
+import unittest
+
+from Utils.SpawnPool import createSpawnPool, closePool
+
+
+def poolLogLevel(_):
+    """
+    Return the logging level of the pool process
+    """
+    return logging.getLogger().getEffectiveLevel()
+
+
+class SpawnPoolTest(unittest.TestCase):
+    """
+    unittest for the SpawnPool functions
+    """
+
+    def testSpawnPool(self):
+        """
+        Test creating, using and closing a pool of spawned processes
+        """
+        logLevel = logging.getLogger().getEffectiveLevel()
+        pool = createSpawnPool(2)
+        try:
+            self.assertEqual(list(pool.imap(abs, [-1, 2, -3])), [1, 2, 3])
+            self.assertEqual(set(pool.map(poolLogLevel, range(4))), {logLevel})
+        finally:
+            pool = closePool(pool)
+        self.assertIsNone(pool)
+        self.assertIsNone(closePool(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
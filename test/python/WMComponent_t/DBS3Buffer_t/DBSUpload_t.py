@@ -508,6 +508,11 @@ class DBSUploadTest(unittest.TestCase):
             # On the second iteration the second block is uploaded.
             dbsUploader.algorithm()
             dbsUploader.checkBlocks()
+            self.assertEqual(len(dbsUploader.uploadMetrics), 2)
+            for metrics in dbsUploader.uploadMetrics.values():
+                self.assertTrue(metrics['bytes'] > 0)
+                self.assertTrue(metrics['latency'] >= metrics['uploadTime'])
+            self.assertEqual(dbsUploader.queuedBlocks, {})
             openBlocks = dbsUtil.findOpenBlocks()
             self.assertEqual(len(openBlocks), 1)
             globalFiles = myThread.dbi.processData("SELECT id FROM dbsbuffer_file WHERE status = 'InDBS'")[0].fetchall()
@@ -619,6 +624,12 @@ class DBSUploadTest(unittest.TestCase):
                 self.assertTrue('block_events' not in block['block'])
                 self.assertEqual(block['block']['open_for_writing'], 0)
                 self.assertTrue('close_settings' not in block)
+
+            # Blocks already in DBS are found with a query per dataset
+            blockNames = [block['block']['block_name'] for block in fakeDBSInfo]
+            blocksInDBS, uncheckedBlocks = dbsUploader.findBlocksInDBS(blockNames + ["/No/Such/DATASET#%s" % makeUUID()])
+            self.assertEqual(blocksInDBS, set(blockNames))
+            self.assertEqual(uncheckedBlocks, set())
         except Exception as ex:
             self.fail("We failed at some point in the test: %s" % str(ex))
         finally:
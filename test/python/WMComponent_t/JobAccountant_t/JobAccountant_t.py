@@ -1314,6 +1314,40 @@ class JobAccountantTest(EmulatedUnitTestCase):
 
         return
 
+    def testReportLoaderProcesses(self):
+        """
+        _testReportLoaderProcesses_
+
+        Run the load test loading the job reports in a pool of processes and
+        verify that the result is the same as loading them in the component.
+        """
+        self.setupDBForLoadTest(maxJobs=20)
+
+        config = self.createConfig()
+        config.JobAccountant.reportLoaderProcesses = 2
+        config.JobAccountant.reportLoaderChunkSize = 3
+        accountant = JobAccountantPoller(config)
+        accountant.setup()
+        accountant.algorithm()
+
+        stageTimes = accountant.accountantWorker.stageTimes
+        for stage in ("prefetch", "loadWait", "load", "handle", "database", "total"):
+            self.assertIn(stage, stageTimes)
+        accountant.terminate(None)
+        self.assertIsNone(accountant.accountantWorker.reportLoaderPool)
+
+        for (jobID, fwjrPath) in self.jobs:
+            jobReport = Report()
+            jobReport.unpersist(fwjrPath)
+
+            self.verifyFileMetaData(jobID, jobReport.getAllFilesFromStep("cmsRun1"))
+            self.verifyJobSuccess(jobID)
+            self.verifyDBSBufferContents("Processing",
+                                         ["/some/lfn/for/job/%s" % jobID],
+                                         jobReport.getAllFilesFromStep("cmsRun1"))
+
+        return
+
     def testDBRollback(self):
         """
         _testDBRollback_
@@ -9,6 +9,7 @@ from future.utils import listvalues
 
 import os
 import shutil
+import tarfile
 import threading
 import unittest
 from subprocess import PIPE, Popen
@@ -245,6 +246,67 @@ class JobArchiverTest(EmulatedUnitTestCase):
 
         return
 
+    def testClusterArchives(self):
+        """
+        _testClusterArchives_
+
+        Archive the jobs of a cluster together, with gzip and several threads
+        """
+        myThread = threading.currentThread()
+
+        config = self.getConfig()
+        config.JobArchiver.numberOfJobsToCluster = 5
+        config.JobArchiver.archiveCodec = "gzip"
+        config.JobArchiver.archiveThreads = 4
+        config.JobArchiver.clusterArchives = True
+
+        testJobGroup = self.createTestJobGroup()
+
+        changer = ChangeState(config)
+
+        cacheDir = os.path.join(self.testDir, 'test')
+
+        for job in testJobGroup.jobs:
+            myThread.transaction.begin()
+            job["outcome"] = "success"
+            job.save()
+            myThread.transaction.commit()
+            path = os.path.join(cacheDir, job['name'])
+            os.makedirs(path)
+            with open('%s/%s.out' % (path, job['name']), 'w') as f:
+                f.write(job['name'])
+            job.setCache(path)
+
+        changer.propagate(testJobGroup.jobs, 'created', 'new')
+        changer.propagate(testJobGroup.jobs, 'executing', 'created')
+        changer.propagate(testJobGroup.jobs, 'complete', 'executing')
+        changer.propagate(testJobGroup.jobs, 'success', 'complete')
+
+        testJobArchiver = JobArchiverPoller(config=config)
+        testJobArchiver.algorithm()
+
+        result = myThread.dbi.processData(
+            "SELECT wmbs_job_state.name FROM wmbs_job_state INNER JOIN wmbs_job ON wmbs_job.state = wmbs_job_state.id")[
+            0].fetchall()
+        for val in result:
+            self.assertEqual(listvalues(val), ['cleanout'])
+        self.assertEqual(os.listdir(cacheDir), [])
+
+        # one archive per job cluster, with the jobs of that cluster only
+        jobsByCluster = {}
+        for job in testJobGroup.jobs:
+            jobsByCluster.setdefault(job['id'] // 5, []).append(job)
+        for cluster, jobs in jobsByCluster.items():
+            logPath = os.path.join(config.JobArchiver.componentDir, 'logDir', 'w', 'wf001', 'JobCluster_%i' % cluster)
+            jobIDs = sorted(job['id'] for job in jobs)
+            self.assertEqual(os.listdir(logPath), ['Jobs_%i-%i.tar.gz' % (jobIDs[0], jobIDs[-1])])
+            with tarfile.open(os.path.join(logPath, os.listdir(logPath)[0])) as tarball:
+                for job in jobs:
+                    member = tarball.extractfile('Job_%i/%s.out' % (job['id'], job['name']))
+                    self.assertEqual(member.read().decode(), job['name'])
+
+        return
+
     @attr('integration')
     def testSpeedTest(self):
         """
@@ -21,14 +21,19 @@ from Utils.PythonVersion import PY3
 from WMCore_t.WMSpec_t.TestSpec import createTestWorkload
 from nose.plugins.attrib import attr
 
-from WMComponent.JobCreator.JobCreatorPoller import JobCreatorPoller, capResourceEstimates
+from WMComponent.JobCreator.JobCreatorPoller import JobCreatorPoller, capResourceEstimates, copyJobGroup
+from WMComponent.JobCreator.SharedJobMetadata import SHARED_METADATA_KEY, loadJob
+from WMComponent.JobSubmitter.JobSubmitMetadata import readSubmitMetadata
 from WMCore.Agent.HeartbeatAPI import HeartbeatAPI
 from WMCore.DAOFactory import DAOFactory
+from WMCore.DataStructs.Job import Job as DataStructsJob
 from WMCore.DataStructs.Run import Run
 from WMCore.ResourceControl.ResourceControl import ResourceControl
 from WMCore.Services.UUIDLib import makeUUID
 from WMCore.WMBS.File import File
 from WMCore.WMBS.Fileset import Fileset
+from WMCore.WMBS.Job import Job
+from WMCore.WMBS.JobGroup import JobGroup
 from WMCore.WMBS.Subscription import Subscription
 from WMCore.WMBS.Workflow import Workflow
 from WMCore.WMSpec.Makers.TaskMaker import TaskMaker
@@ -278,16 +283,15 @@ class JobCreatorTest(EmulatedUnitTestCase):
         # First job should be in here
         listOfDirs = []
         for tmpDirectory in os.listdir(testDirectory):
-            listOfDirs.extend(os.listdir(os.path.join(testDirectory, tmpDirectory)))
+            if tmpDirectory.startswith('JobCollection_'):
+                listOfDirs.extend(os.listdir(os.path.join(testDirectory, tmpDirectory)))
         self.assertTrue('job_1' in listOfDirs)
         self.assertTrue('job_2' in listOfDirs)
         self.assertTrue('job_3' in listOfDirs)
-        jobDir = os.listdir(groupDirectory)[0]
+        jobDir = [x for x in os.listdir(groupDirectory) if x.startswith('job_')][0]
         jobFile = os.path.join(groupDirectory, jobDir, 'job.pkl')
         self.assertTrue(os.path.isfile(jobFile))
-        f = open(jobFile, 'rb')
-        job = pickle.load(f)
-        f.close()
+        job = loadJob(jobFile)
 
         self.assertEqual(job.baggage.PresetSeeder.generator.initialSeed, 1001)
         self.assertEqual(job.baggage.PresetSeeder.evtgenproducer.initialSeed, 1001)
@@ -296,6 +300,20 @@ class JobCreatorTest(EmulatedUnitTestCase):
         self.assertEqual(len(job['input_files']), 1)
         self.assertEqual(os.path.basename(job['sandbox']), 'TestWorkload-Sandbox.tar.bz2')
 
+        # the task attributes are pickled once for all the jobs of the task
+        with open(jobFile, 'rb') as f:
+            rawJob = pickle.load(f)
+        self.assertNotIn('sandbox', rawJob)
+        self.assertEqual(os.path.dirname(rawJob[SHARED_METADATA_KEY]), testDirectory)
+        self.assertEqual(len([x for x in os.listdir(testDirectory) if x.startswith('JobMetadata_')]), 1)
+
+        # the job submit metadata is available without unpickling the job
+        jobMetadata = readSubmitMetadata(groupDirectory)[job['id']]
+        self.assertItemsEqual(jobMetadata['possiblePSN'], job['possiblePSN'])
+        self.assertEqual(jobMetadata['sandbox'], job['sandbox'])
+        self.assertEqual(jobMetadata['requestType'], job['requestType'])
+        self.assertEqual(jobMetadata['numberOfCores'], 1)
+
         return
 
     def testCampaignName(self):
@@ -329,11 +347,10 @@ class JobCreatorTest(EmulatedUnitTestCase):
         groupDirectory = os.path.join(testDirectory, 'JobCollection_1_0')
 
         # Get job pickle file
-        jobDir = os.listdir(groupDirectory)[0]
+        jobDir = [x for x in os.listdir(groupDirectory) if x.startswith('job_')][0]
         jobFile = os.path.join(groupDirectory, jobDir, 'job.pkl')
         self.assertTrue(os.path.isfile(jobFile))
-        with open(jobFile, 'rb') as f:
-            job = pickle.load(f)
+        job = loadJob(jobFile)
 
         # Attribute campaign name should exist
         # but be set to the default value: None
@@ -372,17 +389,94 @@ class JobCreatorTest(EmulatedUnitTestCase):
         groupDirectory = os.path.join(testDirectory, 'JobCollection_1_0')
 
         # Get job pickle file
-        jobDir = os.listdir(groupDirectory)[0]
+        jobDir = [x for x in os.listdir(groupDirectory) if x.startswith('job_')][0]
         jobFile = os.path.join(groupDirectory, jobDir, 'job.pkl')
         self.assertTrue(os.path.isfile(jobFile))
-        with open(jobFile, 'rb') as f:
-            job = pickle.load(f)
+        job = loadJob(jobFile)
 
         # Attribute campaign name should exist
         # but be set to the default value: None
         self.assertEqual(job['physicsTaskType'], None)
 
         return
+
+    def testCreatorProcesses(self):
+        """
+        _testCreatorProcesses_
+
+        Create the job work areas with a pool of creator processes
+        """
+        myThread = threading.currentThread()
+
+        config = self.getConfig()
+        config.JobCreator.creatorProcesses = 2
+
+        name = makeUUID()
+        nSubs = 5
+        nFiles = 10
+        workloadName = 'TestWorkload'
+
+        dummyWorkload = self.createWorkload(workloadName=workloadName)
+        workloadPath = os.path.join(self.testDir, 'workloadTest', 'TestWorkload', 'WMSandbox', 'WMWorkload.pkl')
+
+        self.createJobCollection(name=name, nSubs=nSubs, nFiles=nFiles, workflowURL=workloadPath)
+
+        testJobCreator = JobCreatorPoller(config=config)
+        try:
+            testJobCreator.algorithm()
+        finally:
+            testJobCreator.close()
+
+        getJobsAction = self.daoFactory(classname="Jobs.GetAllJobs")
+        result = getJobsAction.execute(state='Created', jobType="Processing")
+        self.assertEqual(len(result), nSubs * nFiles)
+
+        # every job has its cache directory set and its pickle written
+        result = myThread.dbi.processData('SELECT id, cache_dir FROM wmbs_job')[0].fetchall()
+        self.assertEqual(len(result), nSubs * nFiles)
+        for jobID, cacheDir in result:
+            job = loadJob(os.path.join(cacheDir, 'job.pkl'))
+            self.assertEqual(job['id'], jobID)
+            self.assertEqual(job['workflow'], name)
+            self.assertEqual(os.path.basename(job['sandbox']), 'TestWorkload-Sandbox.tar.bz2')
+
+        return
+
+    def testCopyJobGroup(self):
+        """
+        _testCopyJobGroup_
+
+        Check that the job groups sent to the creator processes hold copies of
+        the WMBS jobs, which leave the database connection of the originals alone
+        and can still be turned into the DataStructs jobs the JobSubmitter sends
+        """
+        parentFile = File(lfn="/store/data/parent.root", size=1024, events=10)
+        wmbsFile = File(lfn="/store/data/child.root", size=1024, events=10, locations={'T2_CH_CERN'})
+        wmbsFile['parents'].add(parentFile)
+        wmbsJob = Job(name="testJob", files=[wmbsFile])
+        wmbsJob['id'] = 10
+        wmbsJobGroup = JobGroup(id=5)
+        wmbsJobGroup.jobs.append(wmbsJob)
+
+        jobGroup = pickle.loads(pickle.dumps(copyJobGroup(wmbsJobGroup)))
+        self.assertEqual(jobGroup.id, 5)
+        self.assertEqual(len(jobGroup.jobs), 1)
+        job = jobGroup.jobs[0]
+        self.assertIsInstance(job, Job)
+        self.assertIsInstance(job['input_files'][0], File)
+        self.assertEqual(job['id'], 10)
+        self.assertEqual(job['name'], "testJob")
+        self.assertEqual(job['input_files'][0]['lfn'], "/store/data/child.root")
+        self.assertEqual(job['input_files'][0]['locations'], {'T2_CH_CERN'})
+        self.assertEqual([f['lfn'] for f in job['input_files'][0]['parents']], ["/store/data/parent.root"])
+        self.assertIsInstance(job.getDataStructsJob(), DataStructsJob)
+
+        for wmbsObject in (wmbsJobGroup, wmbsJob, wmbsFile, parentFile):
+            self.assertIsNotNone(wmbsObject.dbi)
+            self.assertIsNotNone(wmbsObject.daofactory)
+
+        return
+
     @attr('performance', 'integration')
     def testProfilePoller(self):
         """
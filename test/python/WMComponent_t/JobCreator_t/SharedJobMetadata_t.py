@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+_SharedJobMetadata_t_
+
+Unit tests for the job pickles with shared task metadata.
+"""
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from WMComponent.JobCreator.SharedJobMetadata import (SHARED_METADATA_KEY, loadJob,
+                                                      pickleJob, writeSharedMetadata)
+from WMCore.DataStructs.Job import Job
+
+
+class SharedJobMetadataTest(unittest.TestCase):
+    """
+    _SharedJobMetadataTest_
+
+    Unit tests for the job pickles with shared task metadata.
+    """
+
+    def setUp(self):
+        self.testDir = tempfile.mkdtemp()
+        self.metadata = {"sandbox": "/data/TestWorkload-Sandbox.tar.bz2",
+                         "owner": "cmsdataops",
+                         "swVersion": ["CMSSW_14_0_0"],
+                         "inputPileup": {"mc": ["/MinBias/Run3/GEN-SIM"]},
+                         "campaignName": None}
+
+    def tearDown(self):
+        shutil.rmtree(self.testDir)
+
+    def makeJob(self, jobID):
+        """
+        Create a job with its cache directory and the task attributes
+        """
+        job = Job(name="job_%d" % jobID)
+        job['id'] = jobID
+        job['cache_dir'] = os.path.join(self.testDir, "JobCollection_1_0", "job_%d" % jobID)
+        job['inputDatasetLocations'] = ["T1_US_FNAL_Disk"]
+        job.update(self.metadata)
+        os.makedirs(job['cache_dir'])
+        return job
+
+    def testSharedMetadata(self):
+        """Task attributes are pickled once and put back when loading the job"""
+        metadataPath = writeSharedMetadata(self.testDir, self.metadata)
+        self.assertEqual(os.path.dirname(metadataPath), self.testDir)
+        # identical metadata goes to the same file, a different one to a new file
+        self.assertEqual(writeSharedMetadata(self.testDir, dict(self.metadata)), metadataPath)
+        self.assertNotEqual(writeSharedMetadata(self.testDir, dict(self.metadata, owner="other")), metadataPath)
+
+        jobs = [self.makeJob(jobID) for jobID in range(1, 4)]
+        for job in jobs:
+            pickleJob(job, self.metadata, metadataPath)
+            # the job object itself is left untouched
+            self.assertEqual(job['sandbox'], self.metadata['sandbox'])
+            self.assertNotIn(SHARED_METADATA_KEY, job)
+
+        with open(os.path.join(jobs[0]['cache_dir'], 'job.pkl'), 'rb') as fd:
+            rawJob = pickle.load(fd)
+        self.assertEqual(rawJob[SHARED_METADATA_KEY], metadataPath)
+        self.assertNotIn('sandbox', rawJob)
+        self.assertEqual(rawJob['inputDatasetLocations'], ["T1_US_FNAL_Disk"])
+
+        metadataCache = {}
+        for job in jobs:
+            loadedJob = loadJob(os.path.join(job['cache_dir'], 'job.pkl'), metadataCache)
+            self.assertEqual(loadedJob, job)
+            self.assertEqual(loadedJob.getBaggage(), job.getBaggage())
+        self.assertEqual(list(metadataCache), [metadataPath])
+
+    def testFullPickle(self):
+        """Jobs pickled without shared metadata load as they are"""
+        job = self.makeJob(1)
+        pickleJob(job)
+        loadedJob = loadJob(os.path.join(job['cache_dir'], 'job.pkl'))
+        self.assertEqual(loadedJob, job)
+        self.assertNotIn(SHARED_METADATA_KEY, loadedJob)
+
+
+if __name__ == '__main__':
+    unittest.main()
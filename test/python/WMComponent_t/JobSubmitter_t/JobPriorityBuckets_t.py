@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""
+_JobPriorityBuckets_t_
+
+Unit tests for the JobSubmitter priority buckets.
+"""
+
+import unittest
+
+from WMComponent.JobSubmitter.JobPriorityBuckets import JobPriorityBuckets
+
+
+class JobPriorityBucketsTest(unittest.TestCase):
+    """
+    _JobPriorityBucketsTest_
+
+    Unit tests for the JobSubmitter priority buckets.
+    """
+
+    def setUp(self):
+        self.siteA = ("Processing", frozenset(["T1_US_FNAL"]))
+        self.siteAB = ("Processing", frozenset(["T1_US_FNAL", "T2_CH_CERN"]))
+        self.merge = ("Merge", frozenset(["T1_US_FNAL"]))
+
+    def testAddAndOrder(self):
+        """Priorities are returned from the highest and job ids are kept sorted"""
+        buckets = JobPriorityBuckets()
+        for jobID in (5, 1, 9, 3):
+            buckets.add(jobID, 100, self.siteA)
+        buckets.add(2, 100, self.siteAB)
+        buckets.add(4, 300, self.merge)
+        buckets.add(6, 200, self.siteA)
+
+        self.assertEqual(len(buckets), 7)
+        self.assertIn(9, buckets)
+        self.assertNotIn(10, buckets)
+        self.assertEqual(buckets.priorities(), [300, 200, 100])
+        self.assertEqual(buckets.buckets(100), {self.siteA: [1, 3, 5, 9], self.siteAB: [2]})
+        self.assertEqual(buckets.buckets(300), {self.merge: [4]})
+        self.assertEqual(buckets.buckets(1000), {})
+
+        # adding a job again moves it to its new priority and bucket
+        buckets.add(9, 300, self.merge)
+        self.assertEqual(len(buckets), 7)
+        self.assertEqual(buckets.buckets(100)[self.siteA], [1, 3, 5])
+        self.assertEqual(buckets.buckets(300)[self.merge], [4, 9])
+
+    def testDiscard(self):
+        """Empty buckets and priorities are dropped when jobs are discarded"""
+        buckets = JobPriorityBuckets()
+        for jobID in range(1, 11):
+            buckets.add(jobID, 100 if jobID % 2 else 200, self.siteA)
+
+        buckets.discard([3])
+        self.assertEqual(buckets.buckets(100)[self.siteA], [1, 5, 7, 9])
+        buckets.discard([2, 4, 6, 8, 10, 1000])
+        self.assertEqual(buckets.priorities(), [100])
+        self.assertEqual(buckets.buckets(200), {})
+        buckets.discard(set([1, 5, 7, 9]))
+        self.assertEqual(len(buckets), 0)
+        self.assertEqual(buckets.priorities(), [])
+
+        buckets.add(1, 100, self.siteA)
+        buckets.clear()
+        self.assertEqual(len(buckets), 0)
+        self.assertEqual(buckets.priorities(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
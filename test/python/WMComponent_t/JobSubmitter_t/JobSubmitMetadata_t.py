@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+_JobSubmitMetadata_t_
+
+Unit tests for the job submit metadata records.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from WMComponent.JobSubmitter.JobSubmitMetadata import (SUBMIT_METADATA_FILE, getSubmitMetadata,
+                                                        readSubmitMetadata, writeSubmitMetadata)
+from WMCore.DataStructs.Job import Job
+
+
+class JobSubmitMetadataTest(unittest.TestCase):
+    """
+    _JobSubmitMetadataTest_
+
+    Unit tests for the job submit metadata records.
+    """
+
+    def setUp(self):
+        self.testDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.testDir)
+
+    def makeJobs(self, collection, firstID, numJobs):
+        """
+        Create numJobs jobs with their cache directory in the given job collection
+        """
+        jobs = []
+        for jobID in range(firstID, firstID + numJobs):
+            job = Job(name="job_%d" % jobID)
+            job['id'] = jobID
+            job['cache_dir'] = os.path.join(self.testDir, collection, "job_%d" % jobID)
+            job['possiblePSN'] = {"T1_US_FNAL", "T2_CH_CERN"} if jobID % 2 else {"T2_CH_CERN"}
+            job['sandbox'] = "/data/TestWorkload-Sandbox.tar.bz2"
+            job['requestType'] = "ReReco"
+            job['swVersion'] = ["CMSSW_14_0_0"]
+            job['estimatedJobTime'] = 3600 * jobID
+            job['numberOfCores'] = 1
+            os.makedirs(job['cache_dir'])
+            jobs.append(job)
+        return jobs
+
+    def testRoundTrip(self):
+        """Job metadata is written per job collection and read back"""
+        jobs = self.makeJobs("JobCollection_1_0", 1, 5) + self.makeJobs("JobCollection_2_0", 6, 2)
+        self.assertEqual(writeSubmitMetadata(jobs), 2)
+
+        jobsMetadata = readSubmitMetadata(os.path.join(self.testDir, "JobCollection_1_0"))
+        self.assertEqual(sorted(jobsMetadata), [1, 2, 3, 4, 5])
+        for job in jobs[:5]:
+            jobMetadata = jobsMetadata[job['id']]
+            self.assertEqual(set(jobMetadata['possiblePSN']), job['possiblePSN'])
+            self.assertEqual(jobMetadata['estimatedJobTime'], job['estimatedJobTime'])
+            self.assertEqual(jobMetadata['sandbox'], job['sandbox'])
+            self.assertEqual(jobMetadata['swVersion'], job['swVersion'])
+            self.assertEqual(jobMetadata['numberOfCores'], 1)
+            self.assertNotIn('inputDataset', jobMetadata)
+
+        # common values are only stored once
+        with open(os.path.join(self.testDir, "JobCollection_1_0", SUBMIT_METADATA_FILE)) as fd:
+            record = json.load(fd)
+        self.assertEqual(record['common']['sandbox'], "/data/TestWorkload-Sandbox.tar.bz2")
+        self.assertEqual(set(record['jobs']['1']), {'possiblePSN', 'estimatedJobTime'})
+
+        # records are merged with the existing ones
+        writeSubmitMetadata(self.makeJobs("JobCollection_2_0", 8, 1))
+        self.assertEqual(sorted(readSubmitMetadata(os.path.join(self.testDir, "JobCollection_2_0"))), [6, 7, 8])
+
+    def testBaggageCores(self):
+        """The number of cores can be overridden by the job baggage"""
+        job = self.makeJobs("JobCollection_1_0", 1, 1)[0]
+        self.assertEqual(getSubmitMetadata(job)['numberOfCores'], 1)
+        job.getBaggage().numberOfCores = 4
+        self.assertEqual(getSubmitMetadata(job)['numberOfCores'], 4)
+
+    def testMissingRecord(self):
+        """Missing, corrupted or newer records are ignored"""
+        collectionDir = os.path.join(self.testDir, "JobCollection_1_0")
+        self.assertEqual(readSubmitMetadata(collectionDir), {})
+        os.makedirs(collectionDir)
+        with open(os.path.join(collectionDir, SUBMIT_METADATA_FILE), 'w') as fd:
+            fd.write('{"version": 1, "common"')
+        self.assertEqual(readSubmitMetadata(collectionDir), {})
+        with open(os.path.join(collectionDir, SUBMIT_METADATA_FILE), 'w') as fd:
+            json.dump({"version": 1000, "common": {}, "jobs": {"1": {}}}, fd)
+        self.assertEqual(readSubmitMetadata(collectionDir), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
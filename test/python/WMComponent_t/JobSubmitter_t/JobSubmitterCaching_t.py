@@ -9,6 +9,7 @@ import os
 import pickle
 import unittest
 
+from WMComponent.JobSubmitter.JobSubmitMetadata import writeSubmitMetadata
 from WMComponent.JobSubmitter.JobSubmitterPoller import JobSubmitterPoller
 from WMCore.JobStateMachine.ChangeState import ChangeState
 from WMCore.ResourceControl.ResourceControl import ResourceControl
@@ -101,7 +102,8 @@ class JobSubmitterCachingTest(EmulatedUnitTestCase):
         """
         _injectJobs_
 
-        Inject two workflows into WMBS and save the job objects to disk.
+        Inject two workflows into WMBS and save the job objects to disk. The
+        submit metadata is only written for the jobs of the first workflow.
         """
         testWorkflowA = Workflow(spec="specA.pkl", owner="Steve",
                                  name="wf001", task="TestTaskA")
@@ -124,6 +126,7 @@ class JobSubmitterCachingTest(EmulatedUnitTestCase):
         testGroupB.create()
 
         stateChanger = ChangeState(self.createConfig(), "jobsubmittercaching_t")
+        jobsA = []
 
         for i in range(10):
             newFile = File(lfn="testFile%s" % i,
@@ -142,6 +145,7 @@ class JobSubmitterCachingTest(EmulatedUnitTestCase):
             newJobA["type"] = "Processing"
             newJobA['requestType'] = 'ReReco'
             newJobA.create(testGroupA)
+            jobsA.append(newJobA)
 
             jobHandle = open(os.path.join(jobCacheDir, "job.pkl"), "wb")
             pickle.dump(newJobA, jobHandle)
@@ -168,6 +172,7 @@ class JobSubmitterCachingTest(EmulatedUnitTestCase):
 
             stateChanger.propagate([newJobB], "created", "new")
 
+        writeSubmitMetadata(jobsA)
         return
 
     def testCaching(self):
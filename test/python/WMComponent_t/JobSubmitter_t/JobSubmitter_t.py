@@ -8,10 +8,12 @@ the different dynamics that occur inside the JobSubmitter.
 from __future__ import print_function
 
 from builtins import range
+import copy
 import cProfile
 import os
 import pickle
 import pstats
+import random
 import threading
 import time
 import unittest
@@ -763,6 +765,56 @@ class JobSubmitterTest(EmulatedUnitTestCase):
 
         return
 
+    def testBadJobPickles(self):
+        """
+        _testBadJobPickles_
+
+        Check that jobs with a missing or corrupted pickle go to SubmitFailed,
+        and that they do not hold any pending slot at their site
+        """
+        workload = self.setupTestWorkload()
+        config = self.getConfig()
+        changeState = ChangeState(config)
+
+        nSubs = 2
+        nJobs = 10
+        site = "T2_US_UCSD"
+
+        self.setResourceThresholds(site, pendingSlots=50, runningSlots=100, tasks=['Processing'],
+                                   Processing={'pendingSlots': 50, 'runningSlots': 100})
+
+        jobGroupList = self.createJobGroups(nSubs=nSubs, nJobs=nJobs,
+                                            task=workload.getTask("ReReco"),
+                                            workloadSpec=self.workloadSpecPath,
+                                            site=site)
+        for group in jobGroupList:
+            changeState.propagate(group.jobs, 'created', 'new')
+
+        # remove the pickle of the first 3 jobs and corrupt the one of the next 2 jobs
+        badJobs = jobGroupList[0].jobs[:5]
+        for job in badJobs[:3]:
+            os.remove(os.path.join(job['cache_dir'], 'job.pkl'))
+        for job in badJobs[3:]:
+            with open(os.path.join(job['cache_dir'], 'job.pkl'), 'wb') as fd:
+                fd.write(b'not a pickle')
+
+        jobSubmitter = JobSubmitterPoller(config=config)
+        jobSubmitter.algorithm()
+
+        getJobsAction = self.daoFactory(classname="Jobs.GetAllJobs")
+        result = getJobsAction.execute(state='SubmitFailed', jobType="Processing")
+        self.assertItemsEqual(result, [job['id'] for job in badJobs])
+        result = getJobsAction.execute(state='Executing', jobType="Processing")
+        self.assertEqual(len(result), nSubs * nJobs - len(badJobs))
+
+        # only the submitted jobs are accounted as pending at the site
+        siteThresholds = jobSubmitter.currentRcThresholds[site]
+        self.assertEqual(siteThresholds['total_pending_jobs'], nSubs * nJobs - len(badJobs))
+        self.assertEqual(siteThresholds['thresholds']['Processing']['task_pending_jobs'],
+                         nSubs * nJobs - len(badJobs))
+
+        return
+
     def testE_SiteModesTest(self):
         """
         _testE_SiteModesTest_
@@ -1052,6 +1104,58 @@ class JobSubmitterTest(EmulatedUnitTestCase):
 
         return
 
+    @attr('performance', 'integration')
+    def testAssignJobLocationsPerformance(self):
+        """
+        _testAssignJobLocationsPerformance_
+
+        Time assignJobLocations for a large job cache against synthetic
+        thresholds of many sites, where most of the sites are saturated
+        """
+        config = self.getConfig()
+        config.JobSubmitter.maxJobsThisCycle = 100000
+        jobSubmitter = JobSubmitterPoller(config=config)
+
+        rnd = random.Random(1)
+        nJobs, nSites = 200000, 400
+        taskTypes = ['Processing', 'Production', 'Merge', 'LogCollect', 'Cleanup']
+        sites = ["T2_XX_Site%03d" % i for i in range(nSites)]
+        thresholds = {}
+        for site in sites:
+            taskThresholds = {}
+            for taskType in taskTypes:
+                taskThresholds[taskType] = {'pending_slots': rnd.choice([0, 10, 50, 200]),
+                                            'task_pending_jobs': rnd.randint(0, 50),
+                                            'max_slots': 1000,
+                                            'task_running_jobs': rnd.randint(0, 500),
+                                            'wf_highest_priority': rnd.choice([None, 100000, 300000])}
+            thresholds[site] = {'total_pending_slots': rnd.choice([20, 100, 500]),
+                                'total_pending_jobs': rnd.randint(0, 100),
+                                'total_running_slots': 2000,
+                                'total_running_jobs': rnd.randint(0, 2000),
+                                'thresholds': taskThresholds, 'state': 'Normal'}
+
+        siteGroups = [frozenset(rnd.sample(sites, rnd.randint(1, 20))) for _ in range(300)]
+        jobSubmitter.jobDataCache = {}
+        jobSubmitter.jobsByPrio.clear()
+        for jobID in range(1, nJobs + 1):
+            taskType = rnd.choice(taskTypes[:2]) if rnd.random() < 0.9 else rnd.choice(taskTypes[2:])
+            jobPrio = rnd.choice([1, 2, 3]) * 1e7 + rnd.choice([100000, 200000, 400000])
+            jobSubmitter.jobDataCache[jobID] = {'id': jobID, 'task_type': taskType, 'task_id': rnd.randint(1, 50),
+                                                'possibleSites': siteGroups[rnd.randrange(len(siteGroups))]}
+            jobSubmitter.jobsByPrio.add(jobID, jobPrio,
+                                        (taskType, jobSubmitter.jobDataCache[jobID]['possibleSites']))
+
+        for cycle in range(2):
+            jobSubmitter.currentRcThresholds = copy.deepcopy(thresholds)
+            startTime = time.time()
+            jobsToSubmit = jobSubmitter.assignJobLocations()
+            numJobs = sum(len(jobs) for jobs in jobsToSubmit.values())
+            print("Cycle %d: assigned %d jobs to sites in %f seconds" % (cycle, numJobs, time.time() - startTime))
+            self.assertEqual(len(jobSubmitter.jobsByPrio), len(jobSubmitter.jobDataCache))
+
+        return
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -265,6 +265,38 @@ class RucioInjectorPollerTest(EmulatedUnitTestCase):
         self.assertEquals(list(uninjectedFiles["T2_CH_CERN"]), [self.testDatasetA])
         self.assertEquals(list(uninjectedFiles["T1_US_FNAL_Disk"]), [self.testDatasetB])
 
+    def testInjectionPlan(self):
+        """
+        Build the block keyed injection plan and its replica batches from the uninjected files
+        """
+        self.stuffDatabase()
+        config = self.createConfig()
+        config.RucioInjector.replicaBatchSize = 2
+        poller = RucioInjectorPoller(config)
+        poller.setup(parameters=None)
+        uninjectedFiles = poller.getUninjected.execute()
+        for fileInfo in uninjectedFiles["T2_CH_CERN"][self.testDatasetA][self.blockAName]["files"]:
+            self.assertEqual(fileInfo["checksum"], {"adler32": "1234", "cksum": "5678"})
+
+        # blocks not yet in Rucio are left out of the plan
+        poller.blocksCache.setCache({self.blockAName})
+        injectionPlan = poller.getInjectionPlan(uninjectedFiles)
+        self.assertItemsEqual(list(injectionPlan), [self.blockAName])
+
+        poller.blocksCache.addItemToCache({self.blockBName})
+        injectionPlan = poller.getInjectionPlan(uninjectedFiles)
+        self.assertItemsEqual(list(injectionPlan), [self.blockAName, self.blockBName])
+        self.assertEqual(injectionPlan[self.blockBName]["container"], self.testDatasetB)
+        replicas = injectionPlan[self.blockAName]["replicas"]["T2_CH_CERN"]
+        self.assertItemsEqual([replica["name"] for replica in replicas],
+                              [testFile["lfn"] for testFile in self.testFilesA])
+        self.assertEqual(replicas[0]["adler32"], "1234")
+
+        # block A is larger than the batch size, so each block gets its own batch
+        batches = poller.getReplicaBatches(injectionPlan)
+        self.assertItemsEqual([(rse, list(blockReplicas)) for rse, blockReplicas in batches],
+                              [("T2_CH_CERN", [self.blockAName]), ("T1_US_FNAL_Disk", [self.blockBName])])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -500,6 +500,50 @@ class BossAirTest(unittest.TestCase):
 
         return
 
+    @attr('integration')
+    def testC_TrackByIDs(self):
+        """
+        _TrackByIDs_
+
+        Check that only the requested jobs are tracked when
+        filtering by WMBS or runjob IDs
+        """
+        config = self.getConfig()
+
+        baAPI = BossAirAPI(config=config, insertStates=True)
+
+        nJobs = 10
+        jobDummies = self.createDummyJobs(nJobs=nJobs, location='T3_US_Xanadu')
+        changeState = ChangeState(config)
+        changeState.propagate(jobDummies, 'created', 'new')
+        changeState.propagate(jobDummies, 'executing', 'created')
+        for job in jobDummies:
+            job['plugin'] = 'TestPlugin'
+            job['owner'] = 'tapas'
+        baAPI.submit(jobs=jobDummies)
+
+        # consecutive jobs used to be skipped while filtering the list in place
+        baAPI.track(wmbsIDs=[job['id'] for job in jobDummies[:3]])
+        runningJobs = baAPI._listRunJobs()
+        self.assertEqual(sorted(rj['jobid'] for rj in runningJobs),
+                         sorted(job['id'] for job in jobDummies[3:]))
+
+        baAPI.track(runJobIDs=[rj['id'] for rj in runningJobs[:4]])
+        self.assertEqual(len(baAPI._listRunJobs()), nJobs - 7)
+
+        # loading the running jobs in chunks
+        runningJobs = baAPI._listRunJobs()
+        loadedJobs = list(baAPI._buildRunningJobsFromRunJobs(runningJobs, chunkSize=2))
+        self.assertEqual(len(loadedJobs), len(runningJobs))
+        for runJob in loadedJobs:
+            self.assertEqual(runJob['plugin'], 'TestPlugin')
+
+        baAPI.track()
+        self.assertEqual(len(baAPI._listRunJobs()), 0)
+        self.assertEqual(len(baAPI.getComplete()), nJobs)
+
+        return
+
     def testG_monitoringDAO(self):
         """
         _monitoringDAO_
@@ -23,7 +23,7 @@ from WMComponent.JobSubmitter.JobSubmitterPoller import JobSubmitterPoller
 from WMComponent.JobTracker.JobTrackerPoller import JobTrackerPoller
 from WMCore.BossAir.BossAirAPI import BossAirAPI
 from WMCore.BossAir.StatusPoller import StatusPoller
-from WMCore.BossAir.Plugins.SimpleCondorPlugin import activityToType
+from WMCore.BossAir.Plugins.SimpleCondorPlugin import CondorJobTracker, activityToType
 from WMCore.JobStateMachine.ChangeState import ChangeState
 
 
@@ -467,6 +467,94 @@ class SimpleCondorPluginTest(BossAirTest):
         self.assertEqual(activityToType(None), "unknown")
 
 
+class FakeSchedd(object):
+    """
+    Minimal in-memory schedd, supporting the query and history calls
+    made by the CondorJobTracker
+    """
+
+    def __init__(self):
+        self.jobs = {}
+        self.historyAds = []  # most recent first
+        self.queries = []
+
+    def setJob(self, gridId, status, site=None, enteredTime=None):
+        clusterId, procId = gridId.split('.')
+        self.jobs[gridId] = {'ClusterId': int(clusterId), 'ProcId': int(procId),
+                             'JobStatus': status, 'MachineAttrGLIDEIN_CMSSite0': site,
+                             'EnteredCurrentStatus': enteredTime or int(time.time())}
+
+    def removeJob(self, gridId):
+        self.historyAds.insert(0, self.jobs.pop(gridId))
+
+    def query(self, constraint, projection):
+        self.queries.append(constraint)
+        match = re.search(r"EnteredCurrentStatus >= (\d+)", constraint)
+        since = int(match.group(1)) if match else 0
+        return [dict(ad) for ad in self.jobs.values() if ad['EnteredCurrentStatus'] >= since]
+
+    def history(self, constraint, projection, match=-1, since=None):
+        ads = []
+        for ad in self.historyAds:
+            if since == "%s.%s" % (ad['ClusterId'], ad['ProcId']) or len(ads) == match:
+                break
+            ads.append(dict(ad))
+        return ads
+
+
+class CondorJobTrackerTest(unittest.TestCase):
+    """
+    Test the (incremental) tracking of jobs with a fake schedd
+    """
+
+    def testIncrementalTracking(self):
+        """
+        Only jobs changing status are queried between full polls
+        """
+        oldTime = int(time.time()) - 1000
+        schedd = FakeSchedd()
+        schedd.setJob("1.0", 4, enteredTime=oldTime)
+        schedd.removeJob("1.0")
+        for procId in range(3):
+            schedd.setJob("2.%d" % procId, 1, enteredTime=oldTime)
+
+        tracker = CondorJobTracker("testAgent", incremental=True, fullTrackingInterval=3600)
+        jobInfo = tracker.getJobInfo(schedd)
+        self.assertEqual(jobInfo, {"2.0": ("Idle", None), "2.1": ("Idle", None), "2.2": ("Idle", None)})
+        self.assertEqual(tracker.lastHistoryJobId, "1.0")
+        self.assertNotIn("EnteredCurrentStatus", schedd.queries[-1])
+
+        # one job starts running, another one leaves the queue, and a new one is submitted
+        schedd.setJob("2.0", 2, site="T2_CH_CERN")
+        schedd.setJob("2.1", 4, enteredTime=oldTime)
+        schedd.removeJob("2.1")
+        schedd.setJob("3.0", 1)
+        # this change is not seen by the incremental poll, given its old status time
+        schedd.setJob("2.2", 5, enteredTime=oldTime)
+        jobInfo = tracker.getJobInfo(schedd)
+        self.assertIn("EnteredCurrentStatus", schedd.queries[-1])
+        self.assertEqual(jobInfo, {"2.0": ("Running", "T2_CH_CERN"), "2.2": ("Idle", None), "3.0": ("Idle", None)})
+        self.assertEqual(tracker.lastHistoryJobId, "2.1")
+
+        # a full resync picks up everything
+        tracker.resync()
+        jobInfo = tracker.getJobInfo(schedd)
+        self.assertNotIn("EnteredCurrentStatus", schedd.queries[-1])
+        self.assertEqual(jobInfo, {"2.0": ("Running", "T2_CH_CERN"), "2.2": ("Held", None), "3.0": ("Idle", None)})
+
+    def testFullTracking(self):
+        """
+        Without incremental tracking, every poll queries all the agent jobs
+        """
+        schedd = FakeSchedd()
+        schedd.setJob("1.0", 1, enteredTime=int(time.time()) - 1000)
+        tracker = CondorJobTracker("testAgent")
+        self.assertEqual(tracker.getJobInfo(schedd), {"1.0": ("Idle", None)})
+        schedd.removeJob("1.0")
+        self.assertEqual(tracker.getJobInfo(schedd), {})
+        self.assertEqual(len(schedd.queries), 2)
+        self.assertFalse([query for query in schedd.queries if "EnteredCurrentStatus" in query])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -81,5 +81,38 @@ class GenericDataCacheTest(unittest.TestCase):
         self.assertTrue(GenericDataCache.cacheExists("tCache"))
         self.assertFalse(GenericDataCache.cacheExists("tCache2"))
 
+    def testStaleData(self):
+        """
+        Expired data is served while being refreshed in the background
+        """
+        counter = {'calls': 0}
+
+        def refresh():
+            counter['calls'] += 1
+            return counter['calls']
+
+        mc = MemoryCacheStruct(1, refresh, staleTime=60)
+        self.assertEqual(mc.getData(), 1)
+        time.sleep(2)
+        self.assertTrue(mc.isDataExpired())
+        self.assertEqual(mc.getData(), 1)
+        time.sleep(0.5)
+        self.assertEqual(mc.getData(), 2)
+        self.assertEqual(counter['calls'], 2)
+        stats = mc.getStats()
+        self.assertEqual(stats['staleHits'], 1)
+        self.assertEqual(stats['refreshes'], 2)
+
+    def testNoFail(self):
+        """
+        Failures to refresh the data return the previous data, unless noFail is False
+        """
+        def failure():
+            raise RuntimeError("upstream is down")
+
+        mc = MemoryCacheStruct(0, failure, initCacheValue=[])
+        self.assertEqual(mc.getData(), [])
+        self.assertRaises(RuntimeError, mc.getData, noFail=False)
+
 if __name__ == "__main__":
     unittest.main()
@@ -3,8 +3,12 @@
 from builtins import zip, str, range
 from future.utils import viewitems
 
+import random
+import time
 import unittest
 
+from nose.plugins.attrib import attr
+
 # import FWCore.ParameterSet.Config as cms
 from WMCore.DataStructs.LumiList import LumiList
 
@@ -370,5 +374,93 @@ class LumiListTest(unittest.TestCase):
         self.assertEqual(c1.getCMSSWString(), w2.getCMSSWString())
 
 
+    def _randomRunsAndLumis(self, nRuns, maxLumi, fraction, seed):
+        """
+        Build a random {run: [lumis]} dictionary for set algebra tests
+        """
+        rnd = random.Random(seed)
+        runsAndLumis = {}
+        for run in range(1, nRuns + 1):
+            runsAndLumis[run] = [lumi for lumi in range(1, maxLumi + 1) if rnd.random() < fraction]
+        return runsAndLumis
+
+    def testSetAlgebraAgainstLumiSets(self):
+        """
+        Compare the range based set algebra against plain sets of (run, lumi)
+        """
+        for seed in range(5):
+            alumis = self._randomRunsAndLumis(4, 300, 0.6, seed)
+            blumis = self._randomRunsAndLumis(5, 300, 0.4, seed + 100)
+            a = LumiList(runsAndLumis=alumis)
+            b = LumiList(runsAndLumis=blumis)
+            aSet = set(a.getLumis())
+            bSet = set(b.getLumis())
+
+            self.assertEqual((a - b).getLumis(), sorted(aSet - bSet))
+            self.assertEqual((b - a).getLumis(), sorted(bSet - aSet))
+            self.assertEqual((a & b).getLumis(), sorted(aSet & bSet))
+            self.assertEqual((a | b).getLumis(), sorted(aSet | bSet))
+
+            candidates = [(run, lumi) for run in range(0, 7) for lumi in range(0, 310)]
+            self.assertEqual(a.filterLumis(candidates), sorted(aSet))
+            for run, lumi in candidates:
+                self.assertEqual(a.contains(run, lumi), (run, lumi) in aSet)
+
+    def testContainsAfterUpdate(self):
+        """
+        Test contains keeps working when the compact list is modified
+        """
+        lumiList = LumiList(compactList={'1': [[1, 10], [20, 30]]})
+        self.assertTrue(lumiList.contains(1, 25))
+        self.assertFalse(lumiList.contains(1, 15))
+
+        lumiList.getCompactList()['1'] = [[12, 18]]
+        self.assertTrue(lumiList.contains(1, 15))
+        self.assertFalse(lumiList.contains(1, 25))
+
+        lumiList.getCompactList()['1'].append([40, 50])
+        self.assertTrue(lumiList.contains(1, 45))
+
+        # an upper bound of 0 extends the range to the end of the run
+        lumiList.getCompactList()['2'] = [[5, 0]]
+        self.assertTrue(lumiList.contains(2, 1000))
+        self.assertFalse(lumiList.contains(2, 4))
+
+        # ranges edited in place, without changing the size of the run list
+        self.assertFalse(lumiList.contains(1, 55))
+        lumiList.compactList['1'][1] = [50, 60]
+        self.assertTrue(lumiList.contains(1, 55))
+        self.assertFalse(lumiList.contains(1, 45))
+        lumiList.compactList['1'][0][1] = 16
+        self.assertFalse(lumiList.contains(1, 17))
+        self.assertTrue(lumiList.contains(1, 16))
+
+    @attr('performance', 'integration')
+    def testSetAlgebraPerformance(self):
+        """
+        Compare the compact range representation against sets of
+        (run, lumi) pairs for a million lumis
+        """
+        alumis = self._randomRunsAndLumis(100, 10000, 0.9, 1)
+        blumis = self._randomRunsAndLumis(100, 10000, 0.5, 2)
+        a = LumiList(runsAndLumis=alumis)
+        b = LumiList(runsAndLumis=blumis)
+        aSet = set(a.getLumis())
+        bSet = set(b.getLumis())
+
+        for name, compactOp, setOp in [("sub", lambda: a - b, lambda: aSet - bSet),
+                                       ("and", lambda: a & b, lambda: aSet & bSet),
+                                       ("or", lambda: a | b, lambda: aSet | bSet),
+                                       ("filter", lambda: a.filterLumis(bSet),
+                                        lambda: [pair for pair in bSet if pair in aSet])]:
+            startTime = time.time()
+            compactOp()
+            compactTime = time.time() - startTime
+            startTime = time.time()
+            setOp()
+            setTime = time.time() - startTime
+            print("  %s: ranges %.3f s, lumi sets %.3f s" % (name, compactTime, setTime))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -449,6 +449,54 @@ class CMSCouchTest(unittest.TestCase):
         for item in result:
             self.assertEqual(222, item['doc']['foo'])
 
+    def testUpdateBulkDocumentsWithFunction(self):
+        """
+        Test updating documents with a client side function through _bulk_docs
+        """
+        self.db.queue(Document(id="1", inputDict={'counter': 1}))
+        self.db.queue(Document(id="2", inputDict={'counter': 2}))
+        self.db.commit()
+
+        def incrementCounter(doc, docId, increment):
+            if doc is None:
+                if docId == "4":
+                    return None
+                doc = {'_id': docId, 'counter': 0}
+            doc['counter'] += increment
+            return doc
+
+        failed = self.db.updateBulkDocumentsWithFunction({"1": 10, "2": 20, "3": 30, "4": 40},
+                                                         incrementCounter, updateLimits=2)
+        self.assertEqual(failed, ["4"])
+        result = self.db.allDocs({"include_docs": True})['rows']
+        self.assertEqual({row['id']: row['doc']['counter'] for row in result}, {"1": 11, "2": 22, "3": 30})
+
+    def testConcurrentRequests(self):
+        """
+        Test committing documents and loading views concurrently
+        """
+        self.db = Database(dbname=self.testdbname, url=self.server.url, poolSize=3)
+        self.assertEqual(self.db.poolSize, 3)
+        for i in range(10):
+            self.db.queue(Document(id="%s" % i, inputDict={'counter': i}))
+        result = self.db.bulkCommitParallel([Document(id="10", inputDict={'counter': 10})], chunkSize=4)
+        self.assertEqual([row['id'] for row in result], ["%s" % i for i in range(11)])
+        self.assertEqual(self.db.concurrentRequestStats['requests'], 3)
+
+        ddoc = {'_id': '_design/foo',
+                'language': 'javascript',
+                'views': {'counter': {'map': 'function(doc) {emit(doc.counter, null)}'}}}
+        self.db.commit(ddoc)
+        requests = [{'design': 'foo', 'view': 'counter', 'keys': [i]} for i in range(11)]
+        requests.append({'design': 'foo', 'view': 'counter', 'options': {'startkey': 5}})
+        results = self.db.loadViewMany(requests, poolSize=2)
+        self.assertEqual(len(results), 12)
+        for i in range(11):
+            self.assertEqual([row['id'] for row in results[i]['rows']], ["%s" % i])
+        self.assertEqual(len(results[11]['rows']), 6)
+        self.assertEqual(self.db.concurrentRequestStats['requests'], 12)
+        self.db.closePool()
+
     def testUpdateHandlerAndBulkUpdateProfile(self):
         """
         Test that update function support works
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+"""
+_CompactReport_t_
+
+Unit tests for the compact framework job report format.
+"""
+
+from __future__ import print_function
+
+import gc
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+import unittest
+
+from nose.plugins.attrib import attr
+
+from WMCore.DataStructs.Run import Run
+from WMCore.FwkJobReport.CompactReport import (CompactReportException, CompactReportReader, isCompactReport,
+                                               packLumis, unpackLumis)
+from WMCore.FwkJobReport.Report import Report, convertReport
+from WMCore.WMBase import getTestBase
+
+
+def createStepChainReport(numSteps=3, numFiles=100, numLumis=50):
+    """
+    Create a multi-step report with numFiles input files per step, each one
+    with numLumis lumi sections
+    """
+    report = Report()
+    for stepNum in range(numSteps):
+        stepName = "cmsRun%d" % (stepNum + 1)
+        report.addStep(stepName, status=0)
+        for fileNum in range(numFiles):
+            run = Run(1, *range(fileNum * numLumis + 1, (fileNum + 1) * numLumis + 1))
+            report.addInputFile("PoolSource", lfn="/store/data/Run2024A/file%d.root" % fileNum,
+                                pfn="root://somewhere//store/data/Run2024A/file%d.root" % fileNum,
+                                events=1000, size=2 ** 30, runs=[run], input_type="primaryFiles")
+    report.setTaskName("/StepChain_Test/GENSIM")
+    return report
+
+
+class CompactReportTest(unittest.TestCase):
+    """
+    _CompactReportTest_
+
+    Unit tests for the compact framework job report format.
+    """
+
+    def setUp(self):
+        self.testDir = tempfile.mkdtemp()
+        self.xmlPath = os.path.join(getTestBase(), "WMCore_t/FwkJobReport_t/CMSSWProcessingReport.xml")
+
+    def tearDown(self):
+        shutil.rmtree(self.testDir)
+
+    def testPackLumis(self):
+        """Lumi dictionaries are packed as ranges and restored as they were"""
+        eventsPerLumi = dict.fromkeys([1, 2, 3, 7, 9, 10])
+        ranges, events = packLumis(eventsPerLumi)
+        self.assertEqual(list(ranges), [1, 3, 7, 7, 9, 10])
+        self.assertIsNone(events)
+        self.assertEqual(unpackLumis(ranges, events), eventsPerLumi)
+
+        eventsPerLumi = {5: 100, 4: None, 6: 20}
+        self.assertEqual(unpackLumis(*packLumis(eventsPerLumi)), eventsPerLumi)
+        self.assertEqual(unpackLumis(*packLumis({})), {})
+
+    def testRoundTrip(self):
+        """Reports saved in the compact format are loaded back unchanged"""
+        xmlReport = Report("cmsRun1")
+        xmlReport.parse(self.xmlPath)
+        for report in (createStepChainReport(numFiles=5, numLumis=10), xmlReport):
+            pklPath = os.path.join(self.testDir, "Report.pkl")
+            compactPath = os.path.join(self.testDir, "Report.compact")
+            report.save(pklPath)
+            report.save(compactPath, compact=True)
+            self.assertFalse(isCompactReport(pklPath))
+            self.assertTrue(isCompactReport(compactPath))
+
+            pklReport = Report()
+            pklReport.load(pklPath)
+            compactReport = Report()
+            compactReport.load(compactPath)
+            self.assertEqual(compactReport.data.dictionary_whole_tree_(), pklReport.data.dictionary_whole_tree_())
+            self.assertEqual(compactReport.listSteps(), pklReport.listSteps())
+            self.assertEqual(compactReport.__to_json__(None), pklReport.__to_json__(None))
+            self.assertEqual(len(compactReport.getAllInputFiles()), len(pklReport.getAllInputFiles()))
+
+            # the loaded report is still a regular, modifiable, report
+            compactReport.addError("cmsRun1", 50660, "PerformanceKill", "Too much memory")
+            self.assertEqual(compactReport.getExitCode(), 50660)
+
+    def testLazySteps(self):
+        """Steps can be loaded one at a time"""
+        report = createStepChainReport(numSteps=3, numFiles=4, numLumis=5)
+        compactPath = os.path.join(self.testDir, "Report.compact")
+        report.save(compactPath, compact=True)
+
+        reader = CompactReportReader(compactPath)
+        self.assertEqual(reader.listSteps(), ["cmsRun1", "cmsRun2", "cmsRun3"])
+        step = reader.getStep("cmsRun2")
+        self.assertEqual(step.input.PoolSource.files.fileCount, 4)
+        self.assertEqual(step.input.PoolSource.files.file3.runs.dictionary_(), {"1": dict.fromkeys(range(16, 21))})
+        self.assertIsNone(reader.getStep("cmsRun4"))
+
+        partial = Report()
+        partial.unpersist(compactPath, steps=["cmsRun3"])
+        self.assertEqual(partial.listSteps(), ["cmsRun3"])
+        self.assertIsNone(partial.retrieveStep("cmsRun1"))
+        self.assertEqual(partial.getTaskName(), "/StepChain_Test/GENSIM")
+
+    def testDetachedSteps(self):
+        """Every step blob only holds its own step"""
+        report = createStepChainReport(numSteps=3, numFiles=20, numLumis=10)
+        compactPath = os.path.join(self.testDir, "Report.compact")
+        report.save(compactPath, compact=True)
+
+        reader = CompactReportReader(compactPath)
+        stepNames = reader.listSteps()
+        with open(compactPath, 'rb') as handle:
+            for stepName in stepNames:
+                offset, length = reader.stepIndex[stepName]
+                # the steps are alike, each one takes about a third of the report
+                self.assertLess(length, 0.4 * os.path.getsize(compactPath))
+                handle.seek(reader.dataOffset + offset)
+                blob = handle.read(length)
+                self.assertIn(stepName.encode(), blob)
+                for otherStep in stepNames:
+                    if otherStep != stepName:
+                        self.assertNotIn(otherStep.encode(), blob)
+                self.assertNotIn(b"/StepChain_Test/GENSIM", blob)
+
+        # the report being saved is left untouched
+        self.assertIs(report.data.cmsRun1._internal_parent_ref, report.data)
+        self.assertEqual(report.data.cmsRun1.input.PoolSource.files.file0.runs.dictionary_(),
+                         {"1": dict.fromkeys(range(1, 11))})
+
+    def testConvertReport(self):
+        """Reports are converted between the pickle and compact formats"""
+        report = createStepChainReport(numSteps=2, numFiles=3, numLumis=3)
+        pklPath = os.path.join(self.testDir, "Report.pkl")
+        compactPath = os.path.join(self.testDir, "Report.compact")
+        backPath = os.path.join(self.testDir, "Report.back.pkl")
+        report.save(pklPath)
+        convertReport(pklPath, compactPath)
+        self.assertTrue(isCompactReport(compactPath))
+        convertReport(compactPath, backPath, compact=False)
+        self.assertFalse(isCompactReport(backPath))
+
+        backReport = Report()
+        backReport.load(backPath)
+        self.assertEqual(backReport.data.dictionary_whole_tree_(), report.data.dictionary_whole_tree_())
+
+        self.assertRaises(CompactReportException, CompactReportReader, pklPath)
+
+    @attr('performance', 'integration')
+    def testLoadPerformance(self):
+        """Compare size, load time and memory of the pickle and compact formats"""
+        for numLumis in (20, 200):
+            paths = {"pickle": [], "compact": []}
+            for idx in range(5):
+                report = createStepChainReport(numSteps=4, numFiles=1000, numLumis=numLumis)
+                for fmt in paths:
+                    path = os.path.join(self.testDir, "Report.%d.%d.%s" % (numLumis, idx, fmt))
+                    report.save(path, compact=(fmt == "compact"))
+                    paths[fmt].append(path)
+            report = None
+
+            for fmt in ("pickle", "compact"):
+                size = sum(os.path.getsize(path) for path in paths[fmt]) / len(paths[fmt])
+                loadTime = 0
+                for path in paths[fmt]:
+                    # do not account for the collection of the previous reports
+                    report = None
+                    gc.collect()
+                    startTime = time.time()
+                    report = Report()
+                    report.load(path)
+                    loadTime += time.time() - startTime
+                loadTime /= len(paths[fmt])
+
+                report = None
+                gc.collect()
+                tracemalloc.start()
+                report = Report()
+                report.load(paths[fmt][0])
+                jsonReport = report.__to_json__(None)
+                memory, peakMemory = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                jsonReport = report = None
+
+                print("%d lumis/file, %s: %.1f MB on disk, load time %.3f secs, memory %.1f MB (peak %.1f MB)" %
+                      (numLumis, fmt, size / 1e6, loadTime, memory / 1e6, peakMemory / 1e6))
+
+        # single step from a compact report
+        gc.collect()
+        startTime = time.time()
+        report = Report()
+        report.unpersist(paths["compact"][0], steps=["cmsRun2"])
+        print("Single step from compact: load time %.3f secs" % (time.time() - startTime))
+
+
+if __name__ == '__main__':
+    unittest.main()
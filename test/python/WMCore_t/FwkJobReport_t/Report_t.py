@@ -494,6 +494,7 @@ class ReportTest(unittest.TestCase):
         report.setStepRSS(stepName="cmsRun1", minimum=100, maximum=800, average=244)
         report.setStepPCPU(stepName="cmsRun1", minimum=100, maximum=800, average=244)
         report.setStepPMEM(stepName="cmsRun1", minimum=100, maximum=800, average=244)
+        report.setStepPSS(stepName="cmsRun1", minimum=100, maximum=800, average=244)
 
         perf = report.retrieveStep("cmsRun1").performance
         for section in viewvalues(perf.dictionary_()):
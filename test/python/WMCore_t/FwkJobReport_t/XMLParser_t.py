@@ -7,19 +7,49 @@ Unit tests for XMLParser module
 """
 
 # system modules
+import gc
+import glob
 import os
+import shutil
+import tempfile
+import time
+import tracemalloc
 import unittest
 
+from nose.plugins.attrib import attr
+
 # WMCore modules
 from WMCore.FwkJobReport.XMLParser import perfSummaryHandler, perfRepHandler, \
         reportBuilder, reportDispatcher, inputFileHandler, fileHandler, \
         runHandler, branchHandler, inputAssocHandler, \
         perfCPUHandler, perfMemHandler, perfStoreHandler, castMetricValue
 from WMCore.FwkJobReport.Report import Report
-from WMCore.Algorithms.ParseXMLFile import xmlFileToNode
+from WMCore.Algorithms.ParseXMLFile import xmlFileToNode, xmlFileToNodeStream
 from WMCore.WMBase import getTestBase
 
 
+def writeLargeXMLReport(xmlPath, numFiles, numLumis):
+    """
+    Write a FJR XML file reading numFiles input files with numLumis lumis each
+    """
+    with open(xmlPath, 'w') as xmlFile:
+        xmlFile.write("<FrameworkJobReport>\n")
+        for fileNum in range(numFiles):
+            xmlFile.write("<InputFile>\n<State  Value=\"closed\"/>\n")
+            xmlFile.write("<LFN>/store/data/Run2024A/MinimumBias/AOD/v1/000/%08d.root</LFN>\n" % fileNum)
+            xmlFile.write("<PFN>root://cmsxrootd.fnal.gov//store/data/Run2024A/MinimumBias/AOD/v1/000/%08d.root"
+                          "</PFN>\n" % fileNum)
+            xmlFile.write("<Catalog>trivialcatalog_file:storage.xml?protocol=xrootd</Catalog>\n")
+            xmlFile.write("<ModuleLabel>source</ModuleLabel>\n<GUID>%08d-3347-DF11-9FE0</GUID>\n" % fileNum)
+            xmlFile.write("<Branches>\n</Branches>\n<InputType>primaryFiles</InputType>\n")
+            xmlFile.write("<InputSourceClass>PoolSource</InputSourceClass>\n<EventsRead>1000</EventsRead>\n")
+            xmlFile.write("<Runs>\n<Run ID=\"380000\">\n")
+            for lumi in range(fileNum * numLumis + 1, (fileNum + 1) * numLumis + 1):
+                xmlFile.write("   <LumiSection NEvents=\"10\" ID=\"%d\"/>\n" % lumi)
+            xmlFile.write("</Run>\n</Runs>\n</InputFile>\n")
+        xmlFile.write("</FrameworkJobReport>\n")
+
+
 class XMLParserTest(unittest.TestCase):
     """
     _XMLParserTest_
@@ -112,6 +142,69 @@ class XMLParserTest(unittest.TestCase):
         self.assertTrue("bla", castMetricValue("bla "))
 
 
+    def testStreamingParser(self):
+        """
+        Streaming and node tree parsing produce the same report
+        """
+        testData = os.path.join(getTestBase(), "WMCore_t/FwkJobReport_t")
+        for xmlFile in glob.glob(os.path.join(testData, "*.xml")):
+            if xmlFile.endswith("CMSSWFailReport2.xml"):
+                # corrupt XML file
+                continue
+            treeReport = Report('cmsRun1')
+            treeReport.parse(xmlFile, streaming=False)
+            streamReport = Report('cmsRun1')
+            streamReport.parse(xmlFile)
+            self.assertEqual(streamReport.data.dictionary_whole_tree_(), treeReport.data.dictionary_whole_tree_(),
+                             "Reports differ for %s" % xmlFile)
+
+    def testXmlFileToNodeStream(self):
+        """
+        Nodes are streamed as soon as they are complete and then dropped
+        """
+        streamed = []
+
+        def collect():
+            while True:
+                parent, node = (yield)
+                streamed.append((parent.name, node.name, len(node.children)))
+
+        target = collect()
+        next(target)
+        topNode = xmlFileToNodeStream(self.xmlFile, target)
+        self.assertEqual(len(topNode.children), 1)
+        self.assertEqual(topNode.children[0].name, "FrameworkJobReport")
+        self.assertEqual(topNode.children[0].children, [])
+        treeNode = xmlFileToNode(self.xmlFile)
+        self.assertEqual(streamed, [("FrameworkJobReport", node.name, len(node.children))
+                                    for node in treeNode.children[0].children])
+
+    @attr('performance', 'integration')
+    def testStreamingPerformance(self):
+        """
+        Compare time and peak memory of the streaming and node tree parsing
+        """
+        testDir = tempfile.mkdtemp()
+        try:
+            xmlPath = os.path.join(testDir, "LargeReport.xml")
+            writeLargeXMLReport(xmlPath, numFiles=2000, numLumis=100)
+            print("XML report of %.1f MB" % (os.path.getsize(xmlPath) / 1e6))
+            for streaming in (False, True):
+                gc.collect()
+                tracemalloc.start()
+                startTime = time.time()
+                report = Report('cmsRun1')
+                report.parse(xmlPath, streaming=streaming)
+                elapsed = time.time() - startTime
+                memory, peakMemory = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                self.assertEqual(len(report.getAllInputFiles()), 2000)
+                report = None
+                print("streaming=%s: parsed in %.2f secs, report memory %.1f MB, peak memory %.1f MB" %
+                      (streaming, elapsed, memory / 1e6, peakMemory / 1e6))
+        finally:
+            shutil.rmtree(testDir)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -8,8 +8,11 @@ Test the job splitting Job Factory
 
 
 
+import time
 import unittest
 
+from nose.plugins.attrib import attr
+
 from WMCore.DataStructs.File import File
 from WMCore.DataStructs.Fileset import Fileset
 from WMCore.DataStructs.Subscription import Subscription
@@ -101,5 +104,62 @@ class JobFactoryTest(unittest.TestCase):
 
         return
 
+    def testGetJobLocations(self):
+        """
+        _testGetJobLocations_
+
+        Check the PNN to PSN resolution with site lists and that identical
+        input locations are only resolved once.
+        """
+        myJobFactory = JobFactory()
+        myJobFactory.pnn_to_psn = {"T1_US_FNAL_Disk": ["T1_US_FNAL"],
+                                   "T2_CH_CERN": ["T2_CH_CERN", "T2_CH_CERN_HLT"],
+                                   "T2_US_MIT": ["T2_US_MIT"]}
+        myJobFactory.siteBlacklist = ["T2_CH_CERN_HLT"]
+
+        fileLocations, possiblePSN = myJobFactory.getJobLocations(["T2_CH_CERN", "T1_US_FNAL_Disk"])
+        self.assertEqual(fileLocations, {"T1_US_FNAL", "T2_CH_CERN", "T2_CH_CERN_HLT"})
+        self.assertEqual(possiblePSN, {"T1_US_FNAL", "T2_CH_CERN"})
+        # same locations, in a different order, give back the very same sets
+        self.assertIs(myJobFactory.getJobLocations({"T1_US_FNAL_Disk", "T2_CH_CERN"})[1], possiblePSN)
+
+        myJobFactory.locationCache = {}
+        myJobFactory.siteWhitelist = ["T2_US_MIT"]
+        self.assertEqual(myJobFactory.getJobLocations(["T2_CH_CERN"])[1], set())
+        self.assertEqual(myJobFactory.getJobLocations(["T2_US_MIT"])[1], {"T2_US_MIT"})
+
+        myJobFactory.locationCache = {}
+        myJobFactory.trustSitelists = True
+        self.assertEqual(myJobFactory.getJobLocations(["T2_CH_CERN"]), (set(), {"T2_US_MIT"}))
+        return
+
+    @attr('performance', 'integration')
+    def testGetJobLocationsPerformance(self):
+        """
+        _testGetJobLocationsPerformance_
+
+        Time the location resolution of many jobs spread over a few distinct
+        location sets, with and without the memoization.
+        """
+        myJobFactory = JobFactory()
+        myJobFactory.pnn_to_psn = {"PNN_%d" % i: ["PSN_%d" % i, "PSN_%d_HLT" % i] for i in range(200)}
+        myJobFactory.siteWhitelist = ["PSN_%d" % i for i in range(0, 200, 2)]
+        myJobFactory.siteBlacklist = ["PSN_%d" % i for i in range(0, 200, 10)]
+        jobLocations = [["PNN_%d" % ((i + j) % 200) for j in range(20)] for i in range(10)] * 5000
+
+        startTime = time.time()
+        for pnns in jobLocations:
+            myJobFactory.locationCache = {}
+            myJobFactory.getJobLocations(pnns)
+        uncachedTime = time.time() - startTime
+
+        myJobFactory.locationCache = {}
+        startTime = time.time()
+        for pnns in jobLocations:
+            myJobFactory.getJobLocations(pnns)
+        cachedTime = time.time() - startTime
+        print("  %d jobs: %.3f s resolving every job, %.3f s memoized" % (len(jobLocations), uncachedTime, cachedTime))
+        return
+
 if __name__ == '__main__':
     unittest.main()
@@ -17,6 +17,7 @@ from WMCore.DataStructs.Subscription import Subscription
 from WMCore.DataStructs.Workflow import Workflow
 from WMCore.DataStructs.Run import Run
 
+from WMCore.JobSplitting.LumiBased import LumiMaskFilter, isGoodLumi, isGoodRun
 from WMCore.JobSplitting.SplitterFactory import SplitterFactory
 from WMCore.Services.UUIDLib import makeUUID
 
@@ -303,5 +304,34 @@ class LumiBasedTest(unittest.TestCase):
         jobs = jobGroups[0].jobs
         self.assertEqual(len(jobs), 3)
 
+    def testD_LumiMaskFilter(self):
+        """
+        _testD_LumiMaskFilter_
+
+        Check the compiled lumi mask agrees with isGoodRun/isGoodLumi
+        """
+        goodRunList = {'1': [[30, 40], [1, 10], [11, 12]], '3': [[5, 5], [7, 9], [8, 20]], '4': []}
+        lumiMask = LumiMaskFilter(goodRunList)
+        for run in range(0, 6):
+            self.assertEqual(lumiMask.isGoodRun(run), isGoodRun(goodRunList, run))
+            for lumi in range(0, 45):
+                self.assertEqual(lumiMask.isGoodLumi(run, lumi), isGoodLumi(goodRunList, run, lumi))
+        self.assertEqual(lumiMask.filterLumis(1, range(8, 33)), set(list(range(8, 13)) + [30, 31, 32]))
+        self.assertEqual(lumiMask.filterLumis(2, range(8, 33)), set())
+
+        # run whitelist on top of the lumi mask
+        lumiMask = LumiMaskFilter(goodRunList, runWhitelist=[3, 5])
+        self.assertFalse(lumiMask.isGoodRun(1))
+        self.assertTrue(lumiMask.isGoodRun(3))
+        self.assertFalse(lumiMask.isGoodRun(5))
+
+        # no lumi mask accepts everything but what is outside the whitelist
+        lumiMask = LumiMaskFilter({}, runWhitelist=[5])
+        self.assertTrue(lumiMask.isGoodRun(5))
+        self.assertFalse(lumiMask.isGoodRun(1))
+        self.assertTrue(lumiMask.isGoodLumi(1, 1000))
+        self.assertEqual(lumiMask.filterLumis(5, [1, 2, 3]), {1, 2, 3})
+        return
+
 if __name__ == '__main__':
     unittest.main()
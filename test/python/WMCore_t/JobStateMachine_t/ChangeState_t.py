@@ -15,7 +15,8 @@ from WMCore.DAOFactory import DAOFactory
 from WMCore.Database.CMSCouch import CouchServer
 from WMCore.FwkJobReport.Report import Report
 from WMCore.JobSplitting.SplitterFactory import SplitterFactory
-from WMCore.JobStateMachine.ChangeState import ChangeState, Transitions
+from WMCore.JobStateMachine.ChangeState import (ChangeState, Transitions, applyStateTransition,
+                                                 applySummaryTransition)
 from WMCore.WMBS.File import File
 from WMCore.WMBS.Fileset import Fileset
 from WMCore.WMBS.Subscription import Subscription
@@ -883,6 +884,70 @@ class TestChangeState(unittest.TestCase):
 
         return
 
+    def testBulkStateTransitions(self):
+        """
+        _testBulkStateTransitions_
+
+        Verify that state transitions applied through _bulk_docs end up
+        like the ones applied through the update handlers.
+        """
+        doc = applyStateTransition(None, "1", {"newstate": "created"})
+        self.assertEqual(doc, {"_id": "1", "states": {"1": {"newstate": "created"}}})
+        doc = applyStateTransition(doc, "1", {"newstate": "executing"})
+        self.assertEqual(doc["states"]["2"], {"newstate": "executing"})
+        self.assertIsNone(applySummaryTransition(None, "job", {}))
+
+        self.config.JobStateMachine.couchTransitionBatchSize = 2
+        change = ChangeState(self.config, "changestate_t")
+
+        locationAction = self.daoFactory(classname="Locations.New")
+        locationAction.execute("site1", pnn="T2_CH_CERN")
+
+        testWorkflow = Workflow(spec=self.specUrl, owner="Steve",
+                                name="wf001", task=self.taskName)
+        testWorkflow.create()
+        testFileset = Fileset(name="TestFileset")
+        testFileset.create()
+        for i in range(5):
+            testFile = File(lfn="SomeLFN%d" % i, locations=set(["T2_CH_CERN"]))
+            testFile.create()
+            testFileset.addFile(testFile)
+        testFileset.commit()
+
+        testSubscription = Subscription(fileset=testFileset,
+                                        workflow=testWorkflow)
+        testSubscription.create()
+
+        splitter = SplitterFactory()
+        jobFactory = splitter(package="WMCore.WMBS",
+                              subscription=testSubscription)
+        jobs = jobFactory(files_per_job=1)[0].jobs
+        self.assertEqual(len(jobs), 5)
+
+        change.propagate(jobs, 'created', 'new')
+        change.propagate(jobs, 'executing', 'created')
+        myReport = Report()
+        myReport.unpersist(os.path.join(getTestBase(), "WMCore_t/JobStateMachine_t/Report.pkl"))
+        for job in jobs:
+            job["fwjr"] = myReport
+        change.propagate(jobs, 'jobfailed', 'executing')
+        for job in jobs:
+            del job["fwjr"]
+        change.propagate(jobs, 'jobcooloff', 'jobfailed', updatesummary=True)
+
+        jobsDB = self.couchServer.connectDatabase("changestate_t/jobs")
+        jobSummaryDB = self.couchServer.connectDatabase(self.config.JobStateMachine.jobSummaryDBName)
+        for job in jobs:
+            jobDoc = jobsDB.document(str(job["id"]))
+            self.assertEqual(len(jobDoc["states"]), 4)
+            self.assertEqual(jobDoc["states"]["4"]["oldstate"], "jobfailed")
+            self.assertEqual(jobDoc["states"]["4"]["newstate"], "jobcooloff")
+
+            summaryDoc = jobSummaryDB.document(job["name"])
+            self.assertEqual(summaryDoc["state"], "jobcooloff")
+            self.assertEqual(summaryDoc["state_history"][-1]["newstate"], "jobcooloff")
+        return
+
     def testUpdateLocation(self):
         """
         _testUpdateLocation_
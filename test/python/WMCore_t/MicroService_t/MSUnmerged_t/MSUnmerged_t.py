@@ -45,7 +45,7 @@ class RucioConMonEmul(object):
         """
         return self.rseConsStatsDump
 
-    def getRSEUnmerged(self, rseName, zipped=False):
+    def getRSEUnmerged(self, rseName, zipped=False, stream=False):
         """
         Emulates getting the list of all unmerged files in an RSE
         In reality it returns it from a file.
@@ -225,6 +225,13 @@ class MSUnmergedTest(unittest.TestCase):
         expectedFilePath = '/store/unmerged/RunIIAutumn18FSPremix/PMSSM_set_1_prompt_1_TuneCP2_13TeV-pythia8/AODSIM/GridpackScan_102X_upgrade2018_realistic_v15-v1'
         self.assertEqual(self.msUnmerged._cutPath(filePath), expectedFilePath)
 
+        filePath = '/store/unmerged/SAM/testSRM'
+        self.assertEqual(self.msUnmerged._cutPath(filePath), filePath)
+
+        filePath = '/store//unmerged/SAM/testSRM/SAM-cmssrm.hep.wisc.edu/lcg-util/testfile.txt'
+        expectedFilePath = '/store/unmerged/SAM/testSRM/SAM-cmssrm.hep.wisc.edu/lcg-util'
+        self.assertEqual(self.msUnmerged._cutPath(filePath), expectedFilePath)
+
     def testFilterInclDirectories(self):
         "Test MSUnmerged with including directories filter"
         toDeleteDict = {"/store/unmerged/data/prod/2018/1/12", "/store/unmerged/express/prod/2020/1/12"}
@@ -275,3 +282,24 @@ class MSUnmergedTest(unittest.TestCase):
 
         self.assertEqual(len(filterData), 1)
         self.assertItemsEqual(filterData, toDeleteDict)
+
+        # filters are recompiled whenever the configuration changes
+        self.msUnmerged.msConfig['dirFilterExcl'] = []
+        self.assertTrue(self.msUnmerged._isDeletable("/store/unmerged/data/prod/2018/1/12"))
+
+        # directories under a protected LFN are protected as well
+        self.msUnmerged.protectedLFNs = {"/store/unmerged/data/prod/2018"}
+        self.assertFalse(self.msUnmerged._isDeletable("/store/unmerged/data/prod/2018/1/12"))
+        self.assertTrue(self.msUnmerged._isDeletable("/store/unmerged/express/prod/2020/1/12"))
+
+    def testGetUnmergedFiles(self):
+        "Test MSUnmerged classification of the unmerged files from RucioConMon"
+        rse = MSUnmergedRSE('T2_US_Wisconsin')
+        self.msUnmerged.protectedLFNs = set(self.msUnmerged.wmstatsSvc.getProtectedLFNs())
+        rse = self.msUnmerged.getUnmergedFiles(rse)
+        numFiles = len([lfn for lfn in self.msUnmerged.rucioConMon.rseUnmergedDump
+                        if self.msUnmerged.regStoreUnmergedLfn.match(self.msUnmerged._cutPath(lfn))])
+        self.assertEqual(rse['counters']['totalNumFiles'], numFiles)
+        self.assertTrue(rse['dirs']['toDelete'])
+        self.assertFalse(rse['dirs']['toDelete'] & rse['dirs']['protected'])
+        self.assertTrue(rse['dirs']['protected'] <= self.msUnmerged.protectedLFNs)
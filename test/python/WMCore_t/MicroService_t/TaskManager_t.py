@@ -5,8 +5,10 @@ Author: Valentin Kuznetsov <vkuznet [AT] gmail [DOT] com>
 """
 from __future__ import division, print_function
 
+import threading
 import time
 import unittest
+from concurrent.futures import CancelledError, TimeoutError as FutureTimeoutError
 
 from builtins import str as newstr
 from future.utils import listvalues
@@ -20,6 +22,17 @@ def myFunc(interval, results):
     results.update({interval: 'ok_%s' % interval})
 
 
+def myDivision(num, den, interval=0):
+    "Test function returning a result or raising an exception"
+    time.sleep(interval)
+    return num / den
+
+
+def myBlockingFunc(event):
+    "Test function blocking until the event is set"
+    event.wait(10)
+
+
 class TaskManagerTest(unittest.TestCase):
     "Unit test for TaskManager module"
 
@@ -83,6 +96,105 @@ class TaskManagerTest(unittest.TestCase):
         for worker in mgr.workers:
             self.assertEqual(False, worker.is_alive())
 
+    def testSubmit(self):
+        "Test TaskManager results and exceptions collection"
+        mgr = TaskManager(nworkers=3)
+        futures = [mgr.submit(myDivision, num, 2) for num in range(10)]
+        futures.append(mgr.submit(myDivision, 1, 0))
+        self.assertTrue(mgr.joinall(futures))
+        self.assertEqual([future.result() for future in futures[:10]], [num / 2 for num in range(10)])
+        self.assertRaises(ZeroDivisionError, futures[10].result)
+        self.assertFalse(mgr.pids)
+        self.assertFalse(mgr.futures)
+
+        # spawned tasks carry their future as well
+        job = mgr.spawn(myDivision, 3, 1)
+        self.assertTrue(mgr.joinall([job]))
+        self.assertEqual(job[0].future.result(), 3)
+
+        durations = mgr.status()['TaskManager']['durations']['myDivision']
+        self.assertEqual(durations['count'], 12)
+        self.assertEqual(durations['failed'], 1)
+        self.assertEqual(sum(durations['histogram'].values()), 12)
+        mgr.quit()
+
+    def testBoundedQueue(self):
+        "Test TaskManager with a bounded queue of tasks"
+        mgr = TaskManager(nworkers=1, maxQueueSize=1)
+        event = threading.Event()
+        mgr.submit(myBlockingFunc, event)
+        time.sleep(0.5)  # let the worker pick the first task up
+        mgr.submit(myDivision, 1, 1)
+        self.assertTrue(mgr.status()['TaskManager']['full'])
+
+        submitter = threading.Thread(target=mgr.submit, args=(myDivision, 2, 1))
+        submitter.start()
+        submitter.join(0.5)
+        self.assertTrue(submitter.is_alive())  # blocked while the queue is full
+        event.set()
+        submitter.join(5)
+        self.assertFalse(submitter.is_alive())
+        mgr.quit()
+
+    def testTimeout(self):
+        "Test TaskManager per task timeout"
+        mgr = TaskManager(nworkers=1, timeout=1)
+        slowTask = mgr.submit(myDivision, 1, 1, interval=3)
+        queuedTask = mgr.submit(myDivision, 2, 1)
+        self.assertTrue(mgr.joinall([slowTask]))
+        self.assertRaises(FutureTimeoutError, slowTask.result)
+        # the second task waited in the queue beyond the timeout as well
+        self.assertTrue(mgr.joinall([queuedTask], timeout=5))
+        self.assertRaises(FutureTimeoutError, queuedTask.result)
+
+        self.assertFalse(mgr.joinall([mgr.submit(myDivision, 3, 1, interval=3)], timeout=0.5))
+        mgr.quit()
+
+    def testQueuedTimeout(self):
+        "Test TaskManager timeout of the tasks waiting in the queue behind a long task"
+        mgr = TaskManager(nworkers=1, timeout=1)
+        longTask = mgr.submit(myDivision, 1, 1, interval=5)
+        queuedTask = mgr.submit(myDivision, 2, 1)
+        startTime = time.time()
+        self.assertTrue(mgr.joinall([queuedTask]))
+        self.assertLess(time.time() - startTime, 3)
+        self.assertRaises(FutureTimeoutError, queuedTask.result)
+        self.assertNotIn(queuedTask.pid, mgr.futures)
+        # the long task is still running, then it times out as well
+        self.assertFalse(longTask.done())
+        self.assertTrue(mgr.joinall([longTask]))
+        self.assertRaises(FutureTimeoutError, longTask.result)
+        self.assertLess(time.time() - startTime, 4)
+        mgr.quit()
+
+    def testStop(self):
+        "Test TaskManager cancellation of the queued tasks on stop"
+        mgr = TaskManager(nworkers=1)
+        event = threading.Event()
+        running = mgr.submit(myBlockingFunc, event)
+        time.sleep(0.5)  # let the worker pick the first task up
+        queued = [mgr.submit(myDivision, num, 1) for num in range(5)]
+        threading.Timer(1, event.set).start()
+        mgr.stop()
+        for future in queued:
+            self.assertRaises(CancelledError, future.result)
+        # running tasks are left to complete
+        self.assertTrue(mgr.joinall([running] + queued))
+        self.assertIsNone(running.result())
+        for worker in mgr.workers:
+            worker.join(5)
+            self.assertEqual(False, worker.is_alive())
+
+        mgr = TaskManager(nworkers=1)
+        event = threading.Event()
+        mgr.submit(myBlockingFunc, event)
+        time.sleep(0.5)
+        self.assertEqual(len([mgr.submit(myDivision, num, 1) for num in range(3)]), 3)
+        self.assertEqual(mgr.cancel(), 3)
+        self.assertFalse(mgr.futures.keys() - {mgr.submit(myBlockingFunc, event).pid})
+        event.set()
+        mgr.quit()
+
 
 if __name__ == '__main__':
     unittest.main()
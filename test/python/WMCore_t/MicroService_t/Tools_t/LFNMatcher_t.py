@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""
+Unittests for the LFNMatcher module
+"""
+from __future__ import division, print_function
+
+import json
+import unittest
+
+from WMCore.MicroService.Tools.LFNMatcher import LFNMatcher
+
+
+class LFNMatcherTests(unittest.TestCase):
+    """Test the LFNMatcher class"""
+
+    def setUp(self):
+        "initialization"
+        self.protectedLFNs = ["/store/unmerged/Run2016G/DoubleEG/MINIAOD/UL2016_MiniAODv2-v1",
+                              "/store/unmerged/SAM/testSRM/"]
+        self.matcher = LFNMatcher(self.protectedLFNs,
+                                  dirFilterIncl=["/store/unmerged/Run2016", "/store/unmerged/SAM"],
+                                  dirFilterExcl=["/store/unmerged/Run2016H"])
+
+    def testProtected(self):
+        "Test the protected LFNs lookups"
+        self.assertEqual(len(self.matcher), 2)
+        lfn = "/store/unmerged/Run2016G/DoubleEG/MINIAOD/UL2016_MiniAODv2-v1/00000/file.root"
+        self.assertTrue(self.matcher.isProtected(lfn))
+        self.assertEqual(self.matcher.protectedBy(lfn), self.protectedLFNs[0])
+        self.assertTrue(self.matcher.isProtected("/store/unmerged/SAM/testSRM"))
+        self.assertEqual(self.matcher.protectedBy("/store/unmerged/SAM/testSRM/lcg-util"),
+                         "/store/unmerged/SAM/testSRM")
+
+        # protected LFNs are matched by whole path components only
+        self.assertFalse(self.matcher.isProtected("/store/unmerged/SAM/testSRM2"))
+        self.assertFalse(self.matcher.isProtected("/store/unmerged/Run2016G/DoubleEG/MINIAOD"))
+        self.assertIsNone(self.matcher.protectedBy("/store/unmerged/Run2016G/DoubleEG/MINIAOD"))
+
+    def testDeletable(self):
+        "Test the directory filters together with the protected LFNs"
+        self.assertTrue(self.matcher.isSelected("/store/unmerged/Run2016G/DoubleEG"))
+        self.assertTrue(self.matcher.isDeletable("/store/unmerged/Run2016G/DoubleEG"))
+        self.assertTrue(self.matcher.isDeletable("/store/unmerged/SAM/testSRM2"))
+        self.assertFalse(self.matcher.isDeletable("/store/unmerged/SAM/testSRM/lcg-util"))
+        self.assertFalse(self.matcher.isDeletable("/store/unmerged/Run2016H/DoubleEG"))
+        self.assertFalse(self.matcher.isDeletable("/store/unmerged/Run2017F/DoubleEG"))
+        self.assertTrue(LFNMatcher().isDeletable("/store/unmerged/Run2017F/DoubleEG"))
+
+    def testSerialization(self):
+        "Test the serialization of the matcher"
+        matcher = LFNMatcher.fromDict(json.loads(json.dumps(self.matcher.toDict())))
+        self.assertEqual(len(matcher), 2)
+        self.assertEqual(matcher.dirFilterIncl, self.matcher.dirFilterIncl)
+        self.assertEqual(matcher.dirFilterExcl, self.matcher.dirFilterExcl)
+        for dirPath in ["/store/unmerged/Run2016G/DoubleEG/MINIAOD/UL2016_MiniAODv2-v1/00000",
+                        "/store/unmerged/Run2016H/DoubleEG",
+                        "/store/unmerged/Run2017F/DoubleEG",
+                        "/store/unmerged/SAM/testSRM2",
+                        "/store/unmerged/SAM/testSRM/lcg-util"]:
+            self.assertEqual(matcher.isDeletable(dirPath), self.matcher.isDeletable(dirPath))
+            self.assertEqual(matcher.protectedBy(dirPath), self.matcher.protectedBy(dirPath))
+
+
+if __name__ == '__main__':
+    unittest.main()
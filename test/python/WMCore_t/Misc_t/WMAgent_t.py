@@ -6,7 +6,6 @@ import os.path
 
 import getpass
 import os
-import pickle
 import random
 import shutil
 import threading
@@ -19,6 +18,7 @@ from WMComponent.JobAccountant.JobAccountantPoller import JobAccountantPoller
 from WMComponent.JobArchiver.JobArchiverPoller import JobArchiverPoller
 # Component imports
 from WMComponent.JobCreator.JobCreatorPoller import JobCreatorPoller
+from WMComponent.JobCreator.SharedJobMetadata import loadJob
 from WMComponent.JobSubmitter.JobSubmitterPoller import JobSubmitterPoller
 from WMComponent.JobTracker.JobTrackerPoller import JobTrackerPoller
 from WMComponent.TaskArchiver.TaskArchiverPoller import TaskArchiverPoller
@@ -380,8 +380,7 @@ class WMAgentTest(unittest.TestCase):
         self.assertTrue('job_1' in os.listdir(groupDirectory))
         jobFile = os.path.join(groupDirectory, 'job_1', 'job.pkl')
         self.assertTrue(os.path.isfile(jobFile))
-        with open(jobFile, 'rb') as f:
-            job = pickle.load(f)
+        job = loadJob(jobFile)
 
         self.assertEqual(job['workflow'], name)
         self.assertEqual(len(job['input_files']), 1)
@@ -940,6 +940,10 @@ class JobTest(JobTestBase):
         self.assertEqual(len(goldenMap), 0,
                          "Error: Missing output maps.")
 
+        # the output maps of many jobs can be retrieved at once
+        outputMaps = outputMapAction.execute(jobID=[testJob["id"], testJob["id"] + 1000])
+        self.assertEqual(outputMaps, {testJob["id"]: outputMap, testJob["id"] + 1000: {}})
+
         return
 
     def testLocations(self):
@@ -10,6 +10,8 @@ import time
 import unittest
 from functools import reduce
 
+from nose.plugins.attrib import attr
+
 from WMCore.DAOFactory import DAOFactory
 from WMCore.DataStructs.Run import Run
 from WMCore.WMBS.File import File
@@ -1336,6 +1338,56 @@ class SubscriptionTest(unittest.TestCase):
 
         return
 
+    @attr('performance', 'integration')
+    def testBulkCommitPerformance(self):
+        """
+        _testBulkCommitPerformance_
+
+        Time the bulk commit of many job groups against the test database
+        """
+        nGroups = 1000
+        jobsPerGroup = 10
+        testWorkflow = Workflow(spec="spec.xml", owner="Simon",
+                                name="wf001", task="Test")
+        testWorkflow.create()
+
+        testFileset = Fileset(name="TestFileset")
+        testFileset.create()
+        testFiles = []
+        for i in range(nGroups * jobsPerGroup):
+            testFile = File(lfn="/this/is/a/lfn%d" % i, size=1024, events=20,
+                            locations={"goodse.cern.ch"})
+            testFile.addRun(Run(1, *[i]))
+            testFile.create()
+            testFileset.addFile(testFile)
+            testFiles.append(testFile)
+        testFileset.commit()
+
+        testSubscription = Subscription(fileset=testFileset,
+                                        workflow=testWorkflow)
+        testSubscription.create()
+
+        jobGroups = []
+        for i in range(nGroups):
+            testJobGroup = JobGroup(subscription=testSubscription)
+            for j in range(i * jobsPerGroup, (i + 1) * jobsPerGroup):
+                testJob = Job(name="TestJob%d" % j)
+                testJob.addFile(testFiles[j])
+                testJob['mask'].addRunAndLumis(run=1, lumis=[j, j])
+                testJobGroup.add(testJob)
+            jobGroups.append(testJobGroup)
+
+        startTime = time.time()
+        testSubscription.bulkCommit(jobGroups=jobGroups, chunkSize=1000)
+        print("  bulkCommit of %d job groups and %d jobs: %.3f s" % (nGroups, nGroups * jobsPerGroup,
+                                                                    time.time() - startTime))
+
+        self.assertEqual(len(testSubscription.filesOfStatus(status="Acquired")), nGroups * jobsPerGroup)
+        for jobGroup in jobGroups:
+            self.assertEqual(len(jobGroup.jobs), jobsPerGroup)
+            self.assertTrue(all(job['id'] for job in jobGroup.jobs))
+        return
+
     # def testBulkCommit2(self):
     #     """
     #     _testBulkCommit2_
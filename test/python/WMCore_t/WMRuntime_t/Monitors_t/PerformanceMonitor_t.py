@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+_PerformanceMonitor_t_
+
+Unit tests for the PerformanceMonitor sampling
+"""
+
+import os
+import unittest
+
+from WMCore.FwkJobReport.Report import Report
+from WMCore.WMRuntime.Monitors.PerformanceMonitor import PerformanceMonitor, PerformanceSamples
+
+
+class PerformanceMonitorTest(unittest.TestCase):
+    """
+    Test the PerformanceMonitor samples and their report
+    """
+
+    def testPerformanceSamples(self):
+        """Statistics cover all the samples, the time series is bounded"""
+        samples = PerformanceSamples(maxPoints=10)
+        for i in range(100):
+            samples.addSample({'pss': 1000 * i, 'pcpu': 100.0, 'pmem': None}, timestamp=1000 + i)
+        self.assertEqual(samples.numSamples, 100)
+        self.assertEqual(samples.summary('pss'), (0, 99000, 49500.0))
+        self.assertEqual(samples.summary('pcpu'), (100.0, 100.0, 100.0))
+        self.assertIsNone(samples.summary('pmem'))
+
+        series = samples.compactTimeSeries()
+        self.assertLess(len(series['time']), 10)
+        self.assertEqual(series['time'][0], 0)
+        self.assertGreater(series['time'][-1], 50)
+        self.assertEqual(series['time'], sorted(series['time']))
+        self.assertEqual(series['pss'], [1000 * t for t in series['time']])
+
+    def testSampleProcFS(self):
+        """Sample the current process tree from /proc"""
+        monitor = PerformanceMonitor()
+        monitor.initMonitor(task=None, job=None, logPath="/tmp")
+        self.assertEqual(monitor.samplingMethod, 'procfs')
+        sample = monitor.sampleProcFS(os.getpid())
+        self.assertGreater(sample['pss'], 0)
+        self.assertGreater(sample['rss'], 0)
+        self.assertGreaterEqual(sample['pcpu'], 0)
+        self.assertGreater(sample['pmem'], 0)
+        self.assertIsNotNone(monitor.lastCPUSample)
+        self.assertIsNone(monitor.sampleProcFS(-1))
+
+    def testRecordPerformance(self):
+        """Samples are recorded in the performance section of the report"""
+        monitor = PerformanceMonitor()
+        for i in range(5):
+            monitor.samples.addSample({'pss': 2000 * (i + 1), 'rss': 3000, 'pcpu': 50.0, 'pmem': 1.0},
+                                      timestamp=100 + 60 * i)
+        report = Report("cmsRun1")
+        monitor.recordPerformance(report, "cmsRun1")
+
+        perf = report.retrieveStep("cmsRun1").performance
+        self.assertEqual(perf.PSSMemory.max, 10.0)
+        self.assertEqual(perf.PSSMemory.average, 6.0)
+        self.assertEqual(perf.RSSMemory.min, 3.0)
+        self.assertEqual(perf.PercentCPU.average, 50.0)
+        self.assertEqual(perf.PhysicalMemory.max, 1.0)
+        self.assertEqual(perf.TimeSeries.numSamples, 5)
+        self.assertEqual(perf.TimeSeries.time, [0, 60, 120, 180, 240])
+        self.assertEqual(perf.TimeSeries.pss, [2, 4, 6, 8, 10])
+
+
+if __name__ == '__main__':
+    unittest.main()
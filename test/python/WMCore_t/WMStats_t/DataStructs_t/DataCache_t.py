@@ -7,6 +7,8 @@ import os
 import unittest
 
 from Utils.PythonVersion import PY3
+from WMCore.ReqMgr.DataStructs.Request import RequestInfo, protectedLFNs
+from WMCore.ReqMgr.DataStructs.RequestStatus import ACTIVE_STATUS_FILTER
 from WMCore.WMStats.DataStructs.DataCache import DataCache
 
 
@@ -90,6 +92,48 @@ class DataCacheTests(unittest.TestCase):
         self.assertEqual("amaltaro_TaskChain_InclParents_HG1812_Validation_181203_121005_1483",
                          data[0]['RequestName'])
 
+    def testFilterIndexes(self):
+        """
+        Indexed filtering gives the same result as checking every request
+        """
+        reqData = DataCache.getlatestJobData()
+        filters = [{},
+                   ACTIVE_STATUS_FILTER,
+                   {'RequestType': 'TaskChain'},
+                   {'RequestType': ['TaskChain', 'StepChain'], 'RequestStatus': 'announced'},
+                   {'IncludeParents': 'True'},
+                   {'IncludeParents': 'false'},
+                   {'Campaign': 'CMSSW_9_4_0__test2inwf-1510737328', 'RequestType': 'ReReco'},
+                   {'AgentJobInfo': 'CLEANED'},
+                   {'AgentJobInfo': 'CLEANED', 'RequestStatus': ['announced', 'completed']},
+                   {'LumiList': {'1': [[1, 2]]}},
+                   {'SiteWhitelist': 'T1_US_FNAL'},
+                   {'NonExistentProperty': 'value'}]
+        for filterDict in filters:
+            expected = [reqName for reqName, reqDict in reqData.items()
+                        if RequestInfo(reqDict).andFilterCheck(filterDict)]
+            data = [item['RequestName'] for item in DataCache.filterDataByRequest(filterDict, 'RequestName')]
+            self.assertEqual(expected, data)
+
+        # indexes are rebuilt when new data is set
+        DataCache.setlatestJobData({'req1': {'RequestName': 'req1', 'RequestType': 'TaskChain'}})
+        data = list(DataCache.filterData({'RequestType': 'TaskChain'}, ['RequestName']))
+        self.assertEqual(['req1'], data)
+
+    def testProtectedLFNs(self):
+        """
+        Protected LFNs are computed when the data is set
+        """
+        expected = set()
+        for reqInfo in DataCache.getlatestJobData().values():
+            expected.update(protectedLFNs(reqInfo))
+        data = list(DataCache.getProtectedLFNs())
+        self.assertEqual(len(data), len(set(data)))
+        self.assertItemsEqual(expected, data)
+
+        DataCache.setlatestJobData({})
+        self.assertEqual([], list(DataCache.getProtectedLFNs()))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -8,7 +8,7 @@ import time
 
 from Utils.PythonVersion import PY3
 from WMQuality.TestInitCouchApp import TestInitCouchApp as TestInit
-from WMCore.WorkQueue.WorkQueueBackend import WorkQueueBackend, sortAvailableElements
+from WMCore.WorkQueue.WorkQueueBackend import WorkQueueBackend, SiteJobCounter, sortAvailableElements
 from WMCore.WorkQueue.DataStructs.CouchWorkQueueElement import CouchWorkQueueElement
 from WMCore.WorkQueue.DataStructs.WorkQueueElement import WorkQueueElement
 
@@ -91,6 +91,39 @@ class WorkQueueBackendTest(unittest.TestCase):
                          ['backend_test_high', 'backend_test', 'backend_test_2',
                           'backend_test_3', 'backend_test_low'])
 
+    def testAvailableWorkSlices(self):
+        """Available work is paginated over the view with a key cursor"""
+        elements = []
+        for i in range(7):
+            elements.append(WorkQueueElement(RequestName='backend_test_%s' % i,
+                                             WMSpec=self.processingSpec,
+                                             Status='Available',
+                                             SiteWhitelist=["place"],
+                                             Jobs=10, Priority=i % 3))
+        self.backend.insertElements(elements)
+        # all rows considered, slices of 2 rows with a couple of elements sharing the priority
+        work, _ = self.backend.availableWork({'place': 1000}, {}, rowsPerSlice=2, maxRows=10)
+        self.assertItemsEqual([x['RequestName'] for x in work],
+                              ['backend_test_%s' % i for i in range(7)])
+        # maxRows limits the number of rows considered
+        work, _ = self.backend.availableWork({'place': 1000}, {}, rowsPerSlice=2, maxRows=4)
+        self.assertEqual(len(work), 4)
+        # the site is full for priority 1 or lower, only priority 2 elements are acquired
+        work, _ = self.backend.availableWork({'place': 30}, {'place': {1: 10}}, rowsPerSlice=2,
+                                             maxRows=10, preFilterSites=True)
+        self.assertItemsEqual([x['RequestName'] for x in work], ['backend_test_2', 'backend_test_5'])
+
+    def testSitesWithFreeSlots(self):
+        """Sites full for a given priority are filtered out"""
+        thresholds = {'T1_A': 100, 'T2_B': 50, 'T2_C': 10}
+        jobCounter = SiteJobCounter({'T1_A': {1: 20, 5: 80}, 'T2_B': {10: 60}})
+        self.assertItemsEqual(self.backend._sitesWithFreeSlots(thresholds, jobCounter, 20),
+                              ['T1_A', 'T2_B', 'T2_C'])
+        self.assertItemsEqual(self.backend._sitesWithFreeSlots(thresholds, jobCounter, 5),
+                              ['T1_A', 'T2_C'])
+        self.assertItemsEqual(self.backend._sitesWithFreeSlots(thresholds, jobCounter, 1),
+                              ['T2_C'])
+
     def testDuplicateInsertion(self):
         """Try to insert elements multiple times"""
         element1 = CouchWorkQueueElement(self.couch_db,
@@ -131,5 +164,36 @@ class WorkQueueBackendTest(unittest.TestCase):
         self.assertItemsEqual(elemList, expected)
 
 
+class SiteJobCounterTest(unittest.TestCase):
+    """Unit tests for the SiteJobCounter index"""
+
+    def testJobCount(self):
+        """Cumulative job counts match the ones from the plain dictionary"""
+        siteJobCounts = {'T1_A': {1: 20, 5: 80, 3: 10}, 'T2_B': {10: 60}}
+        jobCounter = SiteJobCounter(siteJobCounts)
+        self.assertEqual(jobCounter.jobCount('T1_A', 0), 110)
+        self.assertEqual(jobCounter.jobCount('T1_A', 3), 90)
+        self.assertEqual(jobCounter.jobCount('T1_A', 4), 80)
+        self.assertEqual(jobCounter.jobCount('T1_A', 6), 0)
+        self.assertEqual(jobCounter.jobCount('T2_B', 10), 60)
+        self.assertEqual(jobCounter.jobCount('T3_C', 1), 0)
+
+    def testAddJobs(self):
+        """Jobs added are indexed and the dictionary is updated in place"""
+        siteJobCounts = {'T1_A': {1: 20, 5: 80}}
+        jobCounter = SiteJobCounter(siteJobCounts)
+        self.assertEqual(jobCounter.jobCount('T1_A', 1), 100)
+        jobCounter.addJobs('T1_A', 5, 10)
+        jobCounter.addJobs('T1_A', 3, 5)
+        jobCounter.addJobs('T1_A', 0, 1)
+        jobCounter.addJobs('T1_A', 9, 2)
+        jobCounter.addJobs('T2_B', 2, 7.5)
+        self.assertEqual(siteJobCounts, {'T1_A': {0: 1, 1: 20, 3: 5, 5: 90, 9: 2}, 'T2_B': {2: 7.5}})
+        for site, jobsByPrio in siteJobCounts.items():
+            for prio in range(11):
+                expected = sum(jobs for jobPrio, jobs in jobsByPrio.items() if jobPrio >= prio)
+                self.assertEqual(jobCounter.jobCount(site, prio), expected)
+
+
 if __name__ == '__main__':
     unittest.main()